@@ -1,5 +1,6 @@
 import { createContext, ReactNode, useContext, useEffect, useState } from "react";
 import api from "../services/api"; // Importa a conexão com o backend
+import { loadBootstrap } from "../services/bootstrap";
 
 // ---------------------------
 // Tipagem de cada item do histórico
@@ -20,6 +21,7 @@ type HistoryContextType = {
   addToHistory: (amount: number) => void; // Adiciona novo registro
   removeFromHistory: (id: number) => void; // Remove registro pelo ID
   hasFirstDrink: boolean; // Se já existe algum registro de agua para conquista primeiro gole
+  firstDrinkLoaded: boolean; // Se o backend já respondeu (antes disso hasFirstDrink é só provisório)
 };
 
 // ---------------------------
@@ -34,6 +36,7 @@ const HistoryContext = createContext<HistoryContextType | undefined>(undefined);
 // Componente que fornece o histórico para toda a aplicação
 export const HistoryProvider = ({ children }: { children: ReactNode }) => {
   const [history, setHistory] = useState<HistoryItem[]>([]);
+  const [hadHistory, setHadHistory] = useState<boolean | null>(null); // has_history do /bootstrap
 
   // ---------------------------
   // Buscar histórico no backend ao montar o Provider
@@ -41,8 +44,35 @@ export const HistoryProvider = ({ children }: { children: ReactNode }) => {
   useEffect(() => {
     const fetchHistory = async () => {
       try {
-        const response = await api.get("/historico");
-        setHistory(response.data); // Espera um array [{id, time, amount}]
+        // Mostra logo os registros de hoje (vêm no /bootstrap, junto com o perfil)
+        // enquanto o resto do ano carrega; se o ano chegar antes, fica o ano
+        loadBootstrap()
+          .then(boot => {
+            setHistory(prev => (prev.length ? prev : boot.today));
+            setHadHistory(boot.has_history);
+          })
+          .catch(() => {});
+
+        // A tela de histórico mostra no máximo o ano atual, e o filtro "Semanal" e as missões
+        // semanais usam a semana atual (começa no domingo): busca a partir do que vier antes
+        // (no começo de janeiro, a semana ainda tem dias do ano anterior)
+        const now = new Date();
+        const startOfYear = new Date(now.getFullYear(), 0, 1);
+        const startOfWeek = new Date(now.getFullYear(), now.getMonth(), now.getDate() - now.getDay());
+        const since = new Date(Math.min(startOfYear.getTime(), startOfWeek.getTime())).toISOString();
+        const items: HistoryItem[] = [];
+        let cursor: string | undefined;
+
+        // O backend pagina o histórico: segue o cabeçalho X-Next-Cursor até acabar
+        do {
+          const response = await api.get("/historico", {
+            params: { since, limit: 500, ...(cursor ? { cursor } : {}) },
+          });
+          items.push(...response.data); // Espera um array [{id, time, amount}]
+          cursor = response.headers["x-next-cursor"];
+        } while (cursor);
+
+        setHistory(items);
       } catch (error) {
         console.error("Erro ao carregar histórico:", error);
       }
@@ -82,11 +112,13 @@ export const HistoryProvider = ({ children }: { children: ReactNode }) => {
   // ---------------------------
   // Conquista Primeiro Gole
   // ---------------------------
-  const hasFirstDrink = history.length > 0;
+  // Vem do backend (a lista só tem o ano/semana atual); um registro novo também conta
+  const hasFirstDrink = hadHistory === true || history.length > 0;
+  const firstDrinkLoaded = hadHistory !== null;
 
   return (
     <HistoryContext.Provider
-      value={{ history, addToHistory, removeFromHistory, hasFirstDrink }}
+      value={{ history, addToHistory, removeFromHistory, hasFirstDrink, firstDrinkLoaded }}
     >
       {children}
     </HistoryContext.Provider>
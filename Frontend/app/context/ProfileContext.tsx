@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useEffect, useState } from "react";
 import api from "../services/api";
+import { loadBootstrap } from "../services/bootstrap";
 import {
   calculateDailyWaterTarget,
   calculateExtraExerciseMission,
@@ -43,25 +44,31 @@ export const ProfileProvider: React.FC<{ children: React.ReactNode }> = ({ child
   const [profile, setProfile] = useState<Profile | null>(null);
   const [loading, setLoading] = useState(true);
 
-  const fetchProfile = async () => {
-    const res = await api.get("/perfil");
+  const applyProfile = (raw: any) => {
     const data: Profile = {
-      id: res.data.id,
-      name: res.data.name,
-      activityTime: res.data.activity_time,
-      weightKg: res.data.weight_kg,
-      ambientTempC: res.data.ambient_temp_c,
-      level: res.data.level,
-      currentXP: res.data.current_xp,
-      xpToNext: res.data.xp_to_next,
+      id: raw.id,
+      name: raw.name,
+      activityTime: raw.activity_time,
+      weightKg: raw.weight_kg,
+      ambientTempC: raw.ambient_temp_c,
+      level: raw.level,
+      currentXP: raw.current_xp,
+      xpToNext: raw.xp_to_next,
     };
     setProfile(data);
   };
 
+  const fetchProfile = async () => {
+    const res = await api.get("/perfil");
+    applyProfile(res.data);
+  };
+
   useEffect(() => {
     (async () => {
       try {
-        await fetchProfile();
+        // Na abertura o perfil vem do /bootstrap (mesma requisição dos registros de hoje)
+        const data = await loadBootstrap();
+        applyProfile(data.profile);
       } catch (err) {
         console.error("Erro ao carregar perfil:", err);
       } finally {
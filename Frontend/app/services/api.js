@@ -9,6 +9,15 @@ const api = axios.create({
   },
 });
 
+// Cache das respostas GET com ETag (/perfil, /historico)
+// O backend responde 304 sem corpo quando nada mudou; aí reaproveitamos a resposta guardada
+const etagCache = new Map();
+const cacheKey = (config) => `${config.url}?${JSON.stringify(config.params || {})}`;
+
+// Read-your-writes: depois de uma escrita o backend responde com X-Last-Write e, enquanto
+// ele for reenviado, as leituras vão para o banco primário (e não para uma réplica atrasada)
+let lastWrite = null;
+
 // Interceptador para adicionar o token a cada requisição
 api.interceptors.request.use(
   async (config) => {
@@ -16,6 +25,16 @@ api.interceptors.request.use(
     if (token) {
       config.headers["Authorization"] = `Bearer ${token}`;
     }
+    if (lastWrite) {
+      config.headers["X-Last-Write"] = lastWrite;
+    }
+    if (config.method === "get") {
+      const cached = etagCache.get(cacheKey(config));
+      if (cached) {
+        config.headers["If-None-Match"] = cached.etag;
+        config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+      }
+    }
     return config;
   },
   (error) => {
@@ -24,7 +43,22 @@ api.interceptors.request.use(
 );
 
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if (response.headers["x-last-write"]) {
+      lastWrite = response.headers["x-last-write"];
+    }
+    if (response.config.method !== "get") return response;
+    const key = cacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      return { ...response, status: 200, data: cached.data, headers: cached.headers };
+    }
+    const etag = response.headers["etag"];
+    if (etag) {
+      etagCache.set(key, { etag, data: response.data, headers: response.headers });
+    }
+    return response;
+  },
   (error) => {
     console.error("Erro na requisicao:", error.response?.data || error.message);
     return Promise.reject(error);
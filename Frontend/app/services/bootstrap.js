@@ -0,0 +1,30 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import api from "./api";
+
+// Abertura do app: perfil, meta e registros de hoje numa requisição só (GET /bootstrap)
+// ProfileContext e HistoryContext montam juntos; os dois usam a mesma requisição.
+// A resposta só vale para essa abertura: depois que os dois leram (ou se o token mudou, ex:
+// logout e login com outro usuário), a próxima chamada busca de novo
+const READERS = 2;   // ProfileContext e HistoryContext
+let pending = null;  // { token, promise, readers }
+
+export const loadBootstrap = async () => {
+  const token = await AsyncStorage.getItem('token');
+  if (!pending || pending.token !== token) {
+    const entry = { token, promise: api.get("/bootstrap/").then((res) => res.data), readers: 0 };
+    pending = entry;
+    // Se falhar, a próxima chamada tenta de novo
+    entry.promise.catch(() => {
+      if (pending === entry) pending = null;
+    });
+  }
+  const entry = pending;
+  entry.readers += 1;
+  if (entry.readers >= READERS) pending = null;
+  return entry.promise;
+};
+
+// Logout: descarta a resposta guardada
+export const clearBootstrap = () => {
+  pending = null;
+};
@@ -19,6 +19,7 @@ import {
 } from 'react-native';
 import { useHistory } from '../context/HistoryContext';
 import { Profile as ProfileCtxType, useProfile } from '../context/ProfileContext';
+import { clearBootstrap } from '../services/bootstrap';
 
 const SCREEN_WIDTH = Dimensions.get('window').width;
 const PALETTE = {
@@ -101,7 +102,7 @@ export default function Perfil() {
     updateProfileField,
   } = useProfile();
 
-  const { hasFirstDrink } = useHistory();
+  const { hasFirstDrink, firstDrinkLoaded } = useHistory();
 
   const [modalVisible, setModalVisible] = useState(false);
   const [currentField, setCurrentField] = useState<BackendFieldKeys | null>(null);
@@ -109,22 +110,31 @@ export default function Perfil() {
 
   const [achievementPopupVisible, setAchievementPopupVisible] = useState(false);
   const hasFirstDrinkRef = useRef(hasFirstDrink);
+  const firstDrinkLoadedRef = useRef(firstDrinkLoaded);
 
   // novo estado para guardar a data da conquista "Primeiro Gole"
   const [firstDrinkDate, setFirstDrinkDate] = useState<string | null>(null);
 
   // popup conquista + registrar data/hora quando desbloqueia
   useEffect(() => {
+    // Até a resposta do backend (inclusive ela), só guarda o valor: quem já tinha registros
+    // não ganha o popup de novo ao abrir o app
+    if (!firstDrinkLoadedRef.current) {
+      firstDrinkLoadedRef.current = firstDrinkLoaded;
+      hasFirstDrinkRef.current = hasFirstDrink;
+      return;
+    }
     if (!hasFirstDrinkRef.current && hasFirstDrink) {
       const now = new Date().toISOString();
       setFirstDrinkDate(now);
       setAchievementPopupVisible(true);
     }
     hasFirstDrinkRef.current = hasFirstDrink;
-  }, [hasFirstDrink]);
+  }, [hasFirstDrink, firstDrinkLoaded]);
 
   const handleLogout = async () => {
     await AsyncStorage.removeItem('token');
+    clearBootstrap();
     router.replace('/auth/login');
   };
 
@@ -1,12 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI  # Importa a classe FastAPI, que é usada para criar a aplicação web
 from api.routes.history import router as historyRouter  # Importa o "router" das rotas de histórico e dá o nome de historyRouter
 from api.routes.profile import router as profileRouter  # Importa o "router" das rotas de histórico e dá o nome de profileRouter
 from api.routes.user import router as userRouter # Importa o "router" das rotas de histórico e dá o nome de userRouter
 from api.routes.auth import router as authRouter # Importa o "router" das rotas de histórico e dá o nome de authRouter
+from api.routes.realtime import router as realtimeRouter # Importa o "router" do WebSocket de tempo real
+from api.routes.ranking import router as rankingRouter # Importa o "router" das rotas de ranking
+from api.routes.bootstrap import router as bootstrapRouter # Importa o "router" da abertura do app
+from api.routes.health import router as healthRouter # Importa o "router" do GET /ready
 from fastapi.middleware.cors import CORSMiddleware
+from api.database import LAST_WRITE_HEADER, ReadYourWritesMiddleware
+from api.logger import setup_logging
+from api.metrics import MetricsMiddleware, router as metricsRouter
+from api.realtime import hub
+from api.responses import DefaultResponse
+from api.services.rankingService import ranking
+from api.services.writeBuffer import write_buffer
+from api.settings import settings
+
+# Configura os logs (nível e formato vêm do Settings / .env)
+setup_logging()
+
+# Início e fim da aplicação: liga/desliga o hub de eventos em tempo real
+# (com REALTIME_BACKEND=postgres, abre a conexão do LISTEN), a recarga periódica do ranking
+# e o group commit do POST /historico (que grava o que ainda está na fila ao desligar)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await hub.start()
+    await ranking.start()
+    if settings.HISTORY_GROUP_COMMIT:
+        await write_buffer.start()
+    yield
+    await write_buffer.stop()
+    await ranking.stop()
+    await hub.stop()
 
 # Cria uma instância da aplicação FastAPI
-app = FastAPI()
+# (com FAST_JSON=true as respostas usam orjson; veja api/responses.py)
+app = FastAPI(lifespan=lifespan, default_response_class=DefaultResponse)
 
 # Define uma rota básica usando o decorator @app.get("/")
 # Quando alguém acessar a URL raiz ("/"), essa função será executada
@@ -21,6 +52,11 @@ app.include_router(historyRouter)
 app.include_router(profileRouter)
 app.include_router(userRouter)
 app.include_router(authRouter)
+app.include_router(realtimeRouter)  # WebSocket /ws
+app.include_router(rankingRouter)
+app.include_router(bootstrapRouter)  # GET /bootstrap (perfil + meta + registros de hoje)
+app.include_router(metricsRouter)  # GET /metrics (formato Prometheus, fora do /docs)
+app.include_router(healthRouter)  # GET /ready (prontidão: pool de conexões e banco)
 # adicionando o middleware à nossa aplicação FastAPI
 # Isso permite controlar quem pode acessar a nossa API a partir de outros domínios
 app.add_middleware(
@@ -29,4 +65,11 @@ app.add_middleware(
     allow_credentials=True,  # Permite que cookies e credenciais sejam enviados nas requisições
     allow_methods=["*"],  # "*" permite todos os métodos HTTP (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # "*" permite todos os cabeçalhos nas requisições
-)
\ No newline at end of file
+    expose_headers=["X-Next-Cursor", "ETag", LAST_WRITE_HEADER],  # Deixa o app (web) ler o cursor da próxima página, o ETag e o X-Last-Write
+)
+
+# Read-your-writes entre workers: lê/devolve o X-Last-Write (database.py)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Mede latência, consultas SQL e tempo de banco de cada requisição (adicionado por último = roda primeiro)
+app.add_middleware(MetricsMiddleware)
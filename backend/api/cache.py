@@ -0,0 +1,41 @@
+import time
+from collections import OrderedDict
+
+
+# Cache simples em memória (por processo) com expiração e limite de itens
+# - ttl: segundos que cada item fica válido
+# - maxsize: quando enche, descarta o item usado há mais tempo (LRU)
+# Cada worker tem o seu próprio cache, por isso o TTL deve ser curto:
+# é ele que garante que mudanças feitas em outro processo apareçam.
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # chave -> (expira_em, valor)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)  # Marca como usado recentemente
+        return value
+
+    def set(self, key, value) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)  # Remove o menos usado
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,76 @@
+# Recalcula as metas de hidratação de todos os perfis de uma vez (modo em lote com NumPy)
+# Pensado para rodar à noite; gera um CSV com as metas e o consumo do dia.
+#
+# Uso (na pasta backend, com o extra "jobs" instalado):
+#   python -m api.jobs.goals                        # CSV na saída padrão
+#   python -m api.jobs.goals --output metas.csv
+import argparse
+import asyncio
+import csv
+import sys
+
+from sqlalchemy import and_, func, select
+
+from ..database import AsyncSessionLocal, engine
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.profileModel import Profile
+from ..models import historyModel, userModel  # noqa: F401 - registra as models dos relacionamentos
+from ..services.historyService import rollup_today
+from ..utils.waterUtils import calculate_water_goals_bulk
+
+
+async def load_profiles(db, day):
+    # Perfis com o total bebido no dia (0 se não bebeu nada)
+    result = await db.execute(
+        select(
+            Profile.id,
+            Profile.weight_kg,
+            Profile.activity_time,
+            Profile.ambient_temp_c,
+            func.coalesce(HistoricoDiario.total_ml, 0.0),
+        )
+        .outerjoin(
+            HistoricoDiario,
+            and_(HistoricoDiario.profile_id == Profile.id, HistoricoDiario.day == day),
+        )
+        .order_by(Profile.id)
+    )
+    return result.all()
+
+
+async def run(output) -> None:
+    day = rollup_today()
+    async with AsyncSessionLocal() as db:
+        rows = await load_profiles(db, day)
+    await engine.dispose()
+
+    ids, weights, activity, temps, consumed = zip(*rows) if rows else ((),) * 5
+    goals = calculate_water_goals_bulk(weights, activity, temps)
+
+    writer = csv.writer(output)
+    writer.writerow(["profile_id", "day", "daily_target_ml", "per_mission_ml",
+                     "extra_mission_ml", "total_target_ml", "consumed_ml", "goal_met"])
+    for i, profile_id in enumerate(ids):
+        total = goals["total_target_ml"][i]
+        writer.writerow([
+            profile_id,
+            day.isoformat(),
+            goals["daily_target_ml"][i],
+            goals["per_mission_ml"][i],
+            goals["extra_mission_ml"][i],
+            total,
+            consumed[i],
+            total > 0 and consumed[i] >= total,
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula as metas de hidratação de todos os perfis")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout,
+                        help="arquivo CSV de saída (padrão: saída padrão)")
+    args = parser.parse_args()
+    asyncio.run(run(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# Manutenção das partições mensais de "historico"
+# - cria as partições dos próximos meses (e dos meses que caíram na historico_default)
+# - arquiva os meses mais antigos que HISTORY_RETENTION_MONTHS em Parquet e tira do banco
+# - apaga do change-log (historico_changes) as alterações com mais de HISTORY_CHANGES_RETENTION_DAYS dias
+# Pensado para rodar todo dia (cron); rodar de novo não repete trabalho.
+#
+# Uso (na pasta backend, com o extra "jobs" instalado para arquivar):
+#   python -m api.jobs.retention                     # cria partições e arquiva
+#   python -m api.jobs.retention --dry-run           # só mostra o que faria
+#   python -m api.jobs.retention --keep-months 36    # mantém 3 anos no banco
+#   python -m api.jobs.retention --keep-change-days 30   # change-log do /historico/sync com 30 dias
+import argparse
+import asyncio
+import os
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import text
+
+from ..database import AsyncSessionLocal, engine
+from ..services.archiveService import ARCHIVE_COLUMNS, archive_path
+from ..settings import settings
+
+# O resumo "Anual" em outro fuso lê os registros do ano inteiro direto de "historico";
+# com pelo menos 13 meses no banco, o ano atual nunca está arquivado
+MIN_KEEP_MONTHS = 13
+ARCHIVE_BATCH_SIZE = 50_000   # Linhas lidas do banco por vez ao gerar o Parquet
+_PARTITION_NAME = re.compile(r"^historico_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"historico_{month:%Y_%m}"
+
+
+async def list_partitions(db) -> dict[date, str]:
+    # Partições mensais atuais de "historico" (mês -> nome), sem a historico_default
+    result = await db.execute(text(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'historico'::regclass
+        """
+    ))
+    partitions = {}
+    for (name,) in result:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+async def months_in_default(db) -> list[date]:
+    # Meses com registros que caíram na partição default (sem partição própria)
+    result = await db.execute(text(
+        "SELECT DISTINCT date_trunc('month', time)::date FROM historico_default ORDER BY 1"
+    ))
+    return [row[0] for row in result]
+
+
+async def create_partition(db, month: date) -> None:
+    # Cria a partição como tabela comum, move para ela os registros do mês que estavam
+    # na default e só então anexa (anexar com linhas do mês na default daria erro)
+    name = partition_name(month)
+    start, end = month, add_months(month, 1)
+    await db.execute(text(f'CREATE TABLE "{name}" (LIKE historico INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    await db.execute(text(
+        f"""
+        WITH moved AS (
+            DELETE FROM historico_default
+            WHERE time >= :start AND time < :end
+            RETURNING id, profile_id, amount, time, client_id
+        )
+        INSERT INTO "{name}" (id, profile_id, amount, time, client_id)
+        SELECT id, profile_id, amount, time, client_id FROM moved
+        """
+    ), {"start": start, "end": end})
+    await db.execute(text(
+        f"ALTER TABLE historico ATTACH PARTITION \"{name}\" FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    await db.commit()
+
+
+async def ensure_partitions(db, months_ahead: int, dry_run: bool = False) -> list[date]:
+    existing = await list_partitions(db)
+    current = date.today().replace(day=1)
+    wanted = {add_months(current, n) for n in range(months_ahead + 1)}
+    wanted.update(await months_in_default(db))
+    created = []
+    for month in sorted(wanted - existing.keys()):
+        if not dry_run:
+            await create_partition(db, month)
+        created.append(month)
+    return created
+
+
+def archive_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int32()),
+        ("profile_id", pa.int32()),
+        ("amount", pa.float64()),
+        ("time", pa.timestamp("us")),
+        ("client_id", pa.string()),
+    ])
+
+
+def write_batch(writer, schema, rows) -> None:
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    writer.write_table(pa.Table.from_arrays(
+        [pa.array(column, type=schema.field(i).type) for i, column in enumerate(columns)],
+        schema=schema,
+    ))
+
+
+def merge_existing_archive(writer, schema, path, partition_ids) -> int:
+    # O mês já tinha arquivo (registros atrasados que voltaram a cair nesse mês):
+    # copia o que já estava arquivado, menos o que também está na partição (nova tentativa)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    existing = pq.read_table(path, schema=schema)
+    existing = existing.filter(pc.invert(pc.is_in(existing["id"], value_set=pa.array(partition_ids, pa.int32()))))
+    writer.write_table(existing)
+    return existing.num_rows
+
+
+async def archive_partition(db, month: date, name: str) -> int:
+    import pyarrow.parquet as pq
+
+    path = archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"  # Só vira o arquivo final no fim (nunca deixa arquivo pela metade)
+    schema = archive_schema()
+
+    written = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            if path.exists():
+                ids = (await db.execute(text(f'SELECT id FROM "{name}"'))).scalars().all()
+                written += await asyncio.to_thread(merge_existing_archive, writer, schema, path, ids)
+
+            # Lê a partição em ordem de perfil (o filtro por perfil na exportação pula o resto
+            # do arquivo) e grava lote a lote, sem carregar o mês inteiro na memória.
+            # A leitura usa outra sessão: o cursor aberto impediria o DROP TABLE nesta.
+            async with AsyncSessionLocal() as reader:
+                columns = ", ".join(ARCHIVE_COLUMNS)
+                result = await reader.stream(
+                    text(f'SELECT {columns} FROM "{name}" ORDER BY profile_id, time, id')
+                    .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+                )
+                async for rows in result.partitions():
+                    await asyncio.to_thread(write_batch, writer, schema, rows)
+                    written += len(rows)
+
+        # Tira a partição do banco; o arquivo só entra no lugar logo antes do commit.
+        # Se o commit falhar depois disso, a próxima execução refaz o arquivo sem duplicar
+        # (e a exportação nunca lê do banco os meses que já têm arquivo)
+        await db.execute(text(f'ALTER TABLE historico DETACH PARTITION "{name}"'))
+        await db.execute(text(f'DROP TABLE "{name}"'))
+        os.replace(tmp_path, path)
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+async def archive_old_partitions(db, keep_months: int, dry_run: bool = False) -> list[tuple[date, int]]:
+    cutoff = add_months(date.today().replace(day=1), -keep_months)
+    partitions = await list_partitions(db)
+    archived = []
+    for month in sorted(m for m in partitions if m < cutoff):
+        rows = 0 if dry_run else await archive_partition(db, month, partitions[month])
+        archived.append((month, rows))
+    return archived
+
+
+async def prune_changes(db, keep_days: int, dry_run: bool = False) -> int:
+    # Apaga as alterações antigas do change-log e sobe o horizonte (historico_changes_horizon):
+    # quem sincronizar com um watermark abaixo dele recebe "resync" no /historico/sync.
+    # "seq" cresce junto com created_at, então o corte vira um seq (leitura pela chave primária):
+    # sai tudo antes da primeira alteração recente, ou tudo se não houver nenhuma.
+    last = (await db.execute(text(
+        """
+        SELECT max(seq) FROM historico_changes
+        WHERE seq < coalesce(
+            (SELECT seq FROM historico_changes
+             WHERE created_at >= now() - :days * interval '1 day'
+             ORDER BY seq LIMIT 1),
+            (SELECT max(seq) + 1 FROM historico_changes)
+        )
+        """
+    ), {"days": keep_days})).scalar()
+    if last is None:
+        return 0
+    if dry_run:
+        return (await db.execute(text("SELECT count(*) FROM historico_changes WHERE seq <= :last"), {"last": last})).scalar()
+
+    # Horizonte e DELETE na mesma transação: um sync nunca vê as linhas sumirem sem o horizonte
+    await db.execute(text(
+        """
+        INSERT INTO historico_changes_horizon (id, seq, pruned_at) VALUES (1, :last, now())
+        ON CONFLICT (id) DO UPDATE SET seq = greatest(historico_changes_horizon.seq, excluded.seq), pruned_at = now()
+        """
+    ), {"last": last})
+    result = await db.execute(text("DELETE FROM historico_changes WHERE seq <= :last"), {"last": last})
+    await db.commit()
+    return result.rowcount
+
+
+async def run(months_ahead: int, keep_months: int, keep_change_days: int, dry_run: bool) -> int:
+    if keep_months < MIN_KEEP_MONTHS:
+        print(f"❌ --keep-months precisa ser pelo menos {MIN_KEEP_MONTHS}")
+        return 1
+
+    async with AsyncSessionLocal() as db:
+        for month in await ensure_partitions(db, months_ahead, dry_run):
+            print(f"partição {partition_name(month)} criada")
+        for month, rows in await archive_old_partitions(db, keep_months, dry_run):
+            print(f"partição {partition_name(month)} arquivada em {archive_path(month)} ({rows} registros)")
+        pruned = await prune_changes(db, keep_change_days, dry_run)
+        print(f"change-log: {pruned} alterações com mais de {keep_change_days} dias apagadas")
+    await engine.dispose()
+    if dry_run:
+        print("(dry-run: nada foi alterado)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cria partições futuras e arquiva as antigas do histórico")
+    parser.add_argument("--months-ahead", type=int, default=settings.HISTORY_PARTITIONS_AHEAD,
+                        help="meses futuros com partição criada")
+    parser.add_argument("--keep-months", type=int, default=settings.HISTORY_RETENTION_MONTHS,
+                        help="meses mantidos no banco")
+    parser.add_argument("--keep-change-days", type=int, default=settings.HISTORY_CHANGES_RETENTION_DAYS,
+                        help="dias mantidos no change-log do /historico/sync")
+    parser.add_argument("--dry-run", action="store_true", help="só mostra o que faria")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.months_ahead, args.keep_months, args.keep_change_days, args.dry_run)))
+
+
+if __name__ == "__main__":
+    main()
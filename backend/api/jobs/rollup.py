@@ -0,0 +1,124 @@
+# Verificação da tabela historico_diario contra os registros de "historico"
+#
+# Uso (na pasta backend):
+#   python -m api.jobs.rollup                  # lista os dias divergentes (sai com código 1 se houver)
+#   python -m api.jobs.rollup --fix            # corrige os dias divergentes
+#   python -m api.jobs.rollup --profile 42     # verifica só um perfil
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..database import AsyncSessionLocal, engine
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.historyModel import Historico
+from ..models import profileModel, userModel  # noqa: F401 - registra as models dos relacionamentos
+from ..services.archiveService import archived_until
+from ..services.historyService import rollup_day
+
+TOLERANCE_ML = 0.001  # Diferença aceitável de soma (os totais são float)
+
+
+async def find_mismatches(db, profile_id=None, since=None):
+    # Recalcula os totais diários a partir dos registros e compara com a tabela de resumo
+    # "since": ignora os dias anteriores (meses arquivados não estão mais em "historico")
+    day = rollup_day(Historico.time)
+    raw = select(
+        Historico.profile_id.label("profile_id"),
+        day.label("day"),
+        func.sum(Historico.amount).label("total_ml"),
+        func.count(Historico.id).label("count"),
+    )
+    if profile_id is not None:
+        raw = raw.where(Historico.profile_id == profile_id)
+    if since is not None:
+        raw = raw.where(day >= since)
+    raw = raw.group_by(Historico.profile_id, day).subquery("raw")
+
+    rollup = select(HistoricoDiario)
+    if profile_id is not None:
+        rollup = rollup.where(HistoricoDiario.profile_id == profile_id)
+    if since is not None:
+        rollup = rollup.where(HistoricoDiario.day >= since)
+    rollup = rollup.subquery("rollup")
+
+    expected_total = func.coalesce(raw.c.total_ml, literal(0.0))
+    expected_count = func.coalesce(raw.c.count, literal(0))
+    stored_total = func.coalesce(rollup.c.total_ml, literal(0.0))
+    stored_count = func.coalesce(rollup.c.count, literal(0))
+
+    stmt = (
+        select(
+            func.coalesce(raw.c.profile_id, rollup.c.profile_id).label("profile_id"),
+            func.coalesce(raw.c.day, rollup.c.day).label("day"),
+            expected_total.label("expected_total"),
+            expected_count.label("expected_count"),
+            stored_total.label("stored_total"),
+            stored_count.label("stored_count"),
+        )
+        .select_from(
+            raw.outerjoin(
+                rollup,
+                and_(raw.c.profile_id == rollup.c.profile_id, raw.c.day == rollup.c.day),
+                full=True,
+            )
+        )
+        .where(
+            or_(
+                func.abs(expected_total - stored_total) > TOLERANCE_ML,
+                expected_count != stored_count,
+            )
+        )
+        .order_by("profile_id", "day")
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def fix_mismatches(db, mismatches) -> None:
+    # Grava os totais recalculados por cima dos divergentes
+    for row in mismatches:
+        stmt = pg_insert(HistoricoDiario).values(
+            profile_id=row.profile_id,
+            day=row.day,
+            total_ml=row.expected_total,
+            count=row.expected_count,
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["profile_id", "day"],
+                set_={"total_ml": stmt.excluded.total_ml, "count": stmt.excluded.count},
+            )
+        )
+    await db.commit()
+
+
+async def run(fix: bool, profile_id=None) -> int:
+    async with AsyncSessionLocal() as db:
+        mismatches = await find_mismatches(db, profile_id, since=archived_until())
+        for row in mismatches:
+            print(
+                f"perfil {row.profile_id} dia {row.day}: "
+                f"esperado {row.expected_total} mL/{row.expected_count} registros, "
+                f"encontrado {row.stored_total} mL/{row.stored_count} registros"
+            )
+        if mismatches and fix:
+            await fix_mismatches(db, mismatches)
+            print(f"✅ {len(mismatches)} dia(s) corrigido(s)")
+        elif not mismatches:
+            print("✅ historico_diario consistente")
+    await engine.dispose()
+    return 1 if mismatches and not fix else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica historico_diario contra historico")
+    parser.add_argument("--fix", action="store_true", help="corrige os dias divergentes")
+    parser.add_argument("--profile", type=int, default=None, help="verifica só este perfil")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.fix, args.profile)))
+
+
+if __name__ == "__main__":
+    main()
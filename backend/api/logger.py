@@ -0,0 +1,54 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from .settings import settings
+
+# Campos padrão de todo LogRecord; o que sobrar veio do "extra=" e vai para o JSON
+_STANDARD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+# Formata cada log como uma linha JSON (fácil de filtrar em qualquer coletor de logs)
+# Exemplo: {"ts": "...", "level": "INFO", "logger": "aquaquest.http", "msg": "request", "route": "/historico/", ...}
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_FIELDS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+# Logger raiz da aplicação: use get_logger("parte") para criar "aquaquest.parte"
+logger = logging.getLogger("aquaquest")
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logger.getChild(name)
+
+
+def setup_logging() -> None:
+    # Configura o logger da aplicação a partir do Settings
+    # LOG_ENABLED=false desliga tudo; LOG_LEVEL=DEBUG mostra abertura/fechamento de sessões
+    logger.handlers.clear()
+    logger.propagate = False
+    if not settings.LOG_ENABLED:
+        # Nível acima de CRITICAL: os loggers filhos (aquaquest.http, aquaquest.db) herdam e não emitem nada
+        logger.setLevel(logging.CRITICAL + 1)
+        return
+    logger.setLevel(settings.LOG_LEVEL.upper())
+
+    handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+    logger.addHandler(handler)
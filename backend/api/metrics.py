@@ -0,0 +1,174 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .logger import get_logger
+
+# ---------------------------
+# Métricas (formato Prometheus, expostas em GET /metrics)
+# ---------------------------
+REQUEST_LATENCY = Histogram(
+    "aquaquest_http_request_duration_seconds",
+    "Tempo de resposta por rota",
+    ["method", "route", "status"],
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "aquaquest_db_queries_per_request",
+    "Consultas SQL executadas por requisição",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "aquaquest_db_time_per_request_seconds",
+    "Tempo gasto em consultas SQL por requisição",
+    ["method", "route"],
+)
+DB_QUERIES = Counter(
+    "aquaquest_db_queries_total",
+    "Total de consultas SQL executadas",
+    ["method", "route"],
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "aquaquest_db_pool_checkout_wait_seconds",
+    "Tempo esperando uma conexão livre no pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+READ_ROUTING = Counter(
+    "aquaquest_db_read_routing_total",
+    "Sessões só de leitura por destino (réplica ou primário)",
+    ["target"],
+)
+REQUESTS_REJECTED = Counter(
+    "aquaquest_requests_rejected_total",
+    "Requisições recusadas pelo limite (rate: 429 por ritmo, in_flight: 429 por simultâneas do usuário, busy: 503 rota lotada)",
+    ["limit", "reason"],
+)
+PASSWORD_HASH_TIME = Histogram(
+    "aquaquest_password_hash_seconds",
+    "Tempo de cada hash/verificação de senha (Argon2)",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+STARTUP_TIME = Gauge(
+    "aquaquest_startup_seconds",
+    "Tempo de inicialização (python -m api.serve): import da aplicação e worker até ficar pronto",
+    ["phase"],
+    multiprocess_mode="livemax",   # Vários workers: o maior entre os processos vivos
+)
+
+request_logger = get_logger("http")
+
+
+# Contadores da requisição atual (compartilhados com os eventos do SQLAlchemy via contextvar)
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# ---------------------------
+# Middleware de latência
+# ---------------------------
+# Middleware ASGI puro (mais leve que @app.middleware): mede a requisição inteira,
+# inclusive o envio do corpo em respostas de streaming.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+
+            # Usa o caminho da rota (ex: /historico/{id}) e não a URL, para não explodir os rótulos
+            route = scope.get("route")
+            route_path = getattr(route, "path", "não encontrada")
+            if route_path != "/metrics":
+                REQUEST_LATENCY.labels(scope["method"], route_path, status_code).observe(elapsed)
+                DB_QUERIES_PER_REQUEST.labels(scope["method"], route_path).observe(stats.queries)
+                DB_TIME_PER_REQUEST.labels(scope["method"], route_path).observe(stats.db_time)
+                DB_QUERIES.labels(scope["method"], route_path).inc(stats.queries)
+                request_logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"],
+                        "route": route_path,
+                        "status": status_code,
+                        "duration_ms": round(elapsed * 1000, 2),
+                        "db_queries": stats.queries,
+                        "db_ms": round(stats.db_time * 1000, 2),
+                    },
+                )
+
+
+# ---------------------------
+# Eventos do SQLAlchemy
+# ---------------------------
+def instrument_engine(engine) -> None:
+    # Conta as consultas e o tempo de banco de cada requisição
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+
+# Pool de conexões que mede quanto tempo cada requisição esperou por uma conexão livre
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+# ---------------------------
+# GET /metrics
+# ---------------------------
+router = APIRouter(tags=["📈 Métricas"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # python -m api.serve: soma os arquivos de métricas de todos os workers, não só deste
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
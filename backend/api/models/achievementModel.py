@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, ForeignKey, String, func
+from .base import Base
+
+
+# Conquistas desbloqueadas por perfil (a lista de conquistas fica em utils/achievementUtils.py)
+# A linha some se a conquista deixar de valer (ex: registro apagado que quebrou uma sequência)
+class ProfileAchievement(Base):
+    __tablename__ = "profile_achievements"
+
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), primary_key=True)
+    code: Mapped[str] = mapped_column(String(32), primary_key=True)
+    unlocked_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
@@ -0,0 +1,18 @@
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Boolean, Date, Float, ForeignKey, Integer, false
+from .base import Base
+
+
+# Totais diários do histórico por perfil (tabela de resumo)
+# Mantida junto com cada INSERT/DELETE em "historico", na mesma transação.
+# O "dia" é a data no fuso settings.TIMEZONE.
+class HistoricoDiario(Base):
+    __tablename__ = "historico_diario"
+
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    total_ml: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Meta do dia batida (com a meta do perfil na hora da última escrita nesse dia)
+    goal_met: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, String, func
+from .base import Base
+
+
+# Registro de alterações do histórico (change-log) para a sincronização incremental
+# Cada INSERT/DELETE em "historico" grava uma linha aqui, na mesma transação.
+# "seq" só cresce: o app guarda o último seq recebido (watermark) e pede só o que veio depois.
+# O job de retenção apaga as alterações com mais de HISTORY_CHANGES_RETENTION_DAYS dias.
+class HistoricoChange(Base):
+    __tablename__ = "historico_changes"
+    __table_args__ = (
+        # Consulta do /historico/sync: alterações de um perfil depois de um seq
+        Index("ix_historico_changes_profile_id_seq", "profile_id", "seq"),
+    )
+
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
+    historico_id: Mapped[int] = mapped_column(Integer, nullable=False)  # Sem FK: o registro pode ter sido apagado
+    op: Mapped[str] = mapped_column(String(6), nullable=False)          # "insert" ou "delete"
+    amount: Mapped[Optional[float]] = mapped_column(Float, nullable=True)      # Só nos "insert"
+    time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # Só nos "insert"
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Horizonte do change-log (uma linha só, id = 1): o maior seq já apagado pelo job de retenção.
+# Um app com watermark abaixo dele perdeu alterações: o /historico/sync responde "resync".
+class HistoricoChangeHorizon(Base):
+    __tablename__ = "historico_changes_horizon"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    pruned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
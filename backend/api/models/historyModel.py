@@ -1,16 +1,42 @@
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import func, ForeignKey
+from sqlalchemy import func, ForeignKey, Index, String
 from .base import Base
 
 
+# Tabela particionada por mês em "time" (historico_AAAA_MM + historico_default)
+# As partições futuras são criadas e as antigas arquivadas pelo job api.jobs.retention.
+# Em tabela particionada a chave primária e as únicas precisam incluir "time".
+HISTORY_ID_SEQUENCE = "historico_id_seq"   # Sequência do id, a mesma em todas as partições
+
+
 class Historico(Base):
     __tablename__ = 'historico'
+    __table_args__ = (
+        # Índice composto usado pela listagem paginada e pelos resumos por período
+        Index("ix_historico_profile_id_time", "profile_id", "time"),
+        {"postgresql_partition_by": "RANGE (time)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
     amount: Mapped[float] = mapped_column(nullable=False)
-    time: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
+    time: Mapped[datetime] = mapped_column(primary_key=True, server_default=func.now(), nullable=False)
+    client_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # Gerado pelo app (ex: UUID), ver HistoricoClientId
 
     # relacionamento SEM import direto
     profile: Mapped["Profile"] = relationship("Profile", back_populates="historico")
+
+
+# Chaves de idempotência do envio em lote (POST /historico/lote), fora da tabela particionada:
+# em "historico" a única teria que incluir "time", e um reenvio com outro horário duplicaria o registro.
+# Guarda o registro criado, então o reenvio devolve o original mesmo depois de apagado ou arquivado.
+class HistoricoClientId(Base):
+    __tablename__ = "historico_client_ids"
+
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), primary_key=True)
+    client_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    historico_id: Mapped[int] = mapped_column(nullable=False)
+    amount: Mapped[float] = mapped_column(nullable=False)
+    time: Mapped[datetime] = mapped_column(nullable=False)
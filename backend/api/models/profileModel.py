@@ -7,7 +7,7 @@ class Profile(Base):
     __tablename__ = "profiles"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     activity_time: Mapped[int] = mapped_column(Integer, default=0)
     weight_kg: Mapped[float] = mapped_column(Float, default=0.0)
@@ -15,6 +15,8 @@ class Profile(Base):
     level: Mapped[int] = mapped_column(Integer, default=1)
     current_xp: Mapped[int] = mapped_column(Integer, default=0)
     xp_to_next: Mapped[int] = mapped_column(Integer, default=100)
+    # Sobe a cada escrita no perfil ou no histórico dele (base dos ETags de /perfil e /historico)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     # relacionamentos SEM imports diretos
     user: Mapped["User"] = relationship("User", back_populates="profiles")
@@ -0,0 +1,16 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Float, ForeignKey, Integer
+from .base import Base
+
+
+# Contadores das conquistas de cada perfil, atualizados a cada INSERT/DELETE em "historico"
+# na mesma transação (nunca recalculados a partir dos registros).
+# Perfil sem linha aqui é montado uma vez a partir de historico_diario.
+class ProfileStats(Base):
+    __tablename__ = "profile_stats"
+
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), primary_key=True)
+    total_ml: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)   # Água bebida desde sempre
+    entries: Mapped[int] = mapped_column(Integer, nullable=False, default=0)      # Registros no histórico
+    goal_days: Mapped[int] = mapped_column(Integer, nullable=False, default=0)    # Dias com a meta batida
+    best_streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Maior sequência de dias
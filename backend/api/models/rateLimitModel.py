@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Boolean, DateTime, Float, String
+from .base import Base
+
+
+# Baldes do limite de requisições (RATE_LIMIT_BACKEND=postgres, compartilhados entre workers)
+# UNLOGGED: sem WAL (escrita barata); num crash do banco a tabela volta vazia, o que só zera os limites.
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)          # "<limite>:user:<id>" ou "<limite>:ip:<ip>"
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)        # Fichas no balde depois da última requisição
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)      # A última requisição passou? (devolvido no RETURNING)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,20 @@
+from datetime import date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Date, ForeignKey, Index
+from .base import Base
+
+
+# Sequências de dias seguidos com a meta batida (uma linha por sequência)
+# Guardar as sequências como intervalos deixa bater ou perder a meta num dia qualquer
+# (inclusive no passado, via envio em lote ou DELETE) mexer só nas vizinhas:
+# juntar duas sequências, esticar uma, ou partir uma ao meio.
+class StreakRun(Base):
+    __tablename__ = "streak_runs"
+    __table_args__ = (
+        # Sequência que termina num dia (vizinha à esquerda) e a mais recente do perfil
+        Index("ix_streak_runs_profile_id_end_day", "profile_id", "end_day"),
+    )
+
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), primary_key=True)
+    start_day: Mapped[date] = mapped_column(Date, primary_key=True)
+    end_day: Mapped[date] = mapped_column(Date, nullable=False)
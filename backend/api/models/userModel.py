@@ -8,7 +8,7 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
-    email: Mapped[str] = mapped_column(String, nullable=False)
+    email: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)  # Um cadastro por e-mail
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
 
     # relacionamento SEM import direto
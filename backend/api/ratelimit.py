@@ -0,0 +1,209 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from .logger import get_logger
+from .metrics import REQUESTS_REJECTED
+from .models.rateLimitModel import RateLimitBucket
+from .security import Principal, get_current_user
+from .settings import settings
+
+# ---------------------------
+# Limite de requisições e controle de admissão (rotas de escrita e de autenticação)
+# ---------------------------
+# Um cliente com bug em loop (ex: PATCH /perfil com add_xp, POST /historico) não pode tomar o
+# pool de conexões de todo mundo, nem o login virar alvo barato para forçar o Argon2.
+# Cada rota limitada usa Depends(admission("nome")) com três barreiras, nesta ordem:
+# 1. Requisições simultâneas do mesmo usuário/IP na rota -> 429 (recusada aqui não gasta ficha)
+# 2. Balde de fichas (token bucket) por usuário (rotas autenticadas) ou por IP (login/cadastro):
+#    até "burst" seguidas e depois "per_minute" por minuto -> 429 com Retry-After
+# 3. Requisições simultâneas na rota (todos os usuários): as que passam do limite esperam na
+#    fila até ADMISSION_QUEUE_TIMEOUT -> 503 com Retry-After
+# Os baldes ficam no RATE_LIMIT_BACKEND ("memory": por processo; "postgres": compartilhados).
+# As barreiras 1 e 3 são sempre por processo (contam o que este worker está fazendo).
+
+logger = get_logger("ratelimit")
+
+MEMORY_MAX_KEYS = 100_000   # Baldes guardados por processo (os menos usados saem primeiro)
+
+
+@dataclass(frozen=True)
+class Limit:
+    by: str                 # "user" (get_current_user) ou "ip"
+    burst: int              # Requisições seguidas permitidas (tamanho do balde)
+    per_minute: float       # Ritmo sustentado (fichas repostas por minuto)
+    user_in_flight: int     # Simultâneas do mesmo usuário/IP
+    route_in_flight: Optional[int] = None   # Simultâneas na rota, por processo (None = conexões do pool)
+
+
+LIMITS = {
+    "login": Limit(by="ip", burst=10, per_minute=10, user_in_flight=2, route_in_flight=16),
+    "cadastro": Limit(by="ip", burst=5, per_minute=2, user_in_flight=2, route_in_flight=8),
+    "historico": Limit(by="user", burst=30, per_minute=60, user_in_flight=4),
+    "historico_lote": Limit(by="user", burst=10, per_minute=12, user_in_flight=2, route_in_flight=16),
+    "perfil": Limit(by="user", burst=30, per_minute=60, user_in_flight=4),
+}
+
+
+# ---------------------------
+# Backends dos baldes
+# ---------------------------
+# take(key, burst, rate) -> (passou?, segundos até a próxima ficha)
+class MemoryBackend:
+    def __init__(self, maxsize: int = MEMORY_MAX_KEYS):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict = OrderedDict()  # chave -> (fichas, momento da última conta)
+
+    async def take(self, key: str, burst: int, rate: float) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+class PostgresBackend:
+    # Um upsert atômico por requisição na tabela rate_limit_buckets (UNLOGGED)
+    # Pool próprio e pequeno, com tempo curto: o limite não disputa conexões com as rotas nem
+    # segura a requisição. Se o banco falhar ou demorar, deixa passar: o limite não pode
+    # derrubar a rota sozinho
+    def __init__(self):
+        self._engine = None
+
+    @property
+    def engine(self):
+        # Criado no primeiro uso, já no worker (python -m api.serve: depois do fork)
+        if self._engine is None:
+            self._engine = create_async_engine(
+                settings.async_database_url,
+                pool_size=settings.RATE_LIMIT_DB_POOL_SIZE,
+                max_overflow=0,
+                pool_timeout=settings.RATE_LIMIT_DB_TIMEOUT,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+                connect_args={"timeout": settings.RATE_LIMIT_DB_TIMEOUT, "command_timeout": settings.RATE_LIMIT_DB_TIMEOUT},
+            )
+        return self._engine
+
+    async def take(self, key: str, burst: int, rate: float) -> tuple[bool, float]:
+        refill = func.least(
+            burst,
+            RateLimitBucket.tokens + func.extract("epoch", func.now() - RateLimitBucket.updated_at) * rate,
+        )
+        stmt = pg_insert(RateLimitBucket).values(key=key, tokens=burst - 1, allowed=True, updated_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "tokens": case((refill >= 1, refill - 1), else_=refill),
+                "allowed": refill >= 1,
+                "updated_at": func.now(),
+            },
+        ).returning(RateLimitBucket.allowed, RateLimitBucket.tokens)
+        try:
+            async with self.engine.begin() as conn:
+                allowed, tokens = (await conn.execute(stmt)).one()
+        except Exception:
+            logger.warning("erro no limite de requisições (postgres); deixando passar", exc_info=True)
+            return True, 0.0
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+def _make_backend():
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBackend()
+    return MemoryBackend()
+
+
+class Admission:
+    def __init__(self, backend):
+        self.backend = backend
+        self._user_in_flight = defaultdict(int)   # (limite, quem) -> requisições em andamento
+        self._gates: dict[str, asyncio.Semaphore] = {}
+
+    def _reject(self, name: str, reason: str, code: int, retry_after: float, detail: str):
+        REQUESTS_REJECTED.labels(name, reason).inc()
+        raise HTTPException(
+            status_code=code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    @asynccontextmanager
+    async def admit(self, name: str, limit: Limit, who: str):
+        key = (name, who)
+        if self._user_in_flight[key] >= limit.user_in_flight:
+            self._reject(name, "in_flight", status.HTTP_429_TOO_MANY_REQUESTS, 1,
+                         "Muitas requisições ao mesmo tempo, tente novamente em instantes")
+        self._user_in_flight[key] += 1
+        try:
+            allowed, retry_after = await self.backend.take(f"{name}:{who}", limit.burst, limit.per_minute / 60)
+            if not allowed:
+                self._reject(name, "rate", status.HTTP_429_TOO_MANY_REQUESTS, retry_after,
+                             "Muitas requisições, tente novamente em instantes")
+
+            gate = self._gates.get(name)
+            if gate is None:
+                size = limit.route_in_flight or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+                gate = self._gates[name] = asyncio.Semaphore(size)
+            try:
+                # asyncio.timeout e não wait_for: no Python 3.11 o wait_for pode estourar o tempo logo
+                # depois de o semáforo ter liberado a vaga, e essa vaga nunca mais voltaria
+                async with asyncio.timeout(settings.ADMISSION_QUEUE_TIMEOUT):
+                    await gate.acquire()
+            except TimeoutError:
+                self._reject(name, "busy", status.HTTP_503_SERVICE_UNAVAILABLE, 1,
+                             "Servidor ocupado, tente novamente em instantes")
+            try:
+                yield
+            finally:
+                gate.release()
+        finally:
+            self._user_in_flight[key] -= 1
+            if not self._user_in_flight[key]:
+                del self._user_in_flight[key]
+
+
+# Controle de admissão do processo
+admission_control = Admission(_make_backend())
+
+
+def client_ip(request: Request) -> str:
+    # Atrás de proxy, o uvicorn já troca pelo X-Forwarded-For quando o proxy está em
+    # FORWARDED_ALLOW_IPS (python -m api.serve; no uvicorn direto: --forwarded-allow-ips)
+    return request.client.host if request.client else "desconhecido"
+
+
+def admission(name: str):
+    # Dependência da rota: @router.post(..., dependencies=[Depends(admission("historico"))])
+    limit = LIMITS[name]
+
+    if limit.by == "ip":
+        async def dependency(request: Request):
+            if not settings.RATE_LIMIT_ENABLED:
+                yield
+                return
+            async with admission_control.admit(name, limit, f"ip:{client_ip(request)}"):
+                yield
+    else:
+        async def dependency(current_user: Principal = Depends(get_current_user)):
+            if not settings.RATE_LIMIT_ENABLED:
+                yield
+                return
+            async with admission_control.admit(name, limit, f"user:{current_user.id}"):
+                yield
+
+    return dependency
@@ -0,0 +1,198 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .logger import get_logger
+from .settings import settings
+
+# ---------------------------
+# Eventos em tempo real (WebSocket /ws)
+# ---------------------------
+# Cada conexão WebSocket assina os eventos do seu perfil no "hub" do processo.
+# As rotas publicam os eventos dentro da transação da escrita e eles só são entregues
+# depois do commit. Quem leva o evento até os hubs depende do REALTIME_BACKEND:
+# - "local": entrega direto no hub deste processo (um worker só)
+# - "postgres": pg_notify na transação + LISTEN em cada worker (vários workers/servidores)
+
+CHANNEL = "aquaquest_events"   # Canal do LISTEN/NOTIFY
+QUEUE_SIZE = 100               # Eventos guardados por conexão antes de mandar "resync"
+NOTIFY_MAX_BYTES = 7000        # O PostgreSQL limita o payload do NOTIFY a 8000 bytes
+
+# Evento enviado quando algo se perdeu (fila cheia, payload grande demais):
+# o app deve chamar GET /historico/sync e GET /perfil para se atualizar
+RESYNC_EVENT = {"type": "resync"}
+
+# Eventos só para os listeners dos workers (ex: invalidar caches), não vão para os WebSockets
+INTERNAL_EVENTS = {"usuario", "historico.total"}
+
+logger = get_logger("realtime")
+
+
+class Hub:
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._listeners = []  # Funções chamadas para todo evento de todo perfil (ex: ranking)
+
+    def add_listener(self, listener) -> None:
+        # listener(profile_id, data): roda no event loop, não pode bloquear
+        self._listeners.append(listener)
+
+    @asynccontextmanager
+    async def subscribe(self, profile_id: int):
+        # Fila de eventos de uma conexão; sai da lista quando o "async with" termina
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[profile_id].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers[profile_id]
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[profile_id]
+
+    def dispatch(self, profile_id: int, data: dict) -> None:
+        # Entrega um evento para os listeners e as conexões deste processo (não bloqueia)
+        self._notify_listeners(profile_id, data)
+        if data["type"] in INTERNAL_EVENTS:
+            return
+        for queue in self._subscribers.get(profile_id, ()):
+            self._put(queue, data)
+
+    def dispatch_all(self, data: dict) -> None:
+        # Evento para o processo inteiro (ex: "resync" depois de reconectar o LISTEN): cada
+        # listener recebe uma vez (profile_id 0), mesmo sem nenhuma conexão neste worker,
+        # e cada conexão recebe a sua cópia
+        self._notify_listeners(0, data)
+        for subscribers in list(self._subscribers.values()):
+            for queue in list(subscribers):
+                self._put(queue, data)
+
+    def _notify_listeners(self, profile_id: int, data: dict) -> None:
+        for listener in self._listeners:
+            try:
+                listener(profile_id, data)
+            except Exception:
+                logger.exception("erro no listener de eventos")
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, data: dict) -> None:
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # Conexão lenta: descarta o que está na fila e pede para o app se atualizar
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+    async def start(self) -> None:
+        await self.backend.start(self)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+_PENDING_KEY = "realtime_events"
+
+
+class LocalBackend:
+    # Guarda os eventos na sessão e entrega no hub local logo depois do commit
+    # (se a transação for desfeita, os eventos são descartados)
+    async def start(self, hub: Hub) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, db: AsyncSession, profile_id: int, data: dict) -> None:
+        db.info.setdefault(_PENDING_KEY, []).append((profile_id, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session):
+    for profile_id, data in session.info.pop(_PENDING_KEY, ()):
+        hub.dispatch(profile_id, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class PostgresBackend:
+    # NOTIFY dentro da transação: o PostgreSQL só entrega depois do commit, para todos os
+    # processos que fizeram LISTEN no canal (cada worker mantém uma conexão só para isso)
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._task = None
+
+    async def start(self, hub: Hub) -> None:
+        self._hub = hub
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def publish(self, db: AsyncSession, profile_id: int, data: dict) -> None:
+        payload = json.dumps({"profile_id": profile_id, "event": data}, separators=(",", ":"))
+        if len(payload.encode()) > NOTIFY_MAX_BYTES:
+            payload = json.dumps({"profile_id": profile_id, "event": RESYNC_EVENT})
+        await db.execute(select(func.pg_notify(CHANNEL, payload)))
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        message = json.loads(payload)
+        self._hub.dispatch(message["profile_id"], message["event"])
+
+    async def _listen(self) -> None:
+        # Mantém o LISTEN vivo: se a conexão cair, reconecta. Eventos publicados enquanto
+        # estava desconectado se perdem, então todas as conexões recebem "resync"
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(CHANNEL, self._on_notify)
+                logger.info("listen iniciado", extra={"channel": CHANNEL})
+                if reconnecting:
+                    self._hub.dispatch_all(RESYNC_EVENT)
+                reconnecting = True
+                while True:
+                    await asyncio.sleep(15)
+                    await connection.execute("SELECT 1")  # Detecta conexão morta
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("conexão do LISTEN perdida, reconectando", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+
+def _make_backend():
+    if settings.REALTIME_BACKEND == "postgres":
+        return PostgresBackend(settings.database_url)
+    return LocalBackend()
+
+
+# Hub do processo (iniciado/parado pelo lifespan do app)
+hub = Hub(_make_backend())
+
+
+async def publish(db: AsyncSession, profile_id: int, data: dict) -> None:
+    # Chamar antes do commit, na mesma sessão da escrita
+    await hub.backend.publish(db, profile_id, data)
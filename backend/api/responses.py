@@ -0,0 +1,33 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from .logger import get_logger
+from .settings import settings
+
+# ---------------------------
+# Respostas JSON (modo rápido opcional)
+# ---------------------------
+# Com FAST_JSON=true e o orjson instalado (pip install "backend[fast]"):
+# - ORJSONResponse vira a resposta padrão da aplicação
+# - as rotas de /historico montam a resposta direto das linhas da consulta
+#   (select das colunas), sem validar cada linha no HistorySchema e de novo no response_model
+# O JSON gerado é o mesmo nos dois modos (python -m benchmarks.bench_serialization compara).
+
+logger = get_logger("responses")
+
+try:
+    import orjson  # noqa: F401
+except ImportError:
+    orjson = None
+
+FAST_JSON = settings.FAST_JSON and orjson is not None
+if settings.FAST_JSON and orjson is None:
+    logger.warning("FAST_JSON ligado mas orjson não está instalado: usando o JSON padrão")
+
+# Classe de resposta padrão do FastAPI (app.py)
+DefaultResponse = ORJSONResponse if FAST_JSON else JSONResponse
+
+
+def fast_json(content, status_code: int = 200, headers=None) -> ORJSONResponse:
+    # Resposta pronta: o FastAPI não passa pelo response_model (não valida de novo)
+    # "headers": os cabeçalhos já colocados no Response da rota (ETag, X-Next-Cursor...)
+    return ORJSONResponse(content, status_code=status_code, headers=dict(headers or {}))
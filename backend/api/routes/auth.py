@@ -1,17 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from api.database import get_db
 from api.models.userModel import User
-from api.security import verify_password, create_access_token
+from api.models.profileModel import Profile
+from api.ratelimit import admission
+from api.security import verify_and_update_password_async, create_access_token
 
 
 router = APIRouter(prefix="/auth", tags=["🗝️ Autenticação"])
 
-@router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+@router.post("/login", dependencies=[Depends(admission("login"))])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    # Busca o usuário e o id do primeiro perfil na mesma consulta
+    result = await db.execute(
+        select(User, Profile.id)
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .where(User.email == form_data.username)
+        .order_by(Profile.id)
+        .limit(1)
+    )
+    user, profile_id = result.first() or (None, None)
+    if not user:
         raise HTTPException(status_code=401, detail="Email ou senha inválidos!")
-    acess_token = create_access_token(data={"sub": str(user.id)})
+
+    # O Argon2 roda no pool dedicado, fora do event loop
+    valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Email ou senha inválidos!")
+
+    # Parâmetros do Argon2 mudaram: aproveita a senha em mãos para atualizar o hash
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    # O id do perfil vai no token ("pid") para as rotas não precisarem buscá-lo de novo
+    acess_token = create_access_token(data={"sub": str(user.id), "pid": profile_id})
     return {"access_token": acess_token, "token_type": "bearer"}
@@ -0,0 +1,90 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import JSON, and_, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..database import get_read_db
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.historyModel import Historico
+from ..models.profileModel import Profile
+from ..schemas.bootstrapSchema import BootstrapSchema
+from ..schemas.historySchema import HistorySchema
+from ..schemas.profileSchema import ProfileSchema
+from ..services.goalService import goal_from_profile
+from ..services.historyService import rollup_today
+from ..settings import settings
+from ..utils.historyUtils import db_time, period_bounds
+from .profile import montar_meta
+from api.security import Principal, get_current_user # Dependência que retorna usuário autenticado
+
+router = APIRouter(
+    prefix="/bootstrap",
+    tags=["🚀 Inicialização"]
+)
+
+
+# GET - Perfil, meta de hoje e registros de hoje numa requisição só (abertura do app)
+# Em vez de GET /perfil + GET /perfil/meta + GET /historico (cada um com autenticação e
+# uma conexão do pool), o usuário é resolvido uma vez e tudo sai de UMA consulta:
+# perfil + total de hoje (historico_diario, pela chave primária) + registros de hoje
+# agregados em JSON numa subconsulta (índice profile_id, time) + se já existe algum registro
+# (historico_diario, que não sai com o arquivamento; o app não deduz isso da lista paginada).
+@router.get("/", response_model=BootstrapSchema)
+async def Inicializar_App(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=404, detail="Usuário não possui perfil cadastrado")
+
+    profile_id = current_user.profile_id
+    start, end = period_bounds("Diário", datetime.now(ZoneInfo(settings.TIMEZONE)))
+
+    today = (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object("id", Historico.id, "amount", Historico.amount, "time", Historico.time),
+                    Historico.time.desc(),
+                    Historico.id.desc(),
+                )),
+                literal_column("'[]'::json"),
+                type_=JSON,
+            )
+        )
+        .where(
+            Historico.profile_id == Profile.id,
+            Historico.time >= db_time(start),
+            Historico.time < db_time(end),
+        )
+        .scalar_subquery()
+    )
+    any_day = aliased(HistoricoDiario)   # Outro HistoricoDiario que o de hoje (já no FROM)
+    has_history = (
+        select(any_day.profile_id)
+        .where(any_day.profile_id == Profile.id, any_day.count > 0)
+        .exists()
+    )
+    result = await db.execute(
+        select(Profile, func.coalesce(HistoricoDiario.total_ml, 0.0), today, has_history)
+        .outerjoin(
+            HistoricoDiario,
+            and_(HistoricoDiario.profile_id == Profile.id, HistoricoDiario.day == rollup_today()),
+        )
+        .where(Profile.id == profile_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    profile, consumed, items, had_history = row
+
+    return BootstrapSchema(
+        profile=ProfileSchema.model_validate(profile),
+        goal=montar_meta(goal_from_profile(profile_id, profile), consumed),
+        today=[HistorySchema.model_validate(item) for item in items],
+        has_history=had_history,
+    )
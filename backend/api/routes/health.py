@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi import APIRouter
+from sqlalchemy import text
+
+from ..database import engine
+from ..logger import get_logger
+from ..responses import DefaultResponse
+from ..settings import settings
+
+# ---------------------------
+# GET /ready (verificação de prontidão do balanceador / orquestrador)
+# ---------------------------
+# 200 quando o worker consegue pegar uma conexão do pool e falar com o banco;
+# 503 quando o banco não responde em READY_TIMEOUT_SECONDS ou quando o worker está
+# encerrando (SIGTERM no python -m api.serve): o balanceador para de mandar tráfego novo
+# enquanto as requisições em andamento terminam.
+
+logger = get_logger("health")
+
+router = APIRouter(tags=["🩺 Saúde"])
+
+# Ligado pelo api/serve.py ao receber SIGTERM
+draining = False
+
+
+def start_draining() -> None:
+    global draining
+    draining = True
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "checked_in": pool.checkedin()}
+
+
+async def _ping() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready():
+    if draining:
+        return DefaultResponse({"status": "encerrando", "pool": pool_status()}, status_code=503)
+    try:
+        await asyncio.wait_for(_ping(), timeout=settings.READY_TIMEOUT_SECONDS)
+    except Exception as exc:
+        logger.warning("banco indisponível no /ready", extra={"error": repr(exc)})
+        return DefaultResponse({"status": "sem banco", "pool": pool_status()}, status_code=503)
+    return {"status": "ok", "pool": pool_status()}
@@ -1,42 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.userSchema import UserCreate, UserRead, UserUpdate
 from ..models.userModel import User
 from ..models.profileModel import Profile
 from api.database import get_db
-from api.security import hash_password
+from api.ratelimit import admission
+from api.security import hash_password_async, invalidate_principal, publish_principal_change
 
 router = APIRouter(prefix="/users", tags=["👤 Usuários"])
 
 
 # POST - Criar novo usuário (somente se não existir)
-@router.post("/", response_model=UserRead)
-def criar_usuario(user_create: UserCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=UserRead, dependencies=[Depends(admission("cadastro"))])
+async def criar_usuario(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
     # Checa se já existe o usuário
-    existing_user = db.query(User).filter(User.email == user_create.email).first()
-    if existing_user:
+    result = await db.execute(select(User).where(User.email == user_create.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Esse Usuário já existe!")
 
-    # Cria o usuário
-    hashed_password = hash_password(user_create.password)
+    # Cria o usuário (o hash do Argon2 roda no pool dedicado, fora do event loop)
+    hashed_password = await hash_password_async(user_create.password)
     new_user = User(
         name=user_create.name,
         email=user_create.email,
         hashed_password=hashed_password
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
 
-    # Cria o perfil
-    new_profile = Profile(
-        user_id=new_user.id,
-        name=new_user.name
-    )
-    db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
+    # Cria o perfil junto, no mesmo commit
+    new_user.profiles.append(Profile(name=new_user.name))
+    db.add(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Dois cadastros com o mesmo e-mail ao mesmo tempo: o índice único barra o segundo
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Esse Usuário já existe!")
 
     # O primeiro registro será criado no POST /historico
 
@@ -45,12 +46,13 @@ def criar_usuario(user_create: UserCreate, db: Session = Depends(get_db)):
 
 # PATCH - Atualizar Usuário
 @router.patch("/{user_id}", response_model=UserUpdate)
-def atualizar_usuario(
+async def atualizar_usuario(
     user_update: UserUpdate,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado!")
 
@@ -58,13 +60,19 @@ def atualizar_usuario(
 
     # Se vier "password", já transforma em hash
     if "password" in update_data:
-        update_data["hashed_password"] = hash_password(update_data["password"])
+        update_data["hashed_password"] = await hash_password_async(update_data["password"])
         update_data.pop("password")
 
     # Atualizar os campos dinamicamente
     for field, value in update_data.items():
         setattr(user, field, value)
 
-    db.commit()
-    db.refresh(user)
+    try:
+        await publish_principal_change(db, user.id)
+        await db.commit()
+    except IntegrityError:
+        # E-mail novo já usado por outro cadastro (índice único em users.email)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Esse e-mail já está em uso!")
+    invalidate_principal(user.id)
     return user
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Path
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import realtime
+from ..database import get_db, get_read_db
 from ..models.profileModel import Profile
-from ..models.userModel import User  # Adicione seu model de usuário
-from ..schemas.profileSchema import ProfileSchema, ProfileUpdateSchema
-from api.security import get_current_user, hash_password # Dependência que retorna usuário autenticado
+from ..schemas.achievementSchema import AchievementSchema, AchievementsSchema
+from ..schemas.profileSchema import GoalSchema, ProfileSchema, ProfileUpdateSchema
+from ..services import achievementService, historyService
+from ..services.goalService import get_goal, invalidate_goal
+from ..utils.achievementUtils import ACHIEVEMENTS, current_streak, progress
+from ..utils.etagUtils import etag_matches, make_etag, not_modified, set_etag
+from ..utils.waterUtils import WaterGoal
+from ..utils.xpUtils import apply_xp
+from api.ratelimit import admission
+from api.security import Principal, get_current_user, invalidate_principal, publish_principal_change # Dependência que retorna usuário autenticado
 
 router = APIRouter(
     prefix="/perfil",
@@ -12,52 +21,136 @@ router = APIRouter(
 )
 
 # GET - Retorna o perfil do usuário autenticado
+# Com ETag (versão do perfil): If-None-Match igual ao atual responde 304 sem corpo
 @router.get("/", response_model=ProfileSchema)
-def get_perfil(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_perfil(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    result = await db.execute(select(Profile).where(Profile.id == current_user.profile_id))
+    profile = result.scalars().first()
     if not profile:
         raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    etag = make_etag("perfil", profile.id, profile.version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return profile
 
+# Meta do dia + quanto já foi bebido (usado também pelo GET /bootstrap)
+def montar_meta(goal: WaterGoal, consumed: float) -> GoalSchema:
+    return GoalSchema(
+        daily_target_ml=goal.daily_target_ml,
+        per_mission_ml=goal.per_mission_ml,
+        extra_mission_ml=goal.extra_mission_ml,
+        total_target_ml=goal.total_target_ml,
+        consumed_today_ml=consumed,
+        remaining_ml=max(goal.total_target_ml - consumed, 0.0),
+        progress=min(consumed / goal.total_target_ml, 1.0) if goal.total_target_ml > 0 else 0.0,
+    )
+
+# GET - Meta de hidratação de hoje e quanto falta para o usuário autenticado
+# A meta fica em cache por perfil e o total de hoje vem de historico_diario
+@router.get("/meta", response_model=GoalSchema)
+async def get_meta(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    goal = await get_goal(db, current_user.profile_id)
+    if goal is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    consumed = await historyService.daily_total(db, current_user.profile_id, historyService.rollup_today())
+    return montar_meta(goal, consumed)
+
+# GET - Sequência de metas, contadores e conquistas do usuário autenticado
+# Tudo já vem calculado (atualizado a cada escrita no histórico), sem ler os registros.
+# Só leitura (sessão de leitura): nada é gravado aqui, nem na primeira vez do perfil.
+# ETag pela versão do perfil e pelo dia de hoje (a sequência atual muda na virada do dia).
+@router.get("/conquistas", response_model=AchievementsSchema)
+async def get_conquistas(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    profile_id = current_user.profile_id
+
+    version = (await db.execute(select(Profile.version).where(Profile.id == profile_id))).scalar()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    today = historyService.rollup_today()
+    etag = make_etag("conquistas", profile_id, version, today)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    stats, last_run, unlocked = await achievementService.read_progress(db, profile_id)
+
+    set_etag(response, etag)
+    return AchievementsSchema(
+        current_streak=current_streak(last_run, today),
+        best_streak=stats.best_streak,
+        goal_met_today=last_run is not None and last_run[1] == today,
+        goal_days=stats.goal_days,
+        total_ml=stats.total_ml,
+        entries=stats.entries,
+        achievements=[
+            AchievementSchema(
+                code=achievement.code,
+                title=achievement.title,
+                description=achievement.description,
+                unlocked=achievement.code in unlocked,
+                unlocked_at=unlocked.get(achievement.code),
+                progress=progress(stats, achievement),
+            )
+            for achievement in ACHIEVEMENTS
+        ],
+    )
+
 # POST - Cria um perfil se não existir para o usuário autenticado
 @router.post("/", response_model=ProfileSchema)
-def create_perfil(
+async def create_perfil(
     profile_create: ProfileSchema,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    existing_profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    result = await db.execute(select(Profile).where(Profile.user_id == current_user.id))
+    existing_profile = result.scalars().first()
     if existing_profile:
         raise HTTPException(status_code=400, detail="Perfil já existe")
     new_profile = Profile(**profile_create.model_dump(), user_id=current_user.id)
     db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
+    await publish_principal_change(db, current_user.id)  # O usuário agora tem perfil (todos os workers)
+    await db.commit()
+    invalidate_principal(current_user.id)
     return new_profile
 
 # PATCH - Atualiza campos do perfil do usuário autenticado
-@router.patch("/", response_model=ProfileSchema)
-def update_perfil(
+@router.patch("/", response_model=ProfileSchema, dependencies=[Depends(admission("perfil"))])
+async def update_perfil(
     profile_update: ProfileUpdateSchema,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    # SELECT ... FOR UPDATE: trava a linha do perfil até o commit, assim dois add_xp
+    # simultâneos (ex: app em dois aparelhos) não sobrescrevem o XP um do outro
+    result = await db.execute(
+        select(Profile).where(Profile.id == current_user.profile_id).with_for_update()
+    )
+    profile = result.scalars().first()
     if not profile:
         raise HTTPException(status_code=404, detail="Perfil não encontrado")
 
-    # 1) aplica add_xp, se vier
+    # 1) aplica add_xp, se vier (level up calculado de uma vez, sem loop por nível)
     if profile_update.add_xp is not None and profile_update.add_xp > 0:
-        profile.current_xp += profile_update.add_xp
-
-        # regra de level up
-        while profile.current_xp >= profile.xp_to_next:
-            profile.current_xp -= profile.xp_to_next
-            profile.level += 1
-            profile.xp_to_next += 100
+        profile.level, profile.current_xp, profile.xp_to_next = apply_xp(
+            profile.level, profile.current_xp, profile.xp_to_next, profile_update.add_xp
+        )
 
     # 2) atualiza demais campos enviados (sem add_xp)
     update_data = profile_update.model_dump(exclude_unset=True)
@@ -65,12 +158,19 @@ def update_perfil(
 
     for key, value in update_data.items():
         setattr(profile, key, value)
+    profile.version += 1  # Invalida o ETag do perfil
 
     try:
-        db.commit()
-        db.refresh(profile)
+        # Avisa os outros aparelhos do usuário (entregue só depois do commit) e os outros
+        # workers, que tiram a meta do perfil do cache
+        await realtime.publish(db, profile.id, {
+            "type": "perfil",
+            "profile": ProfileSchema.model_validate(profile).model_dump(),
+        })
+        await db.commit()
+        invalidate_goal(profile.id)  # Peso, exercício ou temperatura podem ter mudado
         return profile
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao atualizar perfil")
  
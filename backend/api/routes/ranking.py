@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_read_db
+from ..models.profileModel import Profile
+from ..schemas.rankingSchema import RankingEntrySchema, RankingSchema
+from ..services.rankingService import ranking
+from api.security import Principal, get_current_user # Dependência que retorna usuário autenticado
+
+router = APIRouter(
+    prefix="/ranking",
+    tags=["🏆 Ranking"]
+)
+
+
+# Monta a resposta a partir do quadro em memória: posições e pontuações não consultam o banco,
+# só os nomes (uma consulta pela chave primária com os perfis do top e o do usuário).
+# Usuário sem perfil vê o ranking com "me" vazio.
+async def montar_ranking(db: AsyncSession, board: str, profile_id: Optional[int], limit: int) -> RankingSchema:
+    await ranking.ensure_loaded(db)
+    scores = ranking.board(board)
+
+    top = scores.zrevrange(0, limit - 1)
+    rank = scores.zrevrank(profile_id)
+
+    ids = {member for member, _ in top}
+    if profile_id is not None:
+        ids.add(profile_id)
+    result = await db.execute(select(Profile.id, Profile.name).where(Profile.id.in_(ids)))
+    names = dict(result.all())
+
+    me = None
+    if rank is not None:
+        me = RankingEntrySchema(
+            position=rank + 1,
+            profile_id=profile_id,
+            name=names.get(profile_id, ""),
+            score=scores.zscore(profile_id),
+        )
+    return RankingSchema(
+        board=board,
+        total=len(scores),
+        top=[
+            RankingEntrySchema(position=i + 1, profile_id=member, name=names.get(member, ""), score=score)
+            for i, (member, score) in enumerate(top)
+        ],
+        me=me,
+    )
+
+
+# GET - Ranking de XP total (todos os níveis somados)
+@router.get("/xp", response_model=RankingSchema)
+async def Ranking_XP(
+    limit: int = Query(10, ge=1, le=100, description="Quantos perfis do topo retornar"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    return await montar_ranking(db, "xp", current_user.profile_id, limit)
+
+
+# GET - Ranking de água bebida na semana atual (domingo a sábado)
+@router.get("/semanal", response_model=RankingSchema)
+async def Ranking_Semanal(
+    limit: int = Query(10, ge=1, le=100, description="Quantos perfis do topo retornar"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    return await montar_ranking(db, "semanal", current_user.profile_id, limit)
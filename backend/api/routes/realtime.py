@@ -0,0 +1,62 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+
+from ..database import AsyncSessionLocal
+from ..logger import get_logger
+from ..realtime import hub
+from ..security import resolve_principal
+
+router = APIRouter(tags=["📡 Tempo real"])
+
+logger = get_logger("realtime")
+
+
+# WebSocket - Eventos do perfil em tempo real (registros novos/apagados e mudanças de XP/nível)
+# Conectar em /ws?token=<access_token> (navegadores não mandam Authorization no WebSocket).
+# Mensagens (JSON):
+#   {"type": "historico.insert", "items": [{"id", "amount", "time"}]}
+#   {"type": "historico.delete", "ids": [...], "items": [{"id", "amount", "time"}]}
+#   {"type": "perfil", "profile": {...}}
+#   (um lote grande demais para um evento chega como "resync")
+#   {"type": "resync"} -> eventos se perderam: chamar GET /historico/sync e GET /perfil
+@router.websocket("/ws")
+async def Tempo_Real(websocket: WebSocket, token: str = Query(...)):
+    # A sessão do banco só é usada para validar o token: a conexão não fica presa ao WebSocket
+    async with AsyncSessionLocal() as db:
+        try:
+            principal = await resolve_principal(token, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    if principal.profile_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with hub.subscribe(principal.profile_id) as queue:
+
+        async def send_events():
+            while True:
+                await websocket.send_json(await queue.get())
+
+        async def wait_disconnect():
+            # O app não precisa mandar nada; ler aqui só serve para perceber a desconexão
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+
+        # Quem terminar primeiro (app desconectou ou o envio falhou) encerra o outro; os dois são
+        # aguardados, então o erro do envio vai para o log e não se perde
+        tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_disconnect())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, WebSocketDisconnect):
+                logger.warning("erro ao enviar eventos pelo WebSocket", exc_info=result)
@@ -1,77 +1,422 @@
-from fastapi import APIRouter, status, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, status, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import DateTime, cast, delete, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Literal, Optional
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from ..schemas.historySchema import HistorySchema, CreateHistorySchema
-from ..database import get_db
-from ..models.historyModel import Historico
-from ..security import get_current_user      # ← Importa a dependência
-from ..models.userModel import User          # ← Modelo de usuário
+from ..schemas.historySchema import (
+    CreateHistoryBatchItemSchema,
+    CreateHistorySchema,
+    HistoryBucketSchema,
+    HistorySchema,
+    HistorySummarySchema,
+    HistorySyncSchema,
+)
+from ..database import ReadSessionLocal, get_db, get_read_db, mark_write
+from ..responses import FAST_JSON, fast_json
+from ..settings import settings
+from ..utils.etagUtils import etag_matches, make_etag, not_modified, set_etag
+from ..utils.historyUtils import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMATS,
+    HISTORY_BATCH_MAX,
+    HISTORY_PAGE_MAX,
+    HISTORY_PAGE_SIZE,
+    HISTORY_SYNC_MAX,
+    SUMMARY_BUCKETS,
+    collapse_changes,
+    db_time,
+    decode_cursor,
+    encode_cursor,
+    format_export_rows,
+    history_items,
+    local_time,
+    missing_client_ids,
+    period_bounds,
+    rows_in_sent_order,
+    unique_batch,
+)
+from ..models.historyModel import HISTORY_ID_SEQUENCE, Historico, HistoricoClientId
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.historyChangeModel import HistoricoChange, HistoricoChangeHorizon
+from ..models.profileModel import Profile
+from ..services import historyService
+from ..services.writeBuffer import write_buffer
+from ..services.archiveService import archived_rows, archived_until
+from ..ratelimit import admission
+from ..security import Principal, get_current_user  # ← Importa a dependência
 
 router = APIRouter(prefix='/historico', tags=['🕑 Histórico'])
 
 
-# GET - Mostrar todos os registros do usuário autenticado
+# GET - Mostrar os registros do usuário autenticado, do mais recente para o mais antigo
+# Paginação por cursor (keyset) em (time, id): o token da próxima página vem no
+# cabeçalho X-Next-Cursor e fica ausente quando não há mais registros.
+# ETag: versão do perfil + parâmetros da página. Se o app mandar o mesmo ETag em
+# If-None-Match, responde 304 só com a consulta da versão (sem ler os registros).
+# Com FAST_JSON as rotas de /historico respondem direto das linhas (api/responses.py).
 @router.get("/", response_model=List[HistorySchema], status_code=status.HTTP_200_OK)
 async def Mostrar_Historico(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_PAGE_MAX),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    if not current_user.profiles or len(current_user.profiles) == 0:
+    if current_user.profile_id is None:
         raise HTTPException(status_code=404, detail="Usuário não possui perfil cadastrado")
 
-    profile_id = current_user.profiles[0].id
-    water_registers = (
-        db.query(Historico)
-        .filter(Historico.profile_id == profile_id)
-        .all()
+    profile_id = current_user.profile_id
+    version = (await db.execute(select(Profile.version).where(Profile.id == profile_id))).scalar()
+    etag = make_etag("historico", profile_id, version, since, until, cursor, limit)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # Só as colunas da resposta (linhas simples, sem montar objetos da ORM)
+    query = select(Historico.id, Historico.amount, Historico.time).where(Historico.profile_id == profile_id)
+
+    if since is not None:
+        query = query.where(Historico.time >= db_time(since))
+    if until is not None:
+        query = query.where(Historico.time < db_time(until))
+    if cursor is not None:
+        try:
+            cursor_time, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        query = query.where(tuple_(Historico.time, Historico.id) < tuple_(cursor_time, cursor_id))
+
+    # Busca um registro a mais só para saber se existe próxima página
+    result = await db.execute(
+        query
+        .order_by(Historico.time.desc(), Historico.id.desc())
+        .limit(limit + 1)
     )
+    water_registers = result.all()
+    if len(water_registers) > limit:
+        water_registers = water_registers[:limit]
+        last = water_registers[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.time, last.id)
+
+    if FAST_JSON:
+        return fast_json(history_items(water_registers), headers=response.headers)
     return [HistorySchema.model_validate(w) for w in water_registers]
 
 
+# GET - Resumo do consumo agrupado no banco (Diário/Semanal/Mensal/Anual)
+# Em vez de baixar todo o histórico e somar no celular, o app recebe só os totais por intervalo
+@router.get("/resumo", response_model=HistorySummarySchema, status_code=status.HTTP_200_OK)
+async def Resumo_Historico(
+    mode: Literal["Diário", "Semanal", "Mensal", "Anual"] = "Diário",
+    tz: str = settings.TIMEZONE,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=404, detail="Usuário não possui perfil cadastrado")
+
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Fuso horário inválido: {tz}")
+
+    profile_id = current_user.profile_id
+    start, end = period_bounds(mode, datetime.now(zone))
+
+    unit = SUMMARY_BUCKETS[mode]
+    if historyService.summary_uses_rollup(mode, tz):
+        # Dias e meses no fuso padrão: lê os totais prontos de historico_diario (uma linha por dia)
+        bucket = func.date_trunc(unit, cast(HistoricoDiario.day, DateTime)).label("bucket")
+        query = (
+            select(bucket, func.sum(HistoricoDiario.total_ml), func.sum(HistoricoDiario.count))
+            .where(
+                HistoricoDiario.profile_id == profile_id,
+                HistoricoDiario.day >= start.date(),
+                HistoricoDiario.day < end.date(),
+                HistoricoDiario.count > 0,
+            )
+        )
+    else:
+        # Horas, ou outro fuso: agrupa os registros no fuso do usuário (date_trunc sobre o horário local)
+        bucket = func.date_trunc(unit, local_time(Historico.time, tz)).label("bucket")
+        query = (
+            select(bucket, func.sum(Historico.amount), func.count(Historico.id))
+            .where(
+                Historico.profile_id == profile_id,
+                Historico.time >= db_time(start),
+                Historico.time < db_time(end),
+            )
+        )
+    result = await db.execute(query.group_by(bucket).order_by(bucket))
+    rows = result.all()
+
+    buckets = [
+        HistoryBucketSchema(start=b.replace(tzinfo=zone), total=total, count=count)
+        for b, total, count in rows
+    ]
+    return HistorySummarySchema(
+        mode=mode,
+        start=start,
+        end=end,
+        total=sum(b.total for b in buckets),
+        count=sum(b.count for b in buckets),
+        buckets=buckets,
+    )
+
+
+# GET - Exportar o histórico completo (CSV ou NDJSON) em streaming
+# As linhas saem de um cursor no servidor (yield_per) direto para a resposta, em lotes,
+# então a memória usada é a mesma para 100 ou 10 milhões de registros.
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def Exportar_Historico(
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=404, detail="Usuário não possui perfil cadastrado")
+
+    media_type, _ = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        _export_stream(current_user.profile_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="historico.{format}"'},
+    )
+
+
+async def _export_stream(profile_id: int, fmt: str):
+    # A sessão é aberta aqui dentro: a da requisição já foi fechada quando o streaming começa
+    # (sessão de leitura: numa réplica, se houver)
+    _, header = EXPORT_FORMATS[fmt]
+    if header:
+        yield header
+
+    # Primeiro os meses já arquivados em Parquet (mais antigos), depois o que está no banco
+    async for rows in archived_rows(profile_id):
+        yield format_export_rows(rows, fmt)
+
+    query = select(Historico.id, Historico.amount, Historico.time).where(Historico.profile_id == profile_id)
+    cutoff = archived_until()
+    if cutoff is not None:
+        # Meses arquivados já saíram dos arquivos acima (evita duplicar se ainda estiverem no banco)
+        query = query.where(Historico.time >= cutoff)
+
+    async with ReadSessionLocal() as db:
+        result = await db.stream(
+            query
+            .order_by(Historico.time, Historico.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield format_export_rows(rows, fmt)
+
+
+# GET - O que mudou no histórico desde o último watermark do app
+# Lê só o change-log do perfil a partir de "since" (índice em profile_id, seq), então o custo
+# acompanha a atividade recente e não o tamanho do histórico. since=0 devolve tudo.
+# O change-log guarda só HISTORY_CHANGES_RETENTION_DAYS dias (python -m api.jobs.retention): um
+# "since" anterior ao que já foi apagado responde resync=True com o watermark atual, e o app
+# recarrega o histórico pelo GET /historico.
+@router.get("/sync", response_model=HistorySyncSchema, status_code=status.HTTP_200_OK)
+async def Sincronizar_Historico(
+    since: int = Query(0, ge=0),
+    limit: int = Query(HISTORY_SYNC_MAX, ge=1, le=HISTORY_SYNC_MAX),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=404, detail="Usuário não possui perfil cadastrado")
+
+    profile_id = current_user.profile_id
+    horizon = (await db.execute(select(HistoricoChangeHorizon.seq).where(HistoricoChangeHorizon.id == 1))).scalar()
+    if horizon is not None and since < horizon:
+        latest = (await db.execute(
+            select(func.max(HistoricoChange.seq)).where(HistoricoChange.profile_id == profile_id)
+        )).scalar()
+        watermark = max(latest or 0, horizon)
+        if FAST_JSON:
+            return fast_json({"inserted": [], "removed": [], "watermark": watermark, "has_more": False, "resync": True})
+        return HistorySyncSchema(inserted=[], removed=[], watermark=watermark, has_more=False, resync=True)
+
+    # Busca uma alteração a mais só para saber se existe continuação
+    result = await db.execute(
+        select(HistoricoChange)
+        .where(HistoricoChange.profile_id == profile_id, HistoricoChange.seq > since)
+        .order_by(HistoricoChange.seq)
+        .limit(limit + 1)
+    )
+    changes = result.scalars().all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    inserted, removed = collapse_changes(changes)
+    watermark = changes[-1].seq if changes else since
+    if FAST_JSON:
+        return fast_json({
+            "inserted": [
+                {"id": change.historico_id, "amount": change.amount, "time": change.time}
+                for change in inserted
+            ],
+            "removed": removed,
+            "watermark": watermark,
+            "has_more": has_more,
+            "resync": False,
+        })
+    return HistorySyncSchema(
+        inserted=[
+            HistorySchema(id=change.historico_id, amount=change.amount, time=change.time)
+            for change in inserted
+        ],
+        removed=removed,
+        watermark=watermark,
+        has_more=has_more,
+    )
+
+
 # POST - Registrar novo histórico
-@router.post("/", response_model=HistorySchema, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/", response_model=HistorySchema, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission("historico"))],
+)
 async def Registrar_no_Historico(
     water: CreateHistorySchema,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    if not current_user.profiles or len(current_user.profiles) == 0:
+    if current_user.profile_id is None:
         raise HTTPException(status_code=400, detail="Usuário não possui perfil cadastrado")
 
-    profile_id = current_user.profiles[0].id  # Ajuste se tiver múltiplos perfis
-    newHistorico = Historico(**water.model_dump(), profile_id=profile_id)
-    db.add(newHistorico)
-    db.commit()
-    db.refresh(newHistorico)
+    profile_id = current_user.profile_id
+    if settings.HISTORY_GROUP_COMMIT:
+        # Entra no próximo lote do buffer (volta depois do commit do lote)
+        newHistorico = await write_buffer.insert(profile_id, water.amount)
+        mark_write()   # O commit foi na sessão do buffer: a resposta leva o X-Last-Write mesmo assim
+    else:
+        # Um único INSERT ... RETURNING já devolve o id e o "time" preenchido pelo banco
+        result = await db.execute(
+            insert(Historico)
+            .values(**water.model_dump(), profile_id=profile_id)
+            .returning(Historico.id, Historico.profile_id, Historico.amount, Historico.time)
+        )
+        newHistorico = result.one()
+        await historyService.after_insert(db, [newHistorico])
+        await db.commit()
+    if FAST_JSON:
+        return fast_json(history_items([newHistorico])[0], status_code=status.HTTP_201_CREATED)
     return HistorySchema.model_validate(newHistorico)
 
 
+# POST - Registrar vários registros de uma vez (sincronização depois de ficar offline)
+# Cada client_id é reservado em historico_client_ids (chave perfil + client_id) e só os novos
+# entram em "historico", num único INSERT; os já enviados (mesmo client_id, com qualquer
+# horário) são ignorados, então o app pode reenviar o lote inteiro sem duplicar nada.
+# Devolve os registros na mesma ordem do envio (inclusive os que já existiam).
+@router.post(
+    "/lote", response_model=List[HistorySchema], status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission("historico_lote"))],
+)
+async def Registrar_Lote_no_Historico(
+    entries: Annotated[List[CreateHistoryBatchItemSchema], Body(min_length=1, max_length=HISTORY_BATCH_MAX)],
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.profile_id is None:
+        raise HTTPException(status_code=400, detail="Usuário não possui perfil cadastrado")
+
+    profile_id = current_user.profile_id
+
+    # Remove repetidos dentro do próprio lote (fica a primeira ocorrência)
+    unique_entries = unique_batch(entries)
+
+    # Reserva os client_ids e já tira o id de cada registro da sequência de "historico";
+    # os que já existiam não voltam do RETURNING (um envio simultâneo com os mesmos
+    # client_ids espera o commit deste e depois também não os recebe)
+    result = await db.execute(
+        pg_insert(HistoricoClientId)
+        .values([
+            {
+                "profile_id": profile_id,
+                "client_id": entry.client_id,
+                "historico_id": func.nextval(HISTORY_ID_SEQUENCE),
+                "amount": entry.amount,
+                "time": db_time(entry.time),  # Horário do app, convertido para o formato da coluna
+            }
+            for entry in unique_entries.values()
+        ])
+        .on_conflict_do_nothing(index_elements=["profile_id", "client_id"])
+        .returning(HistoricoClientId.historico_id, HistoricoClientId.amount, HistoricoClientId.time, HistoricoClientId.client_id)
+    )
+    claimed = result.all()
+
+    saved = {}
+    if claimed:
+        result = await db.execute(
+            insert(Historico)
+            .values([
+                {"id": row.historico_id, "profile_id": profile_id, "amount": row.amount, "time": row.time, "client_id": row.client_id}
+                for row in claimed
+            ])
+            .returning(Historico.id, Historico.profile_id, Historico.amount, Historico.time, Historico.client_id)
+        )
+        saved = {row.client_id: row for row in result}
+        await historyService.after_insert(db, list(saved.values()))
+
+    # Os que não foram reservados agora já existiam (retentativa): devolve o registro original
+    missing = missing_client_ids(unique_entries, saved)
+    if missing:
+        result = await db.execute(
+            select(
+                HistoricoClientId.historico_id.label("id"),
+                HistoricoClientId.amount,
+                HistoricoClientId.time,
+                HistoricoClientId.client_id,
+            )
+            .where(HistoricoClientId.profile_id == profile_id, HistoricoClientId.client_id.in_(missing))
+        )
+        saved.update({row.client_id: row for row in result})
+
+    await db.commit()
+    rows = rows_in_sent_order(entries, saved)
+    if FAST_JSON:
+        return fast_json(history_items(rows), status_code=status.HTTP_201_CREATED)
+    return [HistorySchema.model_validate(row) for row in rows]
+
+
 # DELETE - Excluir histórico
 @router.delete("/{id}", response_model=HistorySchema, status_code=status.HTTP_200_OK)
 async def Excluir_no_Historico(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    if not current_user.profiles or len(current_user.profiles) == 0:
+    if current_user.profile_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não possui perfil cadastrado"
         )
 
-    profile_id = current_user.profiles[0].id
-    registro = (
-        db.query(Historico)
-        .filter(Historico.id == id, Historico.profile_id == profile_id)
-        .first()
+    profile_id = current_user.profile_id
+    # DELETE ... RETURNING: apaga e devolve o registro na mesma consulta
+    result = await db.execute(
+        delete(Historico)
+        .where(Historico.id == id, Historico.profile_id == profile_id)
+        .returning(Historico.id, Historico.profile_id, Historico.amount, Historico.time)
     )
+    registro = result.first()
     if not registro:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Registro com id {id} não encontrado"
         )
 
-    db.delete(registro)
-    db.commit()
+    await historyService.after_delete(db, [registro])
+    await db.commit()
+    if FAST_JSON:
+        return fast_json(history_items([registro])[0])
     return HistorySchema.model_validate(registro)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+# Uma conquista, desbloqueada ou não
+class AchievementSchema(BaseModel):
+    code: str
+    title: str
+    description: str
+    unlocked: bool
+    unlocked_at: Optional[datetime] = None  # Quando foi desbloqueada (None se ainda não foi)
+    progress: float                         # Progresso de 0 a 1
+
+
+# Sequências, contadores e conquistas do perfil (GET /perfil/conquistas)
+class AchievementsSchema(BaseModel):
+    current_streak: int         # Dias seguidos com a meta batida até hoje (ou até ontem, se hoje ainda não bateu)
+    best_streak: int            # Maior sequência de dias com a meta batida
+    goal_met_today: bool        # Meta de hoje já batida
+    goal_days: int              # Dias com a meta batida no total
+    total_ml: float             # Água bebida no total
+    entries: int                # Registros no histórico
+    achievements: list[AchievementSchema]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+from .historySchema import HistorySchema
+from .profileSchema import GoalSchema, ProfileSchema
+
+
+# Tudo que o app precisa para abrir (GET /bootstrap), numa requisição só
+class BootstrapSchema(BaseModel):
+    profile: ProfileSchema
+    goal: GoalSchema                # Meta de hoje e quanto já foi bebido
+    today: list[HistorySchema]      # Registros de hoje (fuso settings.TIMEZONE), mais recentes primeiro
+    has_history: bool               # Já registrou água alguma vez (conquista "Primeiro Gole")
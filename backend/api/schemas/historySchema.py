@@ -1,4 +1,4 @@
-from pydantic import BaseModel  # Importa BaseModel do Pydantic, usado para criar schemas de validação de dados
+from pydantic import BaseModel, Field  # Importa BaseModel do Pydantic, usado para criar schemas de validação de dados
 from datetime import datetime   # Importa datetime para representar datas e horas
 
 # Schema que representa os dados de um histórico completo, incluindo o ID e a hora
@@ -15,4 +15,39 @@ class HistorySchema(BaseModel):
 # Não inclui ID e time porque esses valores serão gerados pelo banco
 class CreateHistorySchema(BaseModel):
     amount: float       # Valor numérico do registro a ser criado
-    model_config = {"from_attributes": True}  # Permite criar o schema a partir de um objeto ORM
\ No newline at end of file
+    model_config = {"from_attributes": True}  # Permite criar o schema a partir de um objeto ORM
+
+
+# Schema de cada item do envio em lote (POST /historico/lote)
+# Usado pelo app para mandar os registros feitos sem internet
+class CreateHistoryBatchItemSchema(BaseModel):
+    amount: float                               # Quantidade de água (mL)
+    time: datetime                              # Momento em que o app registrou (com fuso, ex: ISO do toISOString)
+    client_id: str = Field(min_length=1, max_length=64)  # Chave de idempotência gerada no app (ex: UUID)
+
+# Schema de um intervalo do resumo (uma hora, um dia ou um mês, dependendo do modo)
+class HistoryBucketSchema(BaseModel):
+    start: datetime     # Início do intervalo (no fuso pedido)
+    total: float        # Soma de água (mL) no intervalo
+    count: int          # Quantidade de registros no intervalo
+
+
+# Schema do resumo agrupado do histórico (GET /historico/resumo)
+class HistorySummarySchema(BaseModel):
+    mode: str                           # Diário, Semanal, Mensal ou Anual
+    start: datetime                     # Início do período
+    end: datetime                       # Fim do período (exclusivo)
+    total: float                        # Soma de água (mL) no período inteiro
+    count: int                          # Quantidade de registros no período
+    buckets: list[HistoryBucketSchema]  # Totais por intervalo, em ordem cronológica
+
+
+# Resposta da sincronização incremental (GET /historico/sync)
+# O app aplica "inserted" e "removed" na lista local e guarda "watermark" para a próxima chamada
+class HistorySyncSchema(BaseModel):
+    inserted: list[HistorySchema]   # Registros novos desde o watermark enviado
+    removed: list[int]              # Ids apagados desde o watermark enviado
+    watermark: int                  # Enviar como "since" na próxima sincronização
+    has_more: bool                  # True se ainda há alterações (chamar de novo com o novo watermark)
+    resync: bool = False            # True: o watermark é mais antigo que o change-log guardado; recarregar
+                                    # o histórico inteiro (GET /historico) e continuar a partir deste watermark
@@ -27,3 +27,16 @@ class ProfileUpdateSchema(BaseModel):
     add_xp: Optional[int] = None
 
     model_config = {"from_attributes": True}
+
+
+# Meta de hidratação do dia e quanto já foi bebido (GET /perfil/meta)
+class GoalSchema(BaseModel):
+    daily_target_ml: float      # Meta diária pelo peso (35 mL/kg)
+    per_mission_ml: float       # Meta de cada missão (manhã, tarde e noite)
+    extra_mission_ml: float     # Missão extra de exercício (0 se não houver)
+    total_target_ml: float      # Meta diária + missão extra
+    consumed_today_ml: float    # Quanto já bebeu hoje
+    remaining_ml: float         # Quanto falta para a meta total (nunca negativo)
+    progress: float             # Progresso de 0 a 1
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+# Uma linha do ranking
+class RankingEntrySchema(BaseModel):
+    position: int       # Posição começando em 1
+    profile_id: int
+    name: str
+    score: float        # XP total (ranking "xp") ou mL bebidos na semana (ranking "semanal")
+
+
+# GET /ranking/xp e GET /ranking/semanal
+class RankingSchema(BaseModel):
+    board: str                                  # "xp" ou "semanal"
+    total: int                                  # Perfis no ranking
+    top: list[RankingEntrySchema]
+    me: Optional[RankingEntrySchema] = None     # Posição do usuário autenticado (None se fora do ranking)
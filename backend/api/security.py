@@ -1,20 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 from pwdlib import PasswordHash
+from pwdlib.exceptions import UnknownHashError
+from pwdlib.hashers.argon2 import Argon2Hasher
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from .database import get_db        # ajuste para o local certo do seu projeto
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
+from .database import AsyncSessionLocal
+from .metrics import PASSWORD_HASH_TIME
+from .realtime import hub, publish
 from .models.userModel import User  # ajuste para o model real do seu projeto
+from .models.profileModel import Profile
+from .settings import settings
 
 SECRET_KEY = "SUA_CHAVE_MEGA_SECRETA"  # Troque por uma chave forte
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 7           # 1 semana
 
-pwd_context = PasswordHash.recommended()
+# Argon2 com os parâmetros do Settings
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+# Usuário autenticado, como as rotas enxergam
+# Só o necessário para as rotas: id do usuário e id do perfil (None se ainda não tiver perfil)
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    profile_id: Optional[int]
+
+
+# Cache dos usuários já resolvidos (user_id -> Principal)
+# Evita ir ao banco a cada requisição autenticada
+principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int) -> None:
+    # Só vale para este worker: nas escritas use também publish_principal_change
+    principal_cache.pop(user_id)
+
+
+async def publish_principal_change(db: AsyncSession, user_id: int) -> None:
+    # Chamar antes do commit da escrita que muda o usuário ou o perfil dele: depois do commit,
+    # todos os workers tiram o usuário do cache (evento interno do hub, sem perfil/WebSocket)
+    await publish(db, 0, {"type": "usuario", "user_id": user_id})
+
+
+def _on_event(profile_id: int, data: dict) -> None:
+    if data["type"] == "usuario":
+        principal_cache.pop(data["user_id"])
+    elif data["type"] == "resync" and profile_id == 0:
+        principal_cache.clear()   # LISTEN reconectou: invalidações podem ter se perdido
+
+
+hub.add_listener(_on_event)
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -23,6 +77,60 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    # Retorna (senha confere?, novo hash se os parâmetros do Argon2 mudaram)
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except UnknownHashError:
+        return False, None
+
+
+# ---------------------------
+# Pool dedicado ao Argon2
+# ---------------------------
+# Cada hash leva centenas de milissegundos de CPU. Rodar no event loop trava todas as
+# requisições do worker, e o threadpool padrão é dividido com o resto da aplicação.
+# O Argon2 (argon2-cffi) libera o GIL, então threads dedicadas rodam em paralelo de verdade.
+# Quando a fila passa de PASSWORD_HASH_MAX_PENDING, responde 503 em vez de acumular espera.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="argon2",
+)
+_hash_pending = 0
+
+
+def _timed(func, operation: str, *args):
+    # Mede só o tempo do Argon2 (roda dentro da thread do pool, sem contar a espera na fila)
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        PASSWORD_HASH_TIME.labels(operation).observe(time.perf_counter() - start)
+
+
+async def _run_hash(func, operation: str, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, _timed, func, operation, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash(hash_password, "hash", password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return await _run_hash(verify_and_update_password, "verify", plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -34,7 +142,17 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# Fora do cache, o usuário é resolvido no primário: numa réplica atrasada o usuário ou o perfil
+# recém-criado ainda não existiria (401), e réplica fora do ar não pode virar 401
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    # Sessão própria, fechada logo depois (a conexão só sai do pool se a consulta for feita):
+    # a requisição não deve segurar duas conexões (ex: esperando o group commit)
+    async with AsyncSessionLocal() as db:
+        return await resolve_principal(token, db)
+
+
+async def resolve_principal(token: str, db: AsyncSession) -> Principal:
+    # Valida o token e resolve o usuário (usado também fora das rotas HTTP, ex: WebSocket)
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não autorizado",
@@ -42,16 +160,34 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")  # No momento de criar o token, use: create_access_token({"sub": user.id})
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    try:
-        user = db.query(User).filter(User.id == int(user_id)).first()
-    except Exception:
+        # No momento de criar o token, use: create_access_token({"sub": str(user.id), "pid": profile.id})
+        user_id = int(payload["sub"])
+        profile_id = payload.get("pid")
+    except (JWTError, KeyError, TypeError, ValueError):
         raise credentials_exception
-    if user is None:
+
+    # Caminho rápido: usuário já resolvido recentemente, nenhuma consulta ao banco
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    if profile_id is not None:
+        # O token já traz o perfil: basta confirmar pela chave primária que ele ainda é do usuário
+        stmt = select(Profile.id).where(Profile.id == profile_id, Profile.user_id == user_id)
+    else:
+        # Tokens antigos (sem "pid"): resolve o usuário e o primeiro perfil numa consulta só
+        stmt = (
+            select(Profile.id)
+            .select_from(User)
+            .outerjoin(Profile, Profile.user_id == User.id)
+            .where(User.id == user_id)
+            .order_by(Profile.id)
+            .limit(1)
+        )
+    row = (await db.execute(stmt)).first()
+    if row is None:
         raise credentials_exception
-    return user
 
+    principal = Principal(id=user_id, profile_id=row[0])
+    principal_cache.set(user_id, principal)
+    return principal
@@ -0,0 +1,239 @@
+# Servidor de produção: vários workers do uvicorn com a aplicação carregada antes do fork
+#
+# Uso (na pasta backend):
+#   python -m api.serve                           # SERVE_WORKERS processos em SERVE_HOST:SERVE_PORT
+#   python -m api.serve --workers 4 --port 8000   # --workers 0 = um por núcleo
+#
+# - O processo principal importa api.app uma vez e abre o socket; os workers nascem por fork
+#   com tudo já carregado (o import não se repete a cada worker nem a cada worker recriado).
+# - Cada worker cria o seu próprio pool de conexões depois do fork (database.reset_after_fork)
+#   e roda o lifespan (hub, ranking, group commit) no seu event loop.
+# - uvloop e httptools quando instalados (vêm com o fastapi[standard]); senão asyncio e h11.
+# - SIGTERM/SIGINT: o principal repassa SIGTERM aos workers. Cada worker passa a responder 503
+#   no GET /ready (por SERVE_DRAIN_SECONDS, para o balanceador tirá-lo da lista), para de aceitar
+#   conexões, termina as requisições em andamento (até SERVE_GRACEFUL_TIMEOUT) e roda o shutdown
+#   do lifespan (ex: grava a fila do group commit). Quem passar do prazo leva SIGKILL.
+# - Worker que morre sozinho é recriado.
+# - Mais de um worker exige REALTIME_BACKEND=postgres (o hub leva os eventos a todos os workers).
+# - Tempos de inicialização (import da aplicação e worker até ficar pronto) vão para o log e
+#   para o /metrics (aquaquest_startup_seconds); passar de SERVE_STARTUP_TARGET_SECONDS gera aviso.
+# - Métricas no modo multiprocesso do prometheus_client: cada worker grava as suas em arquivos
+#   em PROMETHEUS_MULTIPROC_DIR (se não vier do ambiente, uma pasta temporária apagada no fim) e o
+#   /metrics de qualquer worker soma as de todos.
+# Precisa de fork (Linux/macOS). Para desenvolvimento continue usando: uvicorn api.app:app --reload
+import time
+
+STARTED = time.perf_counter()  # Início do processo (antes dos imports pesados)
+
+import argparse
+import importlib.util
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+
+def prepare_metrics_dir() -> bool:
+    # Precisa rodar antes do primeiro import do prometheus_client (ele escolhe o modo no import).
+    # Pasta do ambiente: apaga os arquivos de uma execução anterior. Devolve True se criou a pasta.
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        for stale in Path(path).glob("*.db"):
+            stale.unlink()
+        return False
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="aquaquest-metrics-")
+    return True
+
+
+# Só no servidor (python -m api.serve); importar o módulo (ex: testes) não muda o modo das métricas
+METRICS_DIR_CREATED = prepare_metrics_dir() if __name__ == "__main__" else False
+
+import uvicorn
+from prometheus_client import multiprocess
+
+from .database import reset_after_fork
+from .logger import get_logger, setup_logging
+from .metrics import STARTUP_TIME
+from .routes import health
+from .settings import settings
+
+logger = get_logger("serve")
+
+RESPAWN_BACKOFF = 1.0   # Espera antes de recriar um worker que morreu logo depois de nascer
+KILL_MARGIN = 5.0       # Folga, além do drain + graceful, antes do SIGKILL
+
+
+def _pick(module: str, fast: str, fallback: str) -> str:
+    return fast if importlib.util.find_spec(module) is not None else fallback
+
+
+class WorkerServer(uvicorn.Server):
+    # uvicorn.Server de um worker: mede a inicialização e drena antes de fechar o socket
+    def __init__(self, config: uvicorn.Config, forked_at: float, first: bool):
+        super().__init__(config)
+        self.forked_at = forked_at
+        self.first = first
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        now = time.perf_counter()
+        STARTUP_TIME.labels("worker").set(now - self.forked_at)
+        extra = {"pid": os.getpid(), "worker_ms": round((now - self.forked_at) * 1000, 2)}
+        if self.first:
+            # Do início do processo até este worker aceitar requisições (o "cold start")
+            cold_start = now - STARTED
+            STARTUP_TIME.labels("total").set(cold_start)
+            extra["total_ms"] = round(cold_start * 1000, 2)
+            if cold_start > settings.SERVE_STARTUP_TARGET_SECONDS:
+                logger.warning("inicialização acima do alvo", extra={**extra, "target_s": settings.SERVE_STARTUP_TARGET_SECONDS})
+        logger.info("worker pronto", extra=extra)
+
+    def handle_exit(self, sig, frame) -> None:
+        # Primeiro sinal: /ready vai para 503 e só depois de SERVE_DRAIN_SECONDS o uvicorn para
+        # de aceitar conexões. Um segundo sinal não espera o drain.
+        if health.draining or settings.SERVE_DRAIN_SECONDS <= 0:
+            health.start_draining()
+            super().handle_exit(sig, frame)
+            return
+        health.start_draining()
+        timer = threading.Timer(settings.SERVE_DRAIN_SECONDS, super().handle_exit, (sig, frame))
+        timer.daemon = True
+        timer.start()
+
+
+def run_worker(config: uvicorn.Config, sock, forked_at: float, first: bool) -> None:
+    # Roda no processo filho, logo depois do fork
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)   # Os handlers do principal não valem aqui
+    reset_after_fork()
+    WorkerServer(config, forked_at, first).run(sockets=[sock])
+
+
+class Supervisor:
+    # Processo principal: cria os workers, recria os que morrem e coordena o desligamento
+    def __init__(self, config: uvicorn.Config, sock, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: dict[int, float] = {}   # pid -> momento do fork
+        self.stopping = False
+        self.deadline = None
+
+    def spawn(self, first: bool) -> None:
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.config, self.sock, forked_at, first)
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else 1
+            except BaseException:
+                logger.exception("worker terminou com erro")
+                code = 1
+            os._exit(code)
+        self.children[pid] = forked_at
+
+    def handle_signal(self, sig, frame) -> None:
+        if not self.stopping:
+            self.stopping = True
+            self.deadline = time.monotonic() + settings.SERVE_DRAIN_SECONDS + settings.SERVE_GRACEFUL_TIMEOUT + KILL_MARGIN
+            logger.info("encerrando workers", extra={"signal": signal.Signals(sig).name, "workers": len(self.children)})
+            forward = signal.SIGTERM
+        else:
+            # Segundo sinal: os workers saem sem esperar as requisições em andamento
+            forward = signal.SIGINT
+        for pid in list(self.children):
+            try:
+                os.kill(pid, forward)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        for _ in range(self.workers):
+            self.spawn(first=True)
+
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if self.deadline is not None and time.monotonic() > self.deadline:
+                    logger.error("workers não terminaram no prazo; SIGKILL", extra={"pids": list(self.children)})
+                    for child in list(self.children):
+                        try:
+                            os.kill(child, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    self.deadline = None
+                time.sleep(0.1)
+                continue
+
+            forked_at = self.children.pop(pid, None)
+            if forked_at is not None and "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+                multiprocess.mark_process_dead(pid)   # Gauges do worker morto saem do /metrics
+            if forked_at is None or self.stopping:
+                continue
+            logger.warning("worker saiu; criando outro", extra={"pid": pid, "exit_code": os.waitstatus_to_exitcode(status)})
+            if time.perf_counter() - forked_at < RESPAWN_BACKOFF:
+                time.sleep(RESPAWN_BACKOFF)
+            if not self.stopping:
+                self.spawn(first=False)
+        logger.info("servidor encerrado")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor de produção da API (vários workers)")
+    parser.add_argument("--host", default=settings.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS, help="0 = um por núcleo")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    setup_logging()
+
+    if workers > 1 and settings.REALTIME_BACKEND == "local":
+        # Com "local" os eventos de um worker não chegam aos outros: ranking, WebSocket e
+        # invalidação dos caches ficariam errados nos demais
+        logger.error("REALTIME_BACKEND=local não funciona com vários workers: use REALTIME_BACKEND=postgres ou --workers 1")
+        sys.exit(1)
+
+    # Carrega a aplicação uma vez, antes do fork (rotas, models e schemas já prontos)
+    from .app import app
+    import_time = time.perf_counter() - STARTED   # Do início do processo até a aplicação carregada
+    STARTUP_TIME.labels("import").set(import_time)   # Herdado pelos workers no fork
+
+    loop = _pick("uvloop", "uvloop", "asyncio")
+    http = _pick("httptools", "httptools", "h11")
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        proxy_headers=True,   # IP do cliente (limite por IP) vem do X-Forwarded-For dos proxies confiáveis
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=settings.SERVE_GRACEFUL_TIMEOUT,
+        access_log=False,   # O MetricsMiddleware já loga cada requisição
+    )
+    sock = config.bind_socket()
+    logger.info(
+        "aplicação carregada",
+        extra={"import_ms": round(import_time * 1000, 2), "workers": workers, "loop": loop, "http": http},
+    )
+
+    Supervisor(config, sock, workers).run()
+    sock.close()
+    if METRICS_DIR_CREATED:
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
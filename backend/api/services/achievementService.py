@@ -0,0 +1,253 @@
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, false, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.achievementModel import ProfileAchievement
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.profileModel import Profile
+from ..models.profileStatsModel import ProfileStats
+from ..models.streakModel import StreakRun
+from .. import realtime
+from ..utils.achievementUtils import build_runs, goal_met, run_length, unlocked_codes
+from .goalService import get_goal
+
+# ---------------------------
+# Sequências e conquistas (GET /perfil/conquistas)
+# ---------------------------
+# Atualizadas pelo historyService a cada INSERT/DELETE em "historico", na mesma transação,
+# sem reler os registros: só o total do dia que mudou (historico_diario), as sequências
+# vizinhas a esse dia (streak_runs) e a linha de contadores do perfil (profile_stats).
+# Um dia conta como meta batida com a meta do perfil na hora da escrita (goalService).
+
+
+async def _target_ml(db: AsyncSession, profile_id: int) -> float:
+    goal = await get_goal(db, profile_id)
+    return goal.total_target_ml if goal is not None else 0.0
+
+
+async def _mark_met(db: AsyncSession, profile_id: int, day) -> int:
+    # O dia passou a bater a meta: estica ou junta as sequências vizinhas
+    # Retorna o tamanho da sequência que contém o dia
+    result = await db.execute(
+        select(StreakRun.start_day, StreakRun.end_day).where(
+            StreakRun.profile_id == profile_id,
+            or_(StreakRun.end_day == day - timedelta(days=1), StreakRun.start_day == day + timedelta(days=1)),
+        )
+    )
+    left = right = None
+    for run in result:
+        if run.end_day < day:
+            left = run
+        else:
+            right = run
+
+    start = left.start_day if left else day
+    end = right.end_day if right else day
+    if right:
+        await db.execute(
+            delete(StreakRun).where(StreakRun.profile_id == profile_id, StreakRun.start_day == right.start_day)
+        )
+    if left:
+        await db.execute(
+            update(StreakRun)
+            .where(StreakRun.profile_id == profile_id, StreakRun.start_day == left.start_day)
+            .values(end_day=end)
+        )
+    else:
+        await db.execute(insert(StreakRun).values(profile_id=profile_id, start_day=start, end_day=end))
+    return run_length(start, end)
+
+
+async def _mark_unmet(db: AsyncSession, profile_id: int, day) -> int:
+    # O dia deixou de bater a meta (registro apagado): parte ao meio a sequência que o contém
+    # Retorna o tamanho que a sequência tinha (0 se o dia não estava em nenhuma)
+    result = await db.execute(
+        select(StreakRun.start_day, StreakRun.end_day).where(
+            StreakRun.profile_id == profile_id,
+            StreakRun.start_day <= day,
+            StreakRun.end_day >= day,
+        )
+    )
+    run = result.first()
+    if run is None:
+        return 0
+
+    if run.start_day < day:
+        await db.execute(
+            update(StreakRun)
+            .where(StreakRun.profile_id == profile_id, StreakRun.start_day == run.start_day)
+            .values(end_day=day - timedelta(days=1))
+        )
+    else:
+        await db.execute(
+            delete(StreakRun).where(StreakRun.profile_id == profile_id, StreakRun.start_day == run.start_day)
+        )
+    if day < run.end_day:
+        await db.execute(
+            insert(StreakRun).values(profile_id=profile_id, start_day=day + timedelta(days=1), end_day=run.end_day)
+        )
+    return run_length(run.start_day, run.end_day)
+
+
+async def _longest_run(db: AsyncSession, profile_id: int) -> int:
+    result = await db.execute(
+        select(func.max(StreakRun.end_day - StreakRun.start_day + 1)).where(StreakRun.profile_id == profile_id)
+    )
+    return result.scalar() or 0
+
+
+async def _sync_achievements(db: AsyncSession, profile_id: int, before: set, after: set) -> None:
+    # Grava as conquistas desbloqueadas e apaga as que deixaram de valer
+    gained, lost = after - before, before - after
+    if gained:
+        await db.execute(
+            pg_insert(ProfileAchievement)
+            .values([{"profile_id": profile_id, "code": code} for code in sorted(gained)])
+            .on_conflict_do_nothing()
+        )
+        # Avisa o app para mostrar a conquista (entregue só depois do commit)
+        await realtime.publish(db, profile_id, {"type": "conquistas", "unlocked": sorted(gained)})
+    if lost:
+        await db.execute(
+            delete(ProfileAchievement).where(
+                ProfileAchievement.profile_id == profile_id,
+                ProfileAchievement.code.in_(lost),
+            )
+        )
+
+
+async def _load_days(db: AsyncSession, profile_id: int) -> list:
+    result = await db.execute(
+        select(HistoricoDiario.day, HistoricoDiario.total_ml, HistoricoDiario.count)
+        .where(HistoricoDiario.profile_id == profile_id)
+        .order_by(HistoricoDiario.day)
+    )
+    return result.all()
+
+
+def _stats_from_days(profile_id: int, days, target: float) -> tuple[ProfileStats, list]:
+    # Contadores e sequências a partir dos totais diários (a mesma meta para todos os dias)
+    runs = build_runs([row.day for row in days if goal_met(row.total_ml, target)])
+    stats = ProfileStats(
+        profile_id=profile_id,
+        total_ml=sum(row.total_ml for row in days),
+        entries=sum(row.count for row in days),
+        goal_days=sum(run_length(start, end) for start, end in runs),
+        best_streak=max((run_length(start, end) for start, end in runs), default=0),
+    )
+    return stats, runs
+
+
+async def rebuild(db: AsyncSession, profile_id: int) -> ProfileStats:
+    # Monta sequências, contadores e conquistas de um perfil a partir de historico_diario
+    # (uma vez por perfil, na primeira escrita; depois tudo é incremental). Usa a meta atual para todos os dias.
+    # Trava o perfil: duas montagens ao mesmo tempo não gravam sequências repetidas
+    # (NO KEY UPDATE, o mesmo lock do bump_version: FOR UPDATE esperaria o lock da chave
+    # estrangeira dos INSERTs em "historico" que estão na fila do bump_version -> deadlock)
+    await db.execute(select(Profile.id).where(Profile.id == profile_id).with_for_update(key_share=True))
+
+    target = await _target_ml(db, profile_id)
+    await db.execute(
+        update(HistoricoDiario)
+        .where(HistoricoDiario.profile_id == profile_id)
+        .values(goal_met=HistoricoDiario.total_ml >= target if target > 0 else false())
+    )
+    computed, runs = _stats_from_days(profile_id, await _load_days(db, profile_id), target)
+
+    await db.execute(delete(StreakRun).where(StreakRun.profile_id == profile_id))
+    if runs:
+        await db.execute(
+            insert(StreakRun),
+            [{"profile_id": profile_id, "start_day": start, "end_day": end} for start, end in runs],
+        )
+
+    values = {
+        "total_ml": computed.total_ml,
+        "entries": computed.entries,
+        "goal_days": computed.goal_days,
+        "best_streak": computed.best_streak,
+    }
+    stmt = pg_insert(ProfileStats).values(profile_id=profile_id, **values)
+    await db.execute(stmt.on_conflict_do_update(index_elements=["profile_id"], set_=values))
+    stats = await db.get(ProfileStats, profile_id, populate_existing=True)
+
+    result = await db.execute(select(ProfileAchievement.code).where(ProfileAchievement.profile_id == profile_id))
+    await _sync_achievements(db, profile_id, set(result.scalars().all()), unlocked_codes(stats))
+    return stats
+
+
+async def read_progress(db: AsyncSession, profile_id: int) -> tuple[ProfileStats, Optional[tuple], dict]:
+    # Leitura do GET /perfil/conquistas, sem gravar nada:
+    # (contadores, sequência mais recente (início, fim) ou None, código -> unlocked_at)
+    stats = await db.get(ProfileStats, profile_id)
+    if stats is None:
+        # Perfil sem nenhuma escrita no histórico desde que as conquistas existem: calcula na
+        # hora a partir de historico_diario (a montagem só é gravada na próxima escrita)
+        stats, runs = _stats_from_days(profile_id, await _load_days(db, profile_id), await _target_ml(db, profile_id))
+        return stats, (runs[-1] if runs else None), dict.fromkeys(unlocked_codes(stats))
+
+    result = await db.execute(
+        select(ProfileAchievement.code, ProfileAchievement.unlocked_at)
+        .where(ProfileAchievement.profile_id == profile_id)
+    )
+    return stats, await last_run(db, profile_id), dict(result.all())
+
+
+async def last_run(db: AsyncSession, profile_id: int) -> Optional[tuple]:
+    # Sequência mais recente (início, fim), ou None
+    result = await db.execute(
+        select(StreakRun.start_day, StreakRun.end_day)
+        .where(StreakRun.profile_id == profile_id)
+        .order_by(StreakRun.end_day.desc())
+        .limit(1)
+    )
+    row = result.first()
+    return (row.start_day, row.end_day) if row else None
+
+
+async def update_progress(db: AsyncSession, days, rows, sign: int) -> None:
+    # Chamado pelo historyService depois de atualizar historico_diario
+    # "days": linhas de historico_diario que mudaram (profile_id, day, total_ml, goal_met)
+    # "rows": registros inseridos (sign=1) ou apagados (sign=-1), com profile_id e amount
+    deltas = {}
+    for row in rows:
+        delta = deltas.setdefault(row.profile_id, [0.0, 0])
+        delta[0] += sign * row.amount
+        delta[1] += sign
+    days_by_profile = {}
+    for row in days:
+        days_by_profile.setdefault(row.profile_id, []).append(row)
+
+    for profile_id, (delta_ml, delta_entries) in deltas.items():
+        stats = await db.get(ProfileStats, profile_id)
+        if stats is None:
+            # Perfil ainda sem contadores: historico_diario já tem esta escrita
+            await rebuild(db, profile_id)
+            continue
+
+        before = unlocked_codes(stats)
+        target = await _target_ml(db, profile_id)
+        for day in sorted(days_by_profile.get(profile_id, []), key=lambda row: row.day):
+            met = goal_met(day.total_ml, target)
+            if met == day.goal_met:
+                continue
+            await db.execute(
+                update(HistoricoDiario)
+                .where(HistoricoDiario.profile_id == profile_id, HistoricoDiario.day == day.day)
+                .values(goal_met=met)
+            )
+            if met:
+                stats.goal_days += 1
+                stats.best_streak = max(stats.best_streak, await _mark_met(db, profile_id, day.day))
+            else:
+                stats.goal_days -= 1
+                if await _mark_unmet(db, profile_id, day.day) >= stats.best_streak:
+                    # Quebrou a maior sequência: a nova maior é uma das que sobraram
+                    stats.best_streak = await _longest_run(db, profile_id)
+
+        stats.total_ml += delta_ml
+        stats.entries += delta_entries
+        await _sync_achievements(db, profile_id, before, unlocked_codes(stats))
@@ -0,0 +1,80 @@
+import asyncio
+import re
+from collections import namedtuple
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from ..logger import get_logger
+from ..settings import settings
+
+# ---------------------------
+# Histórico arquivado (partições antigas salvas em Parquet)
+# ---------------------------
+# O job api.jobs.retention tira do banco os meses mais antigos que HISTORY_RETENTION_MONTHS
+# e grava cada um em HISTORY_ARCHIVE_DIR/historico_AAAA_MM.parquet (compressão zstd),
+# ordenado por profile_id, time e id. Os totais diários continuam em historico_diario,
+# então os resumos não dependem destes arquivos; a exportação lê daqui os meses arquivados.
+# Leitura exige pyarrow (pip install "backend[jobs]"); sem ele os arquivos são ignorados.
+
+ARCHIVE_COLUMNS = ["id", "profile_id", "amount", "time", "client_id"]
+_ARCHIVE_NAME = re.compile(r"^historico_(\d{4})_(\d{2})\.parquet$")
+
+ArchivedRow = namedtuple("ArchivedRow", "id amount time")
+
+logger = get_logger("archive")
+
+
+def archive_path(month: date) -> Path:
+    return Path(settings.HISTORY_ARCHIVE_DIR) / f"historico_{month:%Y_%m}.parquet"
+
+
+def archived_months() -> list[date]:
+    # Meses já arquivados (primeiro dia de cada mês), em ordem cronológica
+    directory = Path(settings.HISTORY_ARCHIVE_DIR)
+    if not directory.is_dir():
+        return []
+    months = []
+    for path in directory.iterdir():
+        match = _ARCHIVE_NAME.match(path.name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def archived_until() -> Optional[date]:
+    # Primeiro dia depois do último mês arquivado (None se nada foi arquivado)
+    months = archived_months()
+    if not months:
+        return None
+    last = months[-1]
+    return date(last.year + last.month // 12, last.month % 12 + 1, 1)
+
+
+def _read_profile_rows(path: Path, profile_id: int) -> list[ArchivedRow]:
+    import pyarrow.parquet as pq
+
+    # O filtro usa as estatísticas dos row groups: só lê os trechos com esse perfil
+    table = pq.read_table(
+        path,
+        columns=["id", "amount", "time"],
+        filters=[("profile_id", "=", profile_id)],
+    ).sort_by([("time", "ascending"), ("id", "ascending")])
+    return [ArchivedRow(**row) for row in table.to_pylist()]
+
+
+async def archived_rows(profile_id: int):
+    # Registros arquivados de um perfil, um lote por mês, em ordem cronológica
+    # (leitura de disco numa thread para não travar o event loop)
+    months = archived_months()
+    if not months:
+        return
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow não instalado: histórico arquivado fora da exportação")
+        return
+    for month in months:
+        rows = await asyncio.to_thread(_read_profile_rows, archive_path(month), profile_id)
+        if rows:
+            yield rows
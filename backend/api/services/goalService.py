@@ -0,0 +1,53 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import TTLCache
+from ..models.profileModel import Profile
+from ..realtime import hub
+from ..settings import settings
+from ..utils.waterUtils import WaterGoal, calculate_water_goal
+
+# Metas já calculadas por perfil (profile_id -> WaterGoal)
+# A meta só muda quando o perfil muda: update_perfil invalida a entrada neste worker e o
+# evento "perfil" do hub invalida nos outros
+goal_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.GOAL_CACHE_TTL)
+
+
+def invalidate_goal(profile_id: int) -> None:
+    goal_cache.pop(profile_id)
+
+
+def _on_event(profile_id: int, data: dict) -> None:
+    if data["type"] == "perfil":
+        goal_cache.pop(profile_id)
+    elif data["type"] == "resync" and profile_id == 0:
+        goal_cache.clear()   # LISTEN reconectou: invalidações podem ter se perdido
+
+
+hub.add_listener(_on_event)
+
+
+async def get_goal(db: AsyncSession, profile_id: int) -> Optional[WaterGoal]:
+    # Retorna a meta do perfil (None se o perfil não existir)
+    goal = goal_cache.get(profile_id)
+    if goal is not None:
+        return goal
+
+    result = await db.execute(
+        select(Profile.weight_kg, Profile.activity_time, Profile.ambient_temp_c)
+        .where(Profile.id == profile_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return goal_from_profile(profile_id, row)
+
+
+def goal_from_profile(profile_id: int, profile) -> WaterGoal:
+    # Meta de um perfil já lido do banco (com weight_kg, activity_time e ambient_temp_c)
+    # Guarda no cache para as próximas chamadas de get_goal
+    goal = calculate_water_goal(profile.weight_kg, profile.activity_time, profile.ambient_temp_c)
+    goal_cache.set(profile_id, goal)
+    return goal
@@ -0,0 +1,195 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.historyChangeModel import HistoricoChange
+from ..models.historyModel import Historico
+from ..models.profileModel import Profile
+from .. import realtime
+from ..settings import settings
+from ..utils.historyUtils import SUMMARY_BUCKETS, local_time, week_start
+from . import achievementService
+
+# ---------------------------
+# Efeitos colaterais das escritas no histórico
+# ---------------------------
+# Toda rota que insere ou apaga registros de "historico" chama estas funções antes do
+# commit, para que as tabelas derivadas mudem na mesma transação dos registros.
+# "rows" são linhas com id, profile_id, amount e time (ex: resultado de um RETURNING).
+# Os eventos de tempo real (WebSocket /ws) também saem daqui e só chegam aos apps após o commit.
+# Sequências e conquistas (achievementService) são atualizadas a partir dos totais diários.
+
+# Colunas de historico_diario devolvidas (RETURNING) para as sequências de metas
+DAY_COLUMNS = (HistoricoDiario.profile_id, HistoricoDiario.day, HistoricoDiario.total_ml, HistoricoDiario.goal_met)
+
+
+def rollup_day(time_column):
+    # Dia (no fuso settings.TIMEZONE) em que um registro entra na tabela historico_diario
+    return cast(local_time(time_column, settings.TIMEZONE), Date)
+
+
+def rollup_today() -> date:
+    # Dia de hoje no fuso settings.TIMEZONE (mesmo critério de historico_diario)
+    return datetime.now(ZoneInfo(settings.TIMEZONE)).date()
+
+
+def summary_uses_rollup(mode: str, tz: str) -> bool:
+    # GET /historico/resumo lê os totais prontos de historico_diario só para dias e meses no
+    # fuso settings.TIMEZONE (o mesmo dos dias da tabela); horas e outros fusos somam os registros
+    return SUMMARY_BUCKETS[mode] != "hour" and tz == settings.TIMEZONE
+
+
+async def daily_total(db: AsyncSession, profile_id: int, day: date) -> float:
+    # Total bebido (mL) num dia, lido da tabela de resumo (uma linha pela chave primária)
+    result = await db.execute(
+        select(HistoricoDiario.total_ml).where(
+            HistoricoDiario.profile_id == profile_id,
+            HistoricoDiario.day == day,
+        )
+    )
+    return result.scalar() or 0.0
+
+
+async def bump_version(db: AsyncSession, profile_ids) -> None:
+    # Sobe a versão dos perfis: os ETags antigos de /perfil e /historico deixam de valer
+    # O UPDATE também trava a linha do perfil até o commit: escritas no histórico do mesmo
+    # perfil ficam em fila, então os "seq" do change-log saem na mesma ordem dos commits
+    # (o app nunca recebe um seq maior antes de um menor ficar visível)
+    await db.execute(
+        update(Profile)
+        .where(Profile.id.in_(set(profile_ids)))
+        .values(version=Profile.version + 1)
+    )
+
+
+async def record_changes(db: AsyncSession, op: str, rows) -> None:
+    # Grava as alterações no change-log lido pelo GET /historico/sync
+    # Chamar depois do bump_version (que garante a ordem dos seq por perfil)
+    await db.execute(
+        insert(HistoricoChange),
+        [
+            {
+                "profile_id": row.profile_id,
+                "historico_id": row.id,
+                "op": op,
+                "amount": row.amount if op == "insert" else None,
+                "time": row.time if op == "insert" else None,
+            }
+            for row in rows
+        ],
+    )
+
+
+async def publish_changes(db: AsyncSession, op: str, rows, deltas) -> None:
+    # Dois eventos por perfil:
+    # - para os apps (WebSocket): {"type": "historico.insert", "items": [...]} ou
+    #   {"type": "historico.delete", "ids": [...], "items": [...]}; um lote grande demais para o
+    #   NOTIFY vira "resync" só para as conexões do perfil
+    # - para o ranking dos workers (interno): {"type": "historico.total", "delta": {dia: mL}},
+    #   só com os dias da semana atual. Pequeno sempre, qualquer que seja o tamanho do lote.
+    #   "deltas": (profile_id, dia de historico_diario, mL somados/descontados)
+    by_profile = {}
+    for row in rows:
+        by_profile.setdefault(row.profile_id, []).append(row)
+    week = week_start(rollup_today())
+    totals = {}
+    for profile_id, day, amount in deltas:
+        if day >= week:
+            profile_totals = totals.setdefault(profile_id, {})
+            profile_totals[day.isoformat()] = profile_totals.get(day.isoformat(), 0.0) + amount
+
+    for profile_id, profile_rows in by_profile.items():
+        items = [
+            {"id": row.id, "amount": row.amount, "time": row.time.isoformat()}
+            for row in profile_rows
+        ]
+        if op == "insert":
+            data = {"type": "historico.insert", "items": items}
+        else:
+            data = {"type": "historico.delete", "ids": [row.id for row in profile_rows], "items": items}
+        await realtime.publish(db, profile_id, data)
+        if profile_id in totals:
+            await realtime.publish(db, profile_id, {"type": "historico.total", "delta": totals[profile_id]})
+
+
+async def after_insert(db: AsyncSession, rows) -> None:
+    ids = [row.id for row in rows]
+    if not ids:
+        return
+
+    await bump_version(db, [row.profile_id for row in rows])
+
+    # Soma os registros novos por perfil/dia e acumula em historico_diario (uma consulta só:
+    # o upsert devolve as linhas do dia e "added", o que esta escrita somou em cada uma)
+    day = rollup_day(Historico.time)
+    totals = (
+        select(
+            Historico.profile_id,
+            day.label("day"),
+            func.sum(Historico.amount).label("total_ml"),
+            func.count(Historico.id).label("count"),
+        )
+        .where(Historico.id.in_(ids))
+        .group_by(Historico.profile_id, day)
+        .cte("totals")
+    )
+    stmt = pg_insert(HistoricoDiario).from_select(
+        ["profile_id", "day", "total_ml", "count"],
+        select(totals.c.profile_id, totals.c.day, totals.c.total_ml, totals.c.count),
+    )
+    upserted = (
+        stmt.on_conflict_do_update(
+            index_elements=["profile_id", "day"],
+            set_={
+                "total_ml": HistoricoDiario.total_ml + stmt.excluded.total_ml,
+                "count": HistoricoDiario.count + stmt.excluded.count,
+            },
+        )
+        .returning(*DAY_COLUMNS)
+        .cte("upserted")
+    )
+    result = await db.execute(
+        select(upserted, totals.c.total_ml.label("added")).join(
+            totals, (totals.c.profile_id == upserted.c.profile_id) & (totals.c.day == upserted.c.day)
+        )
+    )
+    days = result.all()
+
+    await record_changes(db, "insert", rows)
+    await publish_changes(db, "insert", rows, [(row.profile_id, row.day, row.added) for row in days])
+    await achievementService.update_progress(db, days, rows, 1)
+
+
+async def after_delete(db: AsyncSession, rows) -> None:
+    if not rows:
+        return
+
+    await bump_version(db, [row.profile_id for row in rows])
+
+    # Desconta cada registro apagado do total do seu dia
+    days = []
+    deltas = []
+    for row in rows:
+        result = await db.execute(
+            update(HistoricoDiario)
+            .where(
+                HistoricoDiario.profile_id == row.profile_id,
+                HistoricoDiario.day == rollup_day(cast(row.time, Historico.time.type)),
+            )
+            .values(
+                total_ml=HistoricoDiario.total_ml - row.amount,
+                count=HistoricoDiario.count - 1,
+            )
+            .returning(*DAY_COLUMNS)
+        )
+        changed = result.all()
+        days.extend(changed)
+        deltas.extend((day.profile_id, day.day, -row.amount) for day in changed)
+
+    await record_changes(db, "delete", rows)
+    await publish_changes(db, "delete", rows, deltas)
+    await achievementService.update_progress(db, days, rows, -1)
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..logger import get_logger
+from ..models.dailyHistoryModel import HistoricoDiario
+from ..models.profileModel import Profile
+from ..realtime import hub
+from ..settings import settings
+from ..sortedset import SortedSet
+from ..utils.historyUtils import week_start
+from ..utils.xpUtils import total_xp
+from .historyService import rollup_today
+
+# ---------------------------
+# Ranking (leaderboard) em memória
+# ---------------------------
+# Dois quadros, mantidos por processo:
+# - xp: XP total acumulado de cada perfil
+# - semanal: água bebida (mL) na semana atual (domingo a sábado, no fuso settings.TIMEZONE)
+# Carregados do banco uma vez (e recarregados a cada RANKING_REFRESH_SECONDS para corrigir
+# qualquer evento perdido) e atualizados pelos eventos do hub de tempo real, que chegam em
+# todos os workers com REALTIME_BACKEND=postgres. Posição e top-N não consultam o banco.
+# O semanal usa o evento interno "historico.total" (mL por dia de historico_diario, o mesmo
+# dia que o load() soma). Uma carga por vez (lock); num "resync" do processo a recarga roda
+# em segundo plano e os quadros antigos continuam respondendo até os novos ficarem prontos.
+# Com vários workers o REALTIME_BACKEND=postgres é obrigatório: com "local" cada worker só veria
+# as próprias escritas até o próximo refresh (o python -m api.serve nem inicia nesse caso).
+
+logger = get_logger("ranking")
+
+
+class Ranking:
+    def __init__(self):
+        self.xp = SortedSet()
+        self.weekly = SortedSet()
+        self.week: Optional[date] = None       # Domingo da semana do quadro semanal
+        self.loaded = False
+        self._task = None
+        self._lock = asyncio.Lock()
+        self._reload_task = None
+
+    async def load(self, db: AsyncSession) -> None:
+        # Monta os quadros novos a partir do banco e troca de uma vez
+        # (eventos que chegarem durante a carga entram na próxima recarga)
+        xp = SortedSet()
+        result = await db.execute(select(Profile.id, Profile.level, Profile.current_xp))
+        for profile_id, level, current_xp in result:
+            xp.zadd(profile_id, total_xp(level, current_xp))
+
+        week = week_start(rollup_today())
+        weekly = SortedSet()
+        result = await db.execute(
+            select(HistoricoDiario.profile_id, func.sum(HistoricoDiario.total_ml))
+            .where(HistoricoDiario.day >= week)
+            .group_by(HistoricoDiario.profile_id)
+            .having(func.sum(HistoricoDiario.total_ml) > 0)
+        )
+        for profile_id, total in result:
+            weekly.zadd(profile_id, total)
+
+        self.xp, self.weekly, self.week = xp, weekly, week
+        self.loaded = True
+
+    async def _load_locked(self, db: AsyncSession) -> None:
+        async with self._lock:
+            await self.load(db)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        # Só a primeira carga espera; requisições simultâneas aguardam a mesma carga
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.load(db)
+
+    async def _reload(self) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._load_locked(db)
+        except Exception:
+            logger.exception("erro ao recarregar o ranking")
+        finally:
+            self._reload_task = None
+
+    def on_event(self, profile_id: int, data: dict) -> None:
+        # Listener do hub: atualiza os quadros com cada evento já confirmado (após o commit)
+        if not self.loaded:
+            return
+        if data["type"] == "resync":
+            # LISTEN reconectou (profile_id 0): eventos podem ter se perdido, recarrega em segundo
+            # plano. O "resync" de um perfil só vale para as conexões dele (o ranking usa
+            # "historico.total", que sempre cabe no NOTIFY)
+            if profile_id == 0 and self._reload_task is None:
+                self._reload_task = asyncio.get_running_loop().create_task(self._reload())
+        elif data["type"] == "perfil":
+            profile = data["profile"]
+            self.xp.zadd(profile_id, total_xp(profile["level"], profile["current_xp"]))
+        elif data["type"] == "historico.total":
+            self._roll_week()
+            for day, amount in data["delta"].items():
+                if week_start(date.fromisoformat(day)) == self.week:
+                    if self.weekly.zincrby(profile_id, amount) <= 0:
+                        self.weekly.zrem(profile_id)
+
+    def _roll_week(self) -> None:
+        # Virou a semana: o quadro semanal recomeça vazio
+        current = week_start(rollup_today())
+        if current != self.week:
+            self.weekly = SortedSet()
+            self.week = current
+
+    def board(self, name: str) -> SortedSet:
+        if name == "semanal":
+            self._roll_week()
+            return self.weekly
+        return self.xp
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self._load_locked(db)
+            except Exception:
+                logger.exception("erro ao recarregar o ranking")
+            await asyncio.sleep(settings.RANKING_REFRESH_SECONDS)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._reload_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+
+ranking = Ranking()
+hub.add_listener(ranking.on_event)
@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..database import AsyncSessionLocal
+from ..logger import get_logger
+from ..models.historyModel import Historico
+from ..settings import settings
+from . import historyService
+
+# ---------------------------
+# Group commit dos registros de POST /historico (HISTORY_GROUP_COMMIT=true)
+# ---------------------------
+# Em vez de cada requisição fazer a sua transação (e o seu fsync no commit), os registros
+# que chegam juntos esperam até HISTORY_GROUP_COMMIT_LINGER_MS ou até juntar
+# HISTORY_GROUP_COMMIT_MAX_BATCH, e entram num INSERT de várias linhas numa transação só
+# (com os mesmos efeitos do historyService.after_insert). Cada requisição só recebe o
+# id e o "time" depois do commit: o 201 continua significando "gravado".
+# Se o INSERT do lote for recusado por um registro (IntegrityError/DataError, ex: perfil que
+# não existe mais), nada foi gravado e cada registro é tentado de novo sozinho (um perfil com
+# erro não derruba os outros). Qualquer outro erro (ex: conexão caiu durante o commit) pode ter
+# acontecido com o lote já gravado: regravar duplicaria registros, então o lote inteiro falha.
+# Se o próprio loop morrer (erro inesperado fora da gravação), as requisições esperando recebem
+# erro e as seguintes gravam na hora, como com o buffer parado.
+
+logger = get_logger("write_buffer")
+
+
+class HistoryWriteBuffer:
+    def __init__(self, max_batch: int, linger_ms: float):
+        self.max_batch = max_batch
+        self.linger = linger_ms / 1000
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._wakeup = None   # Tem registro na fila
+        self._full = None     # A fila já tem um lote cheio
+        self._task = None
+        self._closing = False
+        self._current: list = []   # Lote sendo gravado pelo loop
+
+    async def insert(self, profile_id: int, amount: float):
+        # Enfileira um registro e espera o commit do lote; devolve a linha (id, profile_id, amount, time)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"profile_id": profile_id, "amount": amount}, future))
+        if self._task is None:
+            # Buffer parado (ex: já desligou): grava na hora, sem esperar outras requisições
+            await self._flush(self._take())
+        else:
+            self._wakeup.set()
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+        return await future
+
+    def _take(self) -> list:
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._full is not None and len(self._pending) < self.max_batch:
+            self._full.clear()
+        return batch
+
+    async def _run(self) -> None:
+        # Roda até o stop() e, depois dele, até esvaziar a fila
+        while not (self._closing and not self._pending):
+            await self._wakeup.wait()
+            if not self._closing:
+                # Espera mais registros chegarem (até o tempo de espera ou o lote encher)
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.linger)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._take()
+            if not self._pending and not self._closing:
+                self._wakeup.clear()
+            if batch:
+                self._current = batch
+                await self._flush(batch)
+                self._current = []
+
+    async def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        try:
+            await self._write(batch)
+        except (IntegrityError, DataError) as exc:
+            # Recusado na execução, antes do commit (o esquema não tem constraints adiadas)
+            if len(batch) == 1:
+                logger.exception("erro ao gravar registro do histórico")
+                self._fail(batch, exc)
+                return
+            logger.warning("lote do histórico recusado; gravando um por um", extra={"batch": len(batch)})
+            for item in batch:
+                try:
+                    await self._write([item])
+                except Exception as exc:
+                    self._fail([item], exc)
+            return
+        except Exception as exc:
+            # Resultado incerto (o commit pode ter chegado ao banco): não grava de novo
+            logger.exception("erro ao gravar lote do histórico", extra={"batch": len(batch)})
+            self._fail(batch, exc)
+            return
+        logger.debug(
+            "lote do histórico gravado",
+            extra={"batch": len(batch), "ms": round((time.perf_counter() - started) * 1000, 2)},
+        )
+
+    async def _write(self, batch: list) -> None:
+        async with AsyncSessionLocal() as db:
+            # sort_by_parameter_order: as linhas do RETURNING voltam na ordem dos valores,
+            # então cada requisição recebe o seu id
+            result = await db.execute(
+                insert(Historico).returning(
+                    Historico.id, Historico.profile_id, Historico.amount, Historico.time,
+                    sort_by_parameter_order=True,
+                ),
+                [values for values, _ in batch],
+            )
+            rows = result.all()
+            await historyService.after_insert(db, rows)
+            await db.commit()
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row)
+
+    def _fail(self, batch: list, exc: Exception) -> None:
+        # A requisição recebe o erro (e responde 500); o registro não foi gravado
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def start(self) -> None:
+        # Os eventos são criados aqui, no event loop que vai usá-los
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        # O loop só deve terminar pelo stop(), com a fila vazia. Se morrer antes, ninguém mais
+        # grava a fila: quem espera recebe erro e o insert() passa a gravar na hora
+        if self._task is task:
+            self._task = None
+        if task.cancelled():
+            exc = RuntimeError("group commit do histórico cancelado")
+        else:
+            exc = task.exception()
+        batch, self._current, self._pending = self._current + self._pending, [], []
+        if exc is None and not batch:
+            return
+        logger.error("group commit do histórico parou", exc_info=exc, extra={"pending": len(batch)})
+        self._fail(batch, exc or RuntimeError("group commit do histórico parou"))
+
+    async def stop(self) -> None:
+        # Para de esperar por mais registros e grava tudo o que está na fila antes de sair
+        # (o lote que já está sendo gravado termina normalmente)
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()
+        await self._task
+        self._task = None
+        self._closing = False
+
+
+write_buffer = HistoryWriteBuffer(
+    max_batch=settings.HISTORY_GROUP_COMMIT_MAX_BATCH,
+    linger_ms=settings.HISTORY_GROUP_COMMIT_LINGER_MS,
+)
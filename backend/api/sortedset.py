@@ -0,0 +1,50 @@
+from bisect import bisect_left, insort
+
+
+# Conjunto ordenado por pontuação em memória (por processo), com os mesmos nomes de
+# métodos dos sorted sets do Redis (ZADD, ZINCRBY, ZREVRANK...), para dar para trocar por um
+# Redis de verdade sem mudar quem usa.
+# Guarda um dicionário membro -> pontuação e uma lista ordenada de (-pontuação, membro):
+# achar a posição é busca binária (O(log n)); inserir/remover desloca a lista com memmove,
+# que é O(n) mas muito barato até alguns milhões de membros.
+# Empates ficam em ordem crescente de membro.
+class SortedSet:
+    def __init__(self):
+        self._scores: dict = {}   # membro -> pontuação
+        self._keys: list = []     # (-pontuação, membro), maior pontuação primeiro
+
+    def zadd(self, member, score) -> None:
+        old = self._scores.get(member)
+        if old is not None:
+            if old == score:
+                return
+            del self._keys[bisect_left(self._keys, (-old, member))]
+        self._scores[member] = score
+        insort(self._keys, (-score, member))
+
+    def zincrby(self, member, delta):
+        score = self._scores.get(member, 0) + delta
+        self.zadd(member, score)
+        return score
+
+    def zrem(self, member) -> None:
+        old = self._scores.pop(member, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, member))]
+
+    def zscore(self, member):
+        return self._scores.get(member)
+
+    def zrevrank(self, member):
+        # Posição começando em 0 (maior pontuação = 0); None se não estiver no conjunto
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return bisect_left(self._keys, (-score, member))
+
+    def zrevrange(self, start: int, stop: int) -> list:
+        # [(membro, pontuação)] das posições start..stop (inclusive, como no Redis)
+        return [(member, -score) for score, member in self._keys[start:stop + 1]]
+
+    def __len__(self) -> int:
+        return len(self._keys)
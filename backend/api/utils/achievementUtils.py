@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+# ---------------------------
+# Conquistas e sequências de metas
+# ---------------------------
+# Cada conquista é um limite sobre um dos contadores de profile_stats
+# (total_ml, entries, goal_days, best_streak). Ficam aqui no código, não no banco:
+# adicionar uma conquista nova não precisa de migração.
+
+
+@dataclass(frozen=True)
+class Achievement:
+    code: str           # Chave gravada em profile_achievements
+    title: str
+    description: str
+    stat: str           # Contador de profile_stats comparado com o limite
+    threshold: float
+
+
+ACHIEVEMENTS = (
+    Achievement("primeiro_gole", "Primeiro gole", "Registre água pela primeira vez", "entries", 1),
+    Achievement("meta_batida", "Meta batida", "Bata a meta de um dia", "goal_days", 1),
+    Achievement("sequencia_3", "Embalado", "Bata a meta 3 dias seguidos", "best_streak", 3),
+    Achievement("sequencia_7", "Semana perfeita", "Bata a meta 7 dias seguidos", "best_streak", 7),
+    Achievement("sequencia_30", "Mês perfeito", "Bata a meta 30 dias seguidos", "best_streak", 30),
+    Achievement("metas_30", "Constância", "Bata a meta em 30 dias", "goal_days", 30),
+    Achievement("litros_10", "10 litros", "Beba 10 litros no total", "total_ml", 10_000),
+    Achievement("litros_100", "100 litros", "Beba 100 litros no total", "total_ml", 100_000),
+    Achievement("litros_1000", "Oceano", "Beba 1000 litros no total", "total_ml", 1_000_000),
+)
+
+
+def goal_met(total_ml: float, target_ml: float) -> bool:
+    # Perfil sem peso (meta 0) nunca bate a meta
+    return target_ml > 0 and total_ml >= target_ml
+
+
+def unlocked_codes(stats) -> set[str]:
+    # Conquistas que valem para os contadores (objeto com os campos de profile_stats)
+    return {a.code for a in ACHIEVEMENTS if getattr(stats, a.stat) >= a.threshold}
+
+
+def progress(stats, achievement: Achievement) -> float:
+    # Progresso de 0 a 1 até desbloquear
+    return min(getattr(stats, achievement.stat) / achievement.threshold, 1.0)
+
+
+def build_runs(days) -> list[tuple[date, date]]:
+    # Junta dias com a meta batida (em ordem crescente) em sequências [(início, fim)]
+    runs = []
+    for day in days:
+        if runs and runs[-1][1] == day - timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def run_length(start: date, end: date) -> int:
+    return (end - start).days + 1
+
+
+def current_streak(last_run, today: date) -> int:
+    # A sequência atual é a mais recente, se ainda não foi quebrada:
+    # termina hoje, ou ontem (hoje ainda dá tempo de bater a meta)
+    if last_run is None:
+        return 0
+    start, end = last_run
+    if end >= today - timedelta(days=1):
+        return run_length(start, end)
+    return 0
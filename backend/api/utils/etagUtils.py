@@ -0,0 +1,45 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# ---------------------------
+# ETag das leituras do perfil e do histórico
+# ---------------------------
+# Cada perfil tem um contador "version" que sobe a cada escrita (registro novo, exclusão,
+# PATCH /perfil). O ETag é derivado dele (e dos parâmetros da consulta), então quando
+# o app reenvia o ETag em If-None-Match e nada mudou, a rota responde 304 sem corpo
+# e sem consultar os registros.
+
+# no-cache: o app pode guardar a resposta, mas sempre confirma com o servidor antes de usar
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    # ETag forte (entre aspas, sem W/) a partir das partes que definem a resposta
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match pode trazer vários ETags separados por vírgula, ou "*"
+    # A comparação é fraca (ignora o prefixo W/), como manda a RFC 9110 para If-None-Match
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    # Resposta 304: sem corpo, só o ETag para o app continuar usando o que já tem
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
@@ -0,0 +1,157 @@
+import base64
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, cast, func
+
+# ---------------------------
+# Modos de resumo do histórico
+# ---------------------------
+# Mesmos nomes usados pelo filterHistory do Frontend (utils/historyUtils.ts)
+# modo -> unidade do date_trunc usada para agrupar os registros dentro do período
+SUMMARY_BUCKETS = {
+    "Diário": "hour",    # Hoje, hora a hora
+    "Semanal": "day",    # Semana atual (domingo a sábado), dia a dia
+    "Mensal": "day",     # Mês atual, dia a dia
+    "Anual": "month",    # Ano atual, mês a mês
+}
+
+
+def week_start(day: date) -> date:
+    # Domingo da semana de "day" (semanas de domingo a sábado, igual ao app)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def period_bounds(mode: str, now: datetime) -> tuple[datetime, datetime]:
+    # Retorna o intervalo [início, fim) do período atual no fuso de "now"
+    # "now" deve ter fuso (ex: datetime.now(ZoneInfo("America/Sao_Paulo")))
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if mode == "Diário":
+        start = start_of_day
+        end = start + timedelta(days=1)
+    elif mode == "Semanal":
+        # Domingo como início da semana, igual ao app
+        start = start_of_day - (now.date() - week_start(now.date()))
+        end = start + timedelta(days=7)
+    elif mode == "Mensal":
+        start = start_of_day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    elif mode == "Anual":
+        start = start_of_day.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    else:
+        raise ValueError(f"Modo de resumo inválido: {mode}")
+
+    return start, end
+
+
+# ---------------------------
+# Cursor da listagem paginada
+# ---------------------------
+# A listagem usa paginação por chave (keyset) em (time, id): o cursor guarda o último
+# registro entregue e a próxima página começa logo depois dele, sem OFFSET.
+HISTORY_PAGE_SIZE = 100   # Tamanho padrão da página
+HISTORY_PAGE_MAX = 500    # Limite máximo que o cliente pode pedir
+
+HISTORY_BATCH_MAX = 500   # Máximo de registros por envio em lote (POST /historico/lote)
+
+
+def encode_cursor(time: datetime, id: int) -> str:
+    # Token opaco para o cliente (base64 url-safe de "time|id")
+    raw = f"{time.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    # Lança ValueError se o token for inválido
+    padded = cursor + "=" * (-len(cursor) % 4)
+    time_str, id_str = base64.urlsafe_b64decode(padded).decode().split("|")
+    return datetime.fromisoformat(time_str), int(id_str)
+
+
+# ---------------------------
+# Sincronização incremental (GET /historico/sync)
+# ---------------------------
+HISTORY_SYNC_MAX = 1000   # Máximo de alterações lidas do change-log por chamada
+
+
+def collapse_changes(changes) -> tuple[list, list[int]]:
+    # Junta as alterações (em ordem de seq) no estado final que o app precisa aplicar:
+    # - inseridos: registros novos que ainda existem
+    # - removidos: ids apagados (inclusive os criados e apagados dentro da mesma janela,
+    #   porque o app pode ter recebido o registro na resposta do POST)
+    inserted = {}
+    removed = {}
+    for change in changes:
+        if change.op == "insert":
+            inserted[change.historico_id] = change
+        else:
+            inserted.pop(change.historico_id, None)
+            removed[change.historico_id] = None
+    return list(inserted.values()), list(removed)
+
+
+# ---------------------------
+# Envio em lote (POST /historico/lote)
+# ---------------------------
+def unique_batch(entries) -> dict:
+    # client_id -> item, sem os repetidos do próprio lote (fica a primeira ocorrência)
+    unique = {}
+    for entry in entries:
+        unique.setdefault(entry.client_id, entry)
+    return unique
+
+
+def missing_client_ids(unique: dict, saved: dict) -> list:
+    # client_ids que não voltaram do INSERT: já tinham sido gravados (retentativa do app)
+    return [client_id for client_id in unique if client_id not in saved]
+
+
+def rows_in_sent_order(entries, saved: dict) -> list:
+    # Registros na mesma ordem do envio (um repetido recebe o mesmo registro da primeira vez)
+    return [saved[entry.client_id] for entry in entries]
+
+
+# ---------------------------
+# Exportação do histórico
+# ---------------------------
+EXPORT_BATCH_SIZE = 1000  # Linhas buscadas do cursor do banco por vez
+
+EXPORT_FORMATS = {
+    # formato -> (content-type, cabeçalho)
+    "csv": ("text/csv; charset=utf-8", "id,amount,time\n"),
+    "ndjson": ("application/x-ndjson", ""),
+}
+
+
+def history_items(rows) -> list[dict]:
+    # Linhas com id, amount e time (ex: RETURNING ou select das colunas) nos mesmos
+    # campos do HistorySchema, prontas para o orjson (modo FAST_JSON)
+    return [{"id": row.id, "amount": row.amount, "time": row.time} for row in rows]
+
+
+def format_export_rows(rows, fmt: str) -> str:
+    # Converte um lote de linhas (id, amount, time) no texto do formato pedido
+    if fmt == "csv":
+        return "".join(f"{row.id},{row.amount},{row.time.isoformat()}\n" for row in rows)
+    return "".join(
+        json.dumps({"id": row.id, "amount": row.amount, "time": row.time.isoformat()}) + "\n"
+        for row in rows
+    )
+
+
+# ---------------------------
+# Conversões de fuso no SQL
+# ---------------------------
+# A coluna historico.time é "timestamp without time zone" preenchida com now(),
+# ou seja, guarda o horário no fuso da sessão do banco (current_setting('TimeZone')).
+
+def local_time(column, tz: str):
+    # Converte o horário salvo para o horário local do fuso "tz"
+    return func.timezone(tz, func.timezone(func.current_setting("TimeZone"), column))
+
+
+def db_time(value: datetime):
+    # Converte um datetime com fuso para o mesmo formato salvo na coluna
+    # Assim a comparação é feita direto na coluna e pode usar índice
+    return func.timezone(func.current_setting("TimeZone"), cast(value, DateTime(timezone=True)))
@@ -0,0 +1,95 @@
+import math
+from dataclasses import dataclass
+
+# ---------------------------
+# Metas de hidratação
+# ---------------------------
+# Mesmas regras do Frontend (utils/waterUtils.ts), para o backend saber
+# quanto falta para o usuário bater a meta do dia.
+
+ML_PER_KG = 35          # mL de água por kg de peso por dia
+MISSIONS_PER_DAY = 3    # Missões do dia: manhã, tarde e noite
+
+# Faixas de temperatura (°C) -> mL por minuto de exercício
+# ≤ 20°C => 6.5 | 21–26°C => 10 | 27–32°C => 13.5 | > 32°C => 17.5
+EXERCISE_ML_PER_MIN = ((20, 6.5), (26, 10.0), (32, 13.5))
+EXERCISE_ML_PER_MIN_HOT = 17.5
+
+
+def js_round(value: float) -> float:
+    # Arredonda igual ao Math.round do app (0.5 sobe); o round() do Python arredonda para o par
+    return float(math.floor(value + 0.5))
+
+
+def calculate_daily_water_target(weight_kg: float) -> float:
+    # Exemplo: 70 kg * 35 = 2450 mL por dia
+    return weight_kg * ML_PER_KG
+
+
+def calculate_per_mission_target(weight_kg: float, missions_count: int = MISSIONS_PER_DAY) -> float:
+    # Exemplo: 2450 mL / 3 = ~817 mL por missão
+    return calculate_daily_water_target(weight_kg) / missions_count
+
+
+def calculate_extra_exercise_mission(activity_time: float, ambient_temp_c: float) -> float:
+    # Água extra para a missão de exercício (0 se não houver exercício)
+    if activity_time <= 0 or ambient_temp_c <= 0:
+        return 0.0
+
+    ml_per_min = EXERCISE_ML_PER_MIN_HOT
+    for max_temp, rate in EXERCISE_ML_PER_MIN:
+        if ambient_temp_c <= max_temp:
+            ml_per_min = rate
+            break
+
+    return activity_time * ml_per_min
+
+
+# Metas do dia de um perfil, já arredondadas como o app mostra
+@dataclass(frozen=True)
+class WaterGoal:
+    daily_target_ml: float   # Meta diária pelo peso
+    per_mission_ml: float    # Meta de cada uma das 3 missões
+    extra_mission_ml: float  # Missão extra de exercício
+    total_target_ml: float   # Meta diária + missão extra
+
+
+def calculate_water_goal(weight_kg: float, activity_time: float, ambient_temp_c: float) -> WaterGoal:
+    daily = js_round(calculate_daily_water_target(weight_kg))
+    extra = js_round(calculate_extra_exercise_mission(activity_time, ambient_temp_c))
+    return WaterGoal(
+        daily_target_ml=daily,
+        per_mission_ml=js_round(calculate_per_mission_target(weight_kg)),
+        extra_mission_ml=extra,
+        total_target_ml=daily + extra,
+    )
+
+
+# ---------------------------
+# Modo em lote (NumPy)
+# ---------------------------
+# Calcula as metas de todos os perfis de uma vez, para jobs noturnos.
+# O NumPy é opcional: instale com `poetry install --extras jobs`.
+
+def calculate_water_goals_bulk(weights_kg, activity_times, ambient_temps_c) -> dict:
+    import numpy as np
+
+    weight = np.asarray(weights_kg, dtype=float)
+    activity = np.asarray(activity_times, dtype=float)
+    temp = np.asarray(ambient_temps_c, dtype=float)
+
+    ml_per_min = np.select(
+        [temp <= max_temp for max_temp, _ in EXERCISE_ML_PER_MIN],
+        [rate for _, rate in EXERCISE_ML_PER_MIN],
+        default=EXERCISE_ML_PER_MIN_HOT,
+    )
+    extra = np.where((activity > 0) & (temp > 0), activity * ml_per_min, 0.0)
+
+    daily = np.floor(weight * ML_PER_KG + 0.5)
+    extra = np.floor(extra + 0.5)
+    return {
+        "daily_target_ml": daily,
+        "per_mission_ml": np.floor(weight * ML_PER_KG / MISSIONS_PER_DAY + 0.5),
+        "extra_mission_ml": extra,
+        "total_target_ml": daily + extra,
+    }
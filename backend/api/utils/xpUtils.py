@@ -0,0 +1,41 @@
+from math import isqrt
+
+# ---------------------------
+# Regras de nível (XP)
+# ---------------------------
+# Subir do nível atual custa "xp_to_next"; cada nível seguinte custa XP_STEP a mais.
+# Ganhar k níveis custa a soma da progressão aritmética:
+#   S(k) = k * xp_to_next + XP_STEP * k * (k - 1) / 2
+# Então o número de níveis ganhos é o maior k com S(k) <= XP disponível,
+# que sai direto da fórmula de Bhaskara em vez de subir um nível por vez.
+XP_STEP = 100
+
+
+def _levels_cost(k: int, xp_to_next: int) -> int:
+    # XP necessário para subir k níveis a partir do nível atual
+    return k * xp_to_next + XP_STEP * k * (k - 1) // 2
+
+
+def apply_xp(level: int, current_xp: int, xp_to_next: int, add_xp: int) -> tuple[int, int, int]:
+    # Retorna (level, current_xp, xp_to_next) depois de somar add_xp, em O(1)
+    available = current_xp + add_xp
+    if available < xp_to_next:
+        return level, available, xp_to_next
+
+    # S(k) <= available  <=>  50k² + (xp_to_next - 50)k - available <= 0
+    b = xp_to_next - XP_STEP // 2
+    k = max((isqrt(b * b + 2 * XP_STEP * available) - b) // XP_STEP, 0)
+
+    # Ajuste fino do arredondamento da raiz inteira
+    while _levels_cost(k + 1, xp_to_next) <= available:
+        k += 1
+    while k > 0 and _levels_cost(k, xp_to_next) > available:
+        k -= 1
+
+    return level + k, available - _levels_cost(k, xp_to_next), xp_to_next + XP_STEP * k
+
+
+def total_xp(level: int, current_xp: int) -> int:
+    # XP acumulado desde o nível 1 (que começa com xp_to_next = XP_STEP)
+    # Usado para ordenar o ranking: subir até "level" custa XP_STEP * (1 + 2 + ... + level - 1)
+    return _levels_cost(level - 1, XP_STEP) + current_xp
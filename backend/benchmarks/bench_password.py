@@ -0,0 +1,71 @@
+# Micro-benchmark do hash de senha (Argon2) com os parâmetros do Settings
+# Mede quantos logins por segundo cada núcleo aguenta, sozinho e pelo pool dedicado.
+#
+# Uso (na pasta backend):
+#   python -m benchmarks.bench_password
+#   ARGON2_MEMORY_COST=32768 python -m benchmarks.bench_password --seconds 5
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from api import security
+from api.settings import settings
+
+
+def bench_single(hashed: str, seconds: float) -> float:
+    # Verificações por segundo numa única thread (= logins/s por núcleo)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        security.verify_password("senha-de-teste", hashed)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+async def bench_pool(hashed: str, seconds: float, concurrency: int) -> float:
+    # Verificações por segundo passando pelo pool dedicado, com várias requisições ao mesmo tempo
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal count
+        while time.perf_counter() < deadline:
+            await security.verify_and_update_password_async("senha-de-teste", hashed)
+            count += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do Argon2 (logins/s)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duração de cada medição")
+    parser.add_argument("--concurrency", type=int, default=settings.PASSWORD_HASH_MAX_PENDING,
+                        help="requisições simultâneas na medição do pool")
+    args = parser.parse_args()
+
+    hashed = security.hash_password("senha-de-teste")
+    single = bench_single(hashed, args.seconds)
+    pooled = asyncio.run(bench_pool(hashed, args.seconds, args.concurrency))
+    workers = settings.PASSWORD_HASH_WORKERS
+
+    print(json.dumps({
+        "argon2": {
+            "time_cost": settings.ARGON2_TIME_COST,
+            "memory_cost": settings.ARGON2_MEMORY_COST,
+            "parallelism": settings.ARGON2_PARALLELISM,
+        },
+        "cpus": os.cpu_count(),
+        "hash_workers": workers,
+        "ms_per_login": round(1000 / single, 1),
+        "logins_per_sec_per_core": round(single, 1),
+        "logins_per_sec_pool": round(pooled, 1),
+        "logins_per_sec_per_worker_thread": round(pooled / workers, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Micro-benchmark da serialização das respostas de GET /historico
+# Compara, por lote de linhas, o caminho padrão (HistorySchema.model_validate em cada linha,
+# validação de novo pelo response_model e JSONResponse) com o modo FAST_JSON
+# (linhas da consulta direto para o orjson). Não usa banco: as linhas são geradas aqui.
+#
+# Uso (na pasta backend, com o extra "fast" instalado):
+#   python -m benchmarks.bench_serialization
+#   python -m benchmarks.bench_serialization --rows 10000 --repeat 20
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.schemas.historySchema import HistorySchema
+from api.utils.historyUtils import history_items
+
+# Mesmo formato das linhas de select(Historico.id, Historico.amount, Historico.time)
+Row = namedtuple("Row", "id amount time")
+
+
+def make_rows(count: int) -> list:
+    start = datetime(2025, 1, 1, 8, 0, 0, 123456)
+    return [Row(i, 250.0 + i % 7, start + timedelta(minutes=17 * i)) for i in range(count)]
+
+
+async def standard(rows, field) -> bytes:
+    # Caminho atual: valida cada linha, o FastAPI valida de novo e serializa com o json padrão
+    content = [HistorySchema.model_validate(row) for row in rows]
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+async def fast(rows, field) -> bytes:
+    # FAST_JSON: linhas viram dicionários e o orjson gera o JSON
+    return ORJSONResponse(history_items(rows)).body
+
+
+def measure(func, rows, field, repeat: int) -> float:
+    # Melhor tempo (ms) entre as repetições
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(func(rows, field))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da serialização do histórico")
+    parser.add_argument("--rows", type=int, default=10_000, help="linhas por resposta")
+    parser.add_argument("--repeat", type=int, default=10, help="repetições (vale a melhor)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    field = create_model_field(name="Response", type_=List[HistorySchema], mode="serialization")
+
+    # Os dois caminhos precisam gerar o mesmo JSON
+    a = json.loads(asyncio.run(standard(rows, field)))
+    b = json.loads(asyncio.run(fast(rows, field)))
+    assert a == b, "respostas diferentes entre o modo padrão e o FAST_JSON"
+
+    standard_ms = measure(standard, rows, field, args.repeat)
+    fast_ms = measure(fast, rows, field, args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "standard_ms": round(standard_ms, 2),
+        "fast_json_ms": round(fast_ms, 2),
+        "per_10k_rows_ms": {
+            "standard": round(standard_ms * 10_000 / args.rows, 2),
+            "fast_json": round(fast_ms * 10_000 / args.rows, 2),
+        },
+        "speedup": round(standard_ms / fast_ms, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
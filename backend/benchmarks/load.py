@@ -0,0 +1,232 @@
+# Teste de carga das rotas mais usadas da API
+# Cria N usuários com M registros de histórico cada e dispara uma mistura de
+# login, GET/POST/DELETE /historico e PATCH /perfil com a concorrência escolhida.
+# No fim imprime um JSON com p50/p95/p99, vazão e consultas SQL por requisição
+# (lidas do GET /metrics), para comparar com uma linha de base antes do deploy.
+#
+# Precisa do PostgreSQL (serviço do docker-compose): as rotas usam SQL específico
+# do Postgres (ON CONFLICT, timezone(), date_trunc), então SQLite não serve aqui.
+#
+# Uso (na pasta backend):
+#   python -m benchmarks.load                                   # app em processo (ASGI)
+#   python -m benchmarks.load --url http://127.0.0.1:8000       # servidor já rodando
+#   python -m benchmarks.load --users 20 --rows 1000 --requests 5000 --concurrency 50
+#   python -m benchmarks.load --output baseline.json
+# Todos os usuários saem do mesmo IP e fazem muitas escritas seguidas: desligue o limite de
+# requisições (RATE_LIMIT_ENABLED=false, no processo ou no servidor) para medir a API em si.
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from api.utils.historyUtils import HISTORY_BATCH_MAX
+
+PASSWORD = "bench"
+
+# operação -> peso na mistura (leituras são bem mais comuns que escritas no app)
+DEFAULT_MIX = {
+    "login": 1,
+    "historico_get": 10,
+    "historico_post": 5,
+    "historico_delete": 1,
+    "perfil_patch": 2,
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    # Percentil pelo método do "nearest rank" (lista já ordenada)
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    # "login=1,historico_get=10" -> {"login": 1, "historico_get": 10}
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"operação desconhecida: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+async def scrape_queries(client: httpx.AsyncClient) -> dict[tuple[str, str], tuple[float, float]]:
+    # (método, rota) -> (requisições, consultas SQL) acumuladas no /metrics
+    # Se a API roda com vários workers, cada um tem seus contadores e o número fica aproximado
+    r = await client.get("/metrics")
+    r.raise_for_status()
+    requests = defaultdict(float)
+    queries = defaultdict(float)
+    for family in text_string_to_metric_families(r.text):
+        for sample in family.samples:
+            key = (sample.labels.get("method"), sample.labels.get("route"))
+            if sample.name == "aquaquest_http_request_duration_seconds_count":
+                requests[key] += sample.value
+            elif sample.name == "aquaquest_db_queries_total":
+                queries[key] += sample.value
+    return {key: (count, queries[key]) for key, count in requests.items()}
+
+
+class User:
+    def __init__(self, email: str, headers: dict):
+        self.email = email
+        self.headers = headers
+        self.history_ids: list[int] = []
+
+
+async def seed(client: httpx.AsyncClient, args) -> list[User]:
+    # Cria os usuários pela própria API (mantém o rollup diário consistente)
+    # e envia o histórico em lotes pelo POST /historico/lote
+    run_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    now = datetime.now().astimezone()
+
+    async def create(i: int) -> User:
+        async with semaphore:
+            email = f"load-{run_id}-{i}@bench.local"
+            r = await client.post("/users/", json={"name": f"Load {i}", "email": email, "password": PASSWORD})
+            r.raise_for_status()
+            r = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+            r.raise_for_status()
+            user = User(email, {"Authorization": f"Bearer {r.json()['access_token']}"})
+
+            for start in range(0, args.rows, HISTORY_BATCH_MAX):
+                batch = [
+                    {
+                        "amount": random.choice((150, 200, 250, 300, 500)),
+                        "time": (now - timedelta(minutes=37 * n)).isoformat(),
+                        "client_id": f"seed-{n}",
+                    }
+                    for n in range(start, min(start + HISTORY_BATCH_MAX, args.rows))
+                ]
+                r = await client.post("/historico/lote", json=batch, headers=user.headers)
+                r.raise_for_status()
+                user.history_ids += [row["id"] for row in r.json()]
+            return user
+
+    return await asyncio.gather(*(create(i) for i in range(args.users)))
+
+
+async def run_operation(client: httpx.AsyncClient, user: User, operation: str) -> int:
+    if operation == "login":
+        r = await client.post("/auth/login", data={"username": user.email, "password": PASSWORD})
+    elif operation == "historico_get":
+        r = await client.get("/historico/", headers=user.headers)
+    elif operation == "historico_post":
+        r = await client.post("/historico/", json={"amount": 250}, headers=user.headers)
+        if r.status_code == 201:
+            user.history_ids.append(r.json()["id"])
+    elif operation == "historico_delete":
+        if not user.history_ids:
+            return await run_operation(client, user, "historico_post")
+        history_id = user.history_ids.pop(random.randrange(len(user.history_ids)))
+        r = await client.delete(f"/historico/{history_id}", headers=user.headers)
+    else:
+        r = await client.patch("/perfil/", json={"add_xp": 10}, headers=user.headers)
+    return r.status_code
+
+
+async def run(args) -> dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from api.app import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://aquaquest"
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits) as client:
+        seed_start = time.perf_counter()
+        users = await seed(client, args)
+        seed_seconds = time.perf_counter() - seed_start
+
+        operations = random.choices(list(args.mix), weights=list(args.mix.values()), k=args.requests)
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+        queue = iter(operations)
+
+        async def worker():
+            for operation in queue:
+                user = random.choice(users)
+                start = time.perf_counter()
+                status_code = await run_operation(client, user, operation)
+                latencies[operation].append(time.perf_counter() - start)
+                if status_code >= 400:
+                    errors[operation] += 1
+
+        metrics_before = await scrape_queries(client)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        metrics_after = await scrape_queries(client)
+
+    def summary(values: list[float]) -> dict:
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+
+    report = {
+        "users": args.users,
+        "rows_per_user": args.rows,
+        "concurrency": args.concurrency,
+        "seed_seconds": round(seed_seconds, 2),
+        "duration_seconds": round(elapsed, 2),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "overall": summary([v for values in latencies.values() for v in values]),
+        "operations": {},
+    }
+    for operation, values in sorted(latencies.items()):
+        report["operations"][operation] = {**summary(values), "errors": errors[operation]}
+
+    # Consultas SQL por requisição de cada rota, no intervalo da carga
+    queries_per_request = {}
+    for key, (count, queries) in metrics_after.items():
+        before_count, before_queries = metrics_before.get(key, (0.0, 0.0))
+        if count > before_count:
+            queries_per_request[" ".join(key)] = round((queries - before_queries) / (count - before_count), 2)
+    report["queries_per_request"] = queries_per_request
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga das rotas principais da API")
+    parser.add_argument("--url", default=None, help="URL da API; sem ela roda o app em processo")
+    parser.add_argument("--users", type=int, default=10, help="usuários criados")
+    parser.add_argument("--rows", type=int, default=200, help="registros de histórico por usuário")
+    parser.add_argument("--requests", type=int, default=2000, help="requisições da carga")
+    parser.add_argument("--concurrency", type=int, default=20, help="requisições simultâneas")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="pesos das operações, ex: login=1,historico_get=10,historico_post=5",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="semente do random (carga reproduzível)")
+    parser.add_argument("--output", default=None, help="salva o JSON neste arquivo")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Teste de carga do add_xp: dispara vários PATCH /perfil simultâneos para o mesmo perfil
+# e confere se nenhum XP foi perdido (antes do SELECT ... FOR UPDATE, escritas concorrentes
+# liam o mesmo XP e uma sobrescrevia a outra).
+#
+# Uso (na pasta backend, com o banco do docker-compose rodando):
+#   python -m benchmarks.xp_race                              # app em processo (ASGI)
+#   python -m benchmarks.xp_race --url http://127.0.0.1:8000  # servidor já rodando
+#   python -m benchmarks.xp_race --requests 500 --concurrency 50 --xp 37
+import argparse
+import asyncio
+import sys
+import uuid
+
+import httpx
+
+
+def total_xp(level: int, current_xp: int) -> int:
+    # XP acumulado desde o nível 1 (que começa com xp_to_next = 100)
+    # Subir do nível 1 até "level" custa 100 + 200 + ... + 100 * (level - 1)
+    return 100 * level * (level - 1) // 2 + current_xp
+
+
+async def run(args) -> int:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from api.app import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://aquaquest"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        # Usuário novo para o teste: nível 1, 0 XP
+        email = f"xp-race-{uuid.uuid4().hex[:12]}@bench.local"
+        r = await client.post("/users/", json={"name": "XP Race", "email": email, "password": "bench"})
+        r.raise_for_status()
+        r = await client.post("/auth/login", data={"username": email, "password": "bench"})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        failures = 0
+
+        async def add_xp():
+            nonlocal failures
+            async with semaphore:
+                r = await client.patch("/perfil/", json={"add_xp": args.xp}, headers=headers)
+                if r.status_code != 200:
+                    failures += 1
+
+        await asyncio.gather(*(add_xp() for _ in range(args.requests)))
+
+        profile = (await client.get("/perfil/", headers=headers)).json()
+
+    expected = args.requests * args.xp
+    got = total_xp(profile["level"], profile["current_xp"])
+    print(f"requisições: {args.requests} (falhas: {failures}), concorrência: {args.concurrency}")
+    print(f"XP esperado: {expected}, XP no perfil: {got} (nível {profile['level']})")
+    if failures or got != expected:
+        print("❌ XP perdido em atualizações concorrentes")
+        return 1
+    print("✅ Nenhuma atualização perdida")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do add_xp (atualizações perdidas)")
+    parser.add_argument("--url", default=None, help="URL da API; sem ela roda o app em processo")
+    parser.add_argument("--requests", type=int, default=200, help="quantidade de PATCH /perfil")
+    parser.add_argument("--concurrency", type=int, default=20, help="PATCH simultâneos")
+    parser.add_argument("--xp", type=int, default=25, help="add_xp de cada PATCH")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
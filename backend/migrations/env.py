@@ -7,8 +7,14 @@ from alembic import context
 
 from api.models.base import Base
 from api.models.profileModel import Profile   # ⬅ importa a model Profile
-from api.models.historyModel import Historico # ⬅ importa a model Historico
+from api.models.historyModel import Historico, HistoricoClientId # ⬅ importa as models do histórico
 from api.models.userModel import User # ⬅ importa a model Usuários
+from api.models.dailyHistoryModel import HistoricoDiario # ⬅ importa a model de totais diários
+from api.models.historyChangeModel import HistoricoChange, HistoricoChangeHorizon # ⬅ importa as models do change-log
+from api.models.streakModel import StreakRun # ⬅ importa a model das sequências de metas
+from api.models.profileStatsModel import ProfileStats # ⬅ importa a model dos contadores das conquistas
+from api.models.achievementModel import ProfileAchievement # ⬅ importa a model das conquistas
+from api.models.rateLimitModel import RateLimitBucket # ⬅ importa a model dos limites de requisições
 
 # Adiciona a raiz do projeto ao sys.path para importar settings
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -0,0 +1,28 @@
+"""historico profile_id/time index
+
+Revision ID: 3c1f7a9e2b54
+Revises: 9fd336756165
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9e2b54'
+down_revision: Union[str, Sequence[str], None] = '9fd336756165'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_historico_profile_id_time', 'historico', ['profile_id', 'time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_historico_profile_id_time', table_name='historico')
@@ -0,0 +1,115 @@
+"""historico partitioned by month
+
+Revision ID: a9d4e7c2f518
+Revises: f3c8d2e71a96
+Create Date: 2026-10-17 18:12:37.650291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e7c2f518'
+down_revision: Union[str, Sequence[str], None] = 'f3c8d2e71a96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partições futuras criadas já na migração (depois o job api.jobs.retention mantém)
+MONTHS_AHEAD = 3
+
+
+def _create_monthly_partitions() -> None:
+    # Uma partição por mês, do mês do registro mais antigo até MONTHS_AHEAD meses à frente
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce((SELECT min(time) FROM historico_old), now()));
+            last_month date := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF historico FOR VALUES FROM (%L) TO (%L)',
+                    'historico_' || to_char(month, 'YYYY_MM'),
+                    month::timestamp,
+                    (month + interval '1 month')::timestamp
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A tabela atual vira historico_old; a sequência do id passa para a tabela nova
+    op.rename_table('historico', 'historico_old')
+    op.execute(
+        """
+        CREATE TABLE historico (
+            id integer NOT NULL DEFAULT nextval('historico_id_seq'),
+            profile_id integer NOT NULL,
+            amount double precision NOT NULL,
+            time timestamp without time zone NOT NULL DEFAULT now(),
+            client_id varchar(64)
+        ) PARTITION BY RANGE (time)
+        """
+    )
+    op.execute("ALTER SEQUENCE historico_id_seq OWNED BY historico.id")
+
+    _create_monthly_partitions()
+    # Registros fora das partições mensais (ex: horário errado vindo do app) caem aqui
+    # até o job de retenção criar a partição certa e movê-los
+    op.execute("CREATE TABLE historico_default PARTITION OF historico DEFAULT")
+
+    op.execute(
+        """
+        INSERT INTO historico (id, profile_id, amount, time, client_id)
+        SELECT id, profile_id, amount, time, client_id FROM historico_old
+        """
+    )
+    op.drop_table('historico_old')
+
+    # Em tabela particionada a chave primária e as únicas precisam conter a coluna da partição.
+    # ix_historico_id (que repetia a chave primária) não é recriado.
+    op.create_primary_key('historico_pkey', 'historico', ['id', 'time'])
+    op.create_unique_constraint(
+        'uq_historico_profile_id_client_id', 'historico', ['profile_id', 'client_id', 'time']
+    )
+    op.create_index('ix_historico_profile_id_time', 'historico', ['profile_id', 'time'], unique=False)
+    op.create_foreign_key('historico_profile_id_fkey', 'historico', 'profiles', ['profile_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Volta para uma tabela comum (partições já arquivadas pelo job de retenção não voltam)
+    op.rename_table('historico', 'historico_old')
+    op.execute(
+        """
+        CREATE TABLE historico (
+            id integer NOT NULL DEFAULT nextval('historico_id_seq'),
+            profile_id integer NOT NULL,
+            amount double precision NOT NULL,
+            time timestamp without time zone NOT NULL DEFAULT now(),
+            client_id varchar(64)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE historico_id_seq OWNED BY historico.id")
+    op.execute(
+        """
+        INSERT INTO historico (id, profile_id, amount, time, client_id)
+        SELECT id, profile_id, amount, time, client_id FROM historico_old
+        """
+    )
+    op.drop_table('historico_old')  # Apaga também as partições
+
+    op.create_primary_key('historico_pkey', 'historico', ['id'])
+    op.create_index('ix_historico_id', 'historico', ['id'], unique=False)
+    op.create_unique_constraint('uq_historico_profile_id_client_id', 'historico', ['profile_id', 'client_id'])
+    op.create_index('ix_historico_profile_id_time', 'historico', ['profile_id', 'time'], unique=False)
+    op.create_foreign_key('historico_profile_id_fkey', 'historico', 'profiles', ['profile_id'], ['id'])
@@ -0,0 +1,30 @@
+"""historico client_id
+
+Revision ID: b7e2d4c81f09
+Revises: 3c1f7a9e2b54
+Create Date: 2026-10-17 11:02:18.774930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c81f09'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9e2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('historico', sa.Column('client_id', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('uq_historico_profile_id_client_id', 'historico', ['profile_id', 'client_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_historico_profile_id_client_id', 'historico', type_='unique')
+    op.drop_column('historico', 'client_id')
@@ -0,0 +1,36 @@
+"""historico_changes created_at and horizon
+
+Revision ID: c2d7e5a3f810
+Revises: b7e3a9d1c460
+Create Date: 2026-10-17 23:14:52.381907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d7e5a3f810'
+down_revision: Union[str, Sequence[str], None] = 'b7e3a9d1c460'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Default constante no ADD COLUMN: não reescreve a tabela (as linhas antigas ficam com a hora da migração)
+    op.add_column('historico_changes', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_table('historico_changes_horizon',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('pruned_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('historico_changes_horizon')
+    op.drop_column('historico_changes', 'created_at')
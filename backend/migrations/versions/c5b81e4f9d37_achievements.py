@@ -0,0 +1,58 @@
+"""streaks and achievements
+
+Revision ID: c5b81e4f9d37
+Revises: a9d4e7c2f518
+Create Date: 2026-10-17 19:05:12.481930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5b81e4f9d37'
+down_revision: Union[str, Sequence[str], None] = 'a9d4e7c2f518'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sem preenchimento aqui: cada perfil é montado a partir de historico_diario
+    # na primeira escrita no histórico ou no primeiro GET /perfil/conquistas
+    op.add_column('historico_diario', sa.Column('goal_met', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('streak_runs',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('start_day', sa.Date(), nullable=False),
+    sa.Column('end_day', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id', 'start_day')
+    )
+    op.create_index('ix_streak_runs_profile_id_end_day', 'streak_runs', ['profile_id', 'end_day'], unique=False)
+    op.create_table('profile_stats',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('total_ml', sa.Float(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('goal_days', sa.Integer(), nullable=False),
+    sa.Column('best_streak', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id')
+    )
+    op.create_table('profile_achievements',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=32), nullable=False),
+    sa.Column('unlocked_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id', 'code')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('profile_achievements')
+    op.drop_table('profile_stats')
+    op.drop_index('ix_streak_runs_profile_id_end_day', table_name='streak_runs')
+    op.drop_table('streak_runs')
+    op.drop_column('historico_diario', 'goal_met')
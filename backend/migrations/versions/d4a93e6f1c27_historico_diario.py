@@ -0,0 +1,52 @@
+"""historico_diario rollup
+
+Revision ID: d4a93e6f1c27
+Revises: b7e2d4c81f09
+Create Date: 2026-10-17 11:40:52.106318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from api.settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a93e6f1c27'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c81f09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('historico_diario',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total_ml', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id', 'day')
+    )
+
+    # Preenche com o histórico existente (dia no fuso settings.TIMEZONE, igual à aplicação)
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO historico_diario (profile_id, day, total_ml, count)
+            SELECT profile_id,
+                   CAST(timezone(:tz, timezone(current_setting('TimeZone'), time)) AS date),
+                   SUM(amount),
+                   COUNT(*)
+            FROM historico
+            GROUP BY 1, 2
+            """
+        ).bindparams(tz=settings.TIMEZONE)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('historico_diario')
@@ -0,0 +1,52 @@
+"""historico_client_ids idempotency keys
+
+Revision ID: d9a4c1e7b352
+Revises: c2d7e5a3f810
+Create Date: 2026-10-17 23:48:09.517264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4c1e7b352'
+down_revision: Union[str, Sequence[str], None] = 'c2d7e5a3f810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('historico_client_ids',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.String(length=64), nullable=False),
+    sa.Column('historico_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('time', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id', 'client_id')
+    )
+
+    # Chaves já usadas (se o mesmo client_id entrou com horários diferentes, vale o primeiro)
+    op.execute(
+        """
+        INSERT INTO historico_client_ids (profile_id, client_id, historico_id, amount, time)
+        SELECT profile_id, client_id, id, amount, time
+        FROM historico
+        WHERE client_id IS NOT NULL
+        ORDER BY id
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.drop_constraint('uq_historico_profile_id_client_id', 'historico', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint(
+        'uq_historico_profile_id_client_id', 'historico', ['profile_id', 'client_id', 'time']
+    )
+    op.drop_table('historico_client_ids')
@@ -0,0 +1,28 @@
+"""profiles version
+
+Revision ID: e1f6b3a58d42
+Revises: d4a93e6f1c27
+Create Date: 2026-10-17 16:58:03.412705
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f6b3a58d42'
+down_revision: Union[str, Sequence[str], None] = 'd4a93e6f1c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('profiles', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('profiles', 'version')
@@ -0,0 +1,69 @@
+"""unique users.email and profiles.user_id index
+
+Revision ID: e8a2f6c4d913
+Revises: c5b81e4f9d37
+Create Date: 2026-10-17 19:48:03.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a2f6c4d913'
+down_revision: Union[str, Sequence[str], None] = 'c5b81e4f9d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Os índices são criados com CONCURRENTLY: as tabelas continuam aceitando leituras e
+# escritas enquanto o índice é montado. CONCURRENTLY não roda dentro de transação,
+# por isso o autocommit_block (o que veio antes nesta execução é confirmado antes dele).
+
+
+def _drop_if_invalid(name: str) -> None:
+    # Um CREATE INDEX CONCURRENTLY que falhou deixa o índice marcado como inválido:
+    # apaga para a próxima tentativa criar de novo
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = '{name}' AND NOT i.indisvalid
+            ) THEN
+                EXECUTE 'DROP INDEX {name}';
+            END IF;
+        END $$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O índice único falharia com e-mails repetidos: avisa antes quais são
+    duplicates = op.get_bind().execute(
+        sa.text("SELECT email FROM users GROUP BY email HAVING count(*) > 1 ORDER BY email LIMIT 20")
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Há e-mails repetidos em users; resolva antes de migrar: " + ", ".join(duplicates)
+        )
+
+    with op.get_context().autocommit_block():
+        # Login e cadastro (User.email); também impede cadastros duplicados simultâneos
+        _drop_if_invalid('ix_users_email')
+        op.create_index('ix_users_email', 'users', ['email'], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+        # Perfil do usuário (Profile.user_id): create_perfil e tokens antigos sem "pid"
+        _drop_if_invalid('ix_profiles_user_id')
+        op.create_index('ix_profiles_user_id', 'profiles', ['user_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_profiles_user_id', table_name='profiles', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True, if_exists=True)
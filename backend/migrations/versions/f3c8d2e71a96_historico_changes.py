@@ -0,0 +1,50 @@
+"""historico_changes change-log
+
+Revision ID: f3c8d2e71a96
+Revises: e1f6b3a58d42
+Create Date: 2026-10-17 17:31:44.208153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8d2e71a96'
+down_revision: Union[str, Sequence[str], None] = 'e1f6b3a58d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('historico_changes',
+    sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('historico_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=6), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=True),
+    sa.Column('time', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_historico_changes_profile_id_seq', 'historico_changes', ['profile_id', 'seq'], unique=False)
+
+    # O histórico que já existe entra como "insert": sincronizar a partir de since=0
+    # devolve o estado completo, sem precisar de um caminho separado para a primeira carga
+    op.execute(
+        """
+        INSERT INTO historico_changes (profile_id, historico_id, op, amount, time)
+        SELECT profile_id, id, 'insert', amount, time
+        FROM historico
+        ORDER BY time, id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_historico_changes_profile_id_seq', table_name='historico_changes')
+    op.drop_table('historico_changes')
@@ -0,0 +1,52 @@
+from datetime import date
+from types import SimpleNamespace
+
+from api.utils.achievementUtils import (
+    ACHIEVEMENTS,
+    build_runs,
+    current_streak,
+    goal_met,
+    progress,
+    unlocked_codes,
+)
+
+
+def stats(total_ml=0.0, entries=0, goal_days=0, best_streak=0):
+    return SimpleNamespace(total_ml=total_ml, entries=entries, goal_days=goal_days, best_streak=best_streak)
+
+
+# === Sequências a partir dos dias com a meta batida ===
+def test_build_runs_junta_dias_seguidos():
+    days = [date(2025, 1, 30), date(2025, 1, 31), date(2025, 2, 1), date(2025, 2, 3), date(2025, 2, 5), date(2025, 2, 6)]
+    assert build_runs(days) == [
+        (date(2025, 1, 30), date(2025, 2, 1)),
+        (date(2025, 2, 3), date(2025, 2, 3)),
+        (date(2025, 2, 5), date(2025, 2, 6)),
+    ]
+    assert build_runs([]) == []
+
+
+def test_current_streak_vale_ate_ontem():
+    run = (date(2025, 3, 1), date(2025, 3, 4))
+    assert current_streak(run, date(2025, 3, 4)) == 4   # Bateu hoje
+    assert current_streak(run, date(2025, 3, 5)) == 4   # Hoje ainda dá tempo
+    assert current_streak(run, date(2025, 3, 6)) == 0   # Ontem não bateu: quebrou
+    assert current_streak(None, date(2025, 3, 6)) == 0
+
+
+def test_goal_met_sem_meta_nunca_bate():
+    assert goal_met(2000, 2000)
+    assert not goal_met(1999, 2000)
+    assert not goal_met(500, 0)
+
+
+# === Conquistas pelos contadores ===
+def test_unlocked_codes_e_progress():
+    assert unlocked_codes(stats()) == set()
+    codes = unlocked_codes(stats(total_ml=12_000, entries=40, goal_days=5, best_streak=3))
+    assert codes == {"primeiro_gole", "meta_batida", "sequencia_3", "litros_10"}
+
+    by_code = {a.code: a for a in ACHIEVEMENTS}
+    assert progress(stats(best_streak=3), by_code["sequencia_7"]) == 3 / 7
+    assert progress(stats(best_streak=9), by_code["sequencia_7"]) == 1.0
+    assert len(by_code) == len(ACHIEVEMENTS)  # Códigos não se repetem
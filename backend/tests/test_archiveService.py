@@ -0,0 +1,17 @@
+from datetime import date
+
+from api.services import archiveService
+
+
+# === Meses arquivados vêm dos nomes dos arquivos, em ordem ===
+def test_archived_months(tmp_path, monkeypatch):
+    monkeypatch.setattr(archiveService.settings, "HISTORY_ARCHIVE_DIR", str(tmp_path))
+    assert archiveService.archived_months() == []
+    assert archiveService.archived_until() is None
+
+    for name in ("historico_2024_12.parquet", "historico_2024_02.parquet", "outro.txt", "historico_2024_03.parquet.tmp"):
+        (tmp_path / name).touch()
+
+    assert archiveService.archived_months() == [date(2024, 2, 1), date(2024, 12, 1)]
+    # Dezembro arquivado: o banco vale a partir de janeiro do ano seguinte
+    assert archiveService.archived_until() == date(2025, 1, 1)
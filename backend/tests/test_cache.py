@@ -0,0 +1,35 @@
+from api.cache import TTLCache
+
+
+# === Itens expiram depois do TTL ===
+def test_ttl_cache_expira(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("api.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now[0] += 61
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+# === Quando enche, descarta o item usado há mais tempo ===
+def test_ttl_cache_descarta_menos_usado():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")       # "a" passa a ser o mais recente
+    cache.set("c", 3)    # estoura o limite e remove "b"
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_pop():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
@@ -0,0 +1,23 @@
+from api.utils.etagUtils import etag_matches, make_etag
+
+
+# === O ETag muda junto com a versão e com os parâmetros da consulta ===
+def test_make_etag_muda_com_versao_e_parametros():
+    etag = make_etag("historico", 1, 5, None, None, None, 100)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("historico", 1, 5, None, None, None, 100)
+    assert etag != make_etag("historico", 1, 6, None, None, None, 100)
+    assert etag != make_etag("historico", 1, 5, None, None, None, 50)
+
+
+# === If-None-Match aceita lista, "*" e ETags fracos ===
+def test_etag_matches():
+    etag = make_etag("perfil", 1, 1)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"outro", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"outro"', etag)
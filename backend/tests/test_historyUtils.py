@@ -0,0 +1,130 @@
+import json
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from api.schemas.historySchema import HistorySchema
+from api.utils.historyUtils import (
+    collapse_changes,
+    decode_cursor,
+    encode_cursor,
+    format_export_rows,
+    history_items,
+    missing_client_ids,
+    period_bounds,
+    rows_in_sent_order,
+    unique_batch,
+)
+
+TZ = ZoneInfo("America/Sao_Paulo")
+
+
+# === Diário: do início do dia até o início do dia seguinte ===
+def test_period_bounds_diario():
+    start, end = period_bounds("Diário", datetime(2025, 11, 12, 15, 30, tzinfo=TZ))
+    assert start == datetime(2025, 11, 12, tzinfo=TZ)
+    assert end == datetime(2025, 11, 13, tzinfo=TZ)
+
+
+# === Semanal: semana começa no domingo, igual ao app ===
+def test_period_bounds_semanal_comeca_no_domingo():
+    # 12/11/2025 é uma quarta-feira
+    start, end = period_bounds("Semanal", datetime(2025, 11, 12, 8, tzinfo=TZ))
+    assert start == datetime(2025, 11, 9, tzinfo=TZ)
+    assert end == datetime(2025, 11, 16, tzinfo=TZ)
+
+    # No próprio domingo a semana começa no mesmo dia
+    start, _ = period_bounds("Semanal", datetime(2025, 11, 9, 23, tzinfo=TZ))
+    assert start == datetime(2025, 11, 9, tzinfo=TZ)
+
+
+# === Mensal e Anual: viradas de mês e de ano ===
+def test_period_bounds_mensal_e_anual():
+    assert period_bounds("Mensal", datetime(2025, 12, 31, 22, tzinfo=TZ)) == (
+        datetime(2025, 12, 1, tzinfo=TZ),
+        datetime(2026, 1, 1, tzinfo=TZ),
+    )
+    assert period_bounds("Anual", datetime(2024, 2, 29, tzinfo=TZ)) == (
+        datetime(2024, 1, 1, tzinfo=TZ),
+        datetime(2025, 1, 1, tzinfo=TZ),
+    )
+
+
+def test_period_bounds_modo_invalido():
+    with pytest.raises(ValueError):
+        period_bounds("Semestral", datetime(2025, 1, 1, tzinfo=TZ))
+
+
+# === Cursor da listagem: ida e volta e token inválido ===
+def test_cursor_ida_e_volta():
+    time = datetime(2025, 11, 12, 15, 30, 1, 123456)
+    assert decode_cursor(encode_cursor(time, 42)) == (time, 42)
+
+
+def test_cursor_invalido():
+    with pytest.raises(ValueError):
+        decode_cursor("isso-nao-e-um-cursor")
+
+
+# === Exportação: uma linha por registro em CSV e NDJSON ===
+def test_format_export_rows():
+    Row = namedtuple("Row", "id amount time")
+    rows = [Row(1, 250.0, datetime(2025, 11, 12, 8, 0)), Row(2, 300.0, datetime(2025, 11, 12, 9, 30))]
+
+    assert format_export_rows(rows, "csv") == "1,250.0,2025-11-12T08:00:00\n2,300.0,2025-11-12T09:30:00\n"
+
+    lines = format_export_rows(rows, "ndjson").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "amount": 250.0, "time": "2025-11-12T08:00:00"},
+        {"id": 2, "amount": 300.0, "time": "2025-11-12T09:30:00"},
+    ]
+
+
+# === Sincronização: criado e apagado na mesma janela vira só remoção ===
+def test_collapse_changes():
+    Change = namedtuple("Change", "historico_id op")
+    changes = [Change(1, "insert"), Change(2, "insert"), Change(1, "delete"), Change(3, "delete")]
+
+    inserted, removed = collapse_changes(changes)
+
+    assert [change.historico_id for change in inserted] == [2]
+    assert removed == [1, 3]
+
+
+# === Itens do modo FAST_JSON: mesmos campos do HistorySchema ===
+def test_history_items_mesmos_campos_do_schema():
+    Row = namedtuple("Row", "id profile_id amount time")
+    rows = [Row(1, 7, 250.0, datetime(2025, 3, 1, 10, 30))]
+    assert history_items(rows) == [HistorySchema.model_validate(rows[0]).model_dump()]
+
+
+Entry = namedtuple("Entry", "client_id amount")
+
+
+# === Envio em lote: client_id repetido no mesmo lote entra uma vez só (a primeira) ===
+def test_unique_batch_fica_a_primeira_ocorrencia():
+    entries = [Entry("a", 250.0), Entry("b", 300.0), Entry("a", 999.0)]
+
+    unique = unique_batch(entries)
+
+    assert list(unique) == ["a", "b"]
+    assert unique["a"].amount == 250.0
+
+
+# === Reenvio: os que não voltaram do INSERT são buscados como já gravados ===
+def test_reenvio_busca_os_ja_gravados():
+    entries = [Entry("a", 250.0), Entry("b", 300.0), Entry("c", 150.0)]
+    saved = {"b": "registro-b"}   # Só "b" era novo; "a" e "c" vieram de um envio anterior
+
+    assert missing_client_ids(unique_batch(entries), saved) == ["a", "c"]
+    assert missing_client_ids(unique_batch(entries), {"a": 1, "b": 2, "c": 3}) == []
+
+
+# === Resposta na ordem do envio, com repetidos apontando para o mesmo registro ===
+def test_rows_in_sent_order():
+    entries = [Entry("c", 150.0), Entry("a", 250.0), Entry("c", 150.0), Entry("b", 300.0)]
+    saved = {"a": "registro-a", "b": "registro-b", "c": "registro-c"}
+
+    assert rows_in_sent_order(entries, saved) == ["registro-c", "registro-a", "registro-c", "registro-b"]
@@ -0,0 +1,51 @@
+import json
+import logging
+
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, Counter, values
+
+from api.app import app
+from api.logger import JsonFormatter
+
+
+# === /metrics responde no formato do Prometheus e usa o caminho da rota como rótulo ===
+def test_metrics_registra_rota():
+    client = TestClient(app)
+    client.get("/")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'aquaquest_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    # A própria rota /metrics não entra nas métricas
+    assert 'route="/metrics"' not in client.get("/metrics").text
+
+
+# === Logs em JSON levam os campos passados em "extra" ===
+def test_json_formatter_inclui_extra():
+    record = logging.makeLogRecord({"name": "aquaquest.http", "levelname": "INFO", "msg": "request", "route": "/historico/"})
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["msg"] == "request"
+    assert data["logger"] == "aquaquest.http"
+    assert data["route"] == "/historico/"
+
+
+# === Vários workers (PROMETHEUS_MULTIPROC_DIR): /metrics soma os arquivos de todos ===
+def test_metrics_multiprocesso_le_a_pasta_dos_workers(tmp_path, monkeypatch):
+    registry = CollectorRegistry()
+    values.ValueClass = values.MultiProcessValue(lambda: 101)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    try:
+        Counter("aquaquest_teste_total", "Contador de teste", registry=registry).inc(2)
+        values.ValueClass = values.MultiProcessValue(lambda: 102)
+        Counter("aquaquest_teste_total", "Contador de teste", registry=CollectorRegistry()).inc(3)
+    finally:
+        values.ValueClass = values.MutexValue
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert "aquaquest_teste_total 5.0" in response.text
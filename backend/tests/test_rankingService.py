@@ -0,0 +1,85 @@
+import asyncio
+from datetime import timedelta
+
+from api.realtime import RESYNC_EVENT
+from api.services import rankingService
+from api.services.historyService import rollup_today
+from api.services.rankingService import Ranking
+from api.utils.historyUtils import week_start
+
+
+def loaded_ranking() -> Ranking:
+    ranking = Ranking()
+    ranking.week = week_start(rollup_today())
+    ranking.loaded = True
+    return ranking
+
+
+# === Semanal: soma o "historico.total" pelo dia de historico_diario, só da semana atual ===
+def test_semanal_soma_os_dias_da_semana():
+    ranking = loaded_ranking()
+    today = rollup_today()
+    last_week = ranking.week - timedelta(days=1)
+
+    ranking.on_event(1, {"type": "historico.total", "delta": {today.isoformat(): 500.0, last_week.isoformat(): 900.0}})
+    ranking.on_event(2, {"type": "historico.total", "delta": {today.isoformat(): 300.0}})
+    assert ranking.weekly.zscore(1) == 500.0
+    assert ranking.weekly.zscore(2) == 300.0
+
+    # Apagar tudo o que o perfil bebeu na semana tira ele do quadro
+    ranking.on_event(2, {"type": "historico.total", "delta": {today.isoformat(): -300.0}})
+    assert ranking.weekly.zscore(2) is None
+
+
+# === Várias requisições ao mesmo tempo antes da primeira carga: uma carga só ===
+def test_primeira_carga_uma_vez_so(monkeypatch):
+    ranking = Ranking()
+    loads = []
+
+    async def load(db):
+        loads.append(db)
+        await asyncio.sleep(0.01)
+        ranking.loaded = True
+
+    monkeypatch.setattr(ranking, "load", load)
+
+    async def run():
+        await asyncio.gather(*(ranking.ensure_loaded(None) for _ in range(5)))
+
+    asyncio.run(run())
+    assert len(loads) == 1
+
+
+# === "resync" do processo recarrega em segundo plano; os quadros antigos continuam valendo ===
+def test_resync_recarrega_em_segundo_plano(monkeypatch):
+    ranking = loaded_ranking()
+    ranking.xp.zadd(1, 100)
+    started = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def load(db):
+        started.append(ranking.board("xp").zscore(1))
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(rankingService, "AsyncSessionLocal", Session)
+    monkeypatch.setattr(ranking, "load", load)
+
+    async def run():
+        ranking.on_event(3, RESYNC_EVENT)   # "resync" de um perfil só: nada a recarregar
+        assert ranking._reload_task is None
+
+        ranking.on_event(0, RESYNC_EVENT)
+        ranking.on_event(0, RESYNC_EVENT)   # Já recarregando: não começa outra
+        task = ranking._reload_task
+        assert ranking.loaded and ranking.board("xp").zscore(1) == 100
+        await task
+
+    asyncio.run(run())
+    assert started == [100]
+    assert ranking._reload_task is None
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api import ratelimit
+from api.ratelimit import Admission, Limit, MemoryBackend, PostgresBackend
+
+
+# === Balde de fichas: "burst" seguidas, depois espera a reposição ===
+def test_balde_libera_o_burst_e_depois_recusa(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend()
+
+    async def run():
+        results = [await backend.take("historico:user:1", burst=3, rate=1.0) for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert results[-1][1] == pytest.approx(1.0)   # Uma ficha por segundo
+
+        # Outro usuário tem o seu próprio balde
+        assert (await backend.take("historico:user:2", burst=3, rate=1.0))[0]
+
+        now[0] += 1.0
+        assert (await backend.take("historico:user:1", burst=3, rate=1.0))[0]
+
+    asyncio.run(run())
+
+
+# === Baldes menos usados saem quando passa do limite de chaves ===
+def test_balde_em_memoria_tem_limite_de_chaves():
+    backend = MemoryBackend(maxsize=2)
+
+    async def run():
+        for key in ("a", "b", "c"):
+            await backend.take(key, burst=1, rate=1.0)
+
+    asyncio.run(run())
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def reject_code(coro) -> int:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(coro)
+    return exc.value.status_code
+
+
+# === Requisições simultâneas do mesmo usuário acima do limite: 429 ===
+def test_simultaneas_do_mesmo_usuario_recebem_429():
+    admission = Admission(MemoryBackend())
+    limit = Limit(by="user", burst=10, per_minute=60, user_in_flight=1, route_in_flight=10)
+
+    async def run():
+        async with admission.admit("historico", limit, "user:1"):
+            # Outro usuário passa; o mesmo usuário não
+            async with admission.admit("historico", limit, "user:2"):
+                pass
+            async with admission.admit("historico", limit, "user:1"):
+                pass
+
+    assert reject_code(run()) == 429
+    assert admission._user_in_flight == {}
+
+
+# === Rota lotada: espera na fila e responde 503 quando o tempo acaba ===
+def test_rota_lotada_responde_503(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "ADMISSION_QUEUE_TIMEOUT", 0.05)
+    admission = Admission(MemoryBackend())
+    limit = Limit(by="user", burst=10, per_minute=60, user_in_flight=5, route_in_flight=1)
+
+    async def run():
+        async with admission.admit("perfil", limit, "user:1"):
+            async with admission.admit("perfil", limit, "user:2"):
+                pass
+
+    assert reject_code(run()) == 503
+
+
+# === Recusada por simultâneas não gasta ficha do balde ===
+def test_recusa_por_simultaneas_nao_gasta_ficha():
+    class CountingBackend(MemoryBackend):
+        takes = 0
+
+        async def take(self, key, burst, rate):
+            self.takes += 1
+            return await super().take(key, burst, rate)
+
+    backend = CountingBackend()
+    admission = Admission(backend)
+    limit = Limit(by="user", burst=10, per_minute=60, user_in_flight=1, route_in_flight=10)
+
+    async def run():
+        async with admission.admit("historico", limit, "user:1"):
+            for _ in range(3):
+                with pytest.raises(HTTPException):
+                    async with admission.admit("historico", limit, "user:1"):
+                        pass
+
+    asyncio.run(run())
+    assert backend.takes == 1
+
+
+# === Backend postgres: banco fora do ar ou lento deixa passar (pool próprio, tempo curto) ===
+def test_backend_postgres_fora_do_ar_deixa_passar(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "DB_HOST", "127.0.0.1")
+    monkeypatch.setattr(ratelimit.settings, "DB_PORT", 1)
+    backend = PostgresBackend()
+
+    async def run():
+        try:
+            return await backend.take("login:ip:1", burst=1, rate=1.0)
+        finally:
+            await backend.engine.dispose()
+
+    assert asyncio.run(run()) == (True, 0.0)
+    assert backend.engine.pool.size() == ratelimit.settings.RATE_LIMIT_DB_POOL_SIZE
+
+
+# === Fila da rota: quem desiste por tempo não leva a vaga embora ===
+def test_fila_nao_perde_vagas(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "ADMISSION_QUEUE_TIMEOUT", 0.01)
+    admission = Admission(MemoryBackend())
+    limit = Limit(by="user", burst=1000, per_minute=60000, user_in_flight=100, route_in_flight=2)
+
+    async def hold(who, seconds):
+        async with admission.admit("perfil", limit, who):
+            await asyncio.sleep(seconds)
+
+    async def run():
+        # Muitas esperando a vaga que libera perto do fim do prazo
+        results = await asyncio.gather(
+            *(hold(f"user:{n}", 0.01) for n in range(50)),
+            return_exceptions=True,
+        )
+        assert any(isinstance(result, HTTPException) for result in results)
+        assert admission._gates["perfil"]._value == 2
+
+    asyncio.run(run())
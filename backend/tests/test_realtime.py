@@ -0,0 +1,125 @@
+import asyncio
+
+from api.realtime import QUEUE_SIZE, RESYNC_EVENT, Hub, LocalBackend, hub
+from api.routes import realtime as realtime_route
+from api.security import Principal, create_access_token, principal_cache
+from api.services.goalService import goal_cache
+
+
+# === Cada conexão recebe só os eventos do seu perfil ===
+def test_hub_entrega_por_perfil():
+    async def run():
+        hub = Hub(LocalBackend())
+        async with hub.subscribe(1) as queue1, hub.subscribe(2) as queue2:
+            hub.dispatch(1, {"type": "perfil"})
+            assert queue1.get_nowait() == {"type": "perfil"}
+            assert queue2.empty()
+        # Ao sair do "async with" a conexão deixa de receber
+        hub.dispatch(1, {"type": "perfil"})
+        assert hub._subscribers == {}
+
+    asyncio.run(run())
+
+
+# === Fila cheia (conexão lenta) vira um único "resync" ===
+def test_hub_fila_cheia_pede_resync():
+    async def run():
+        hub = Hub(LocalBackend())
+        async with hub.subscribe(1) as queue:
+            for i in range(QUEUE_SIZE + 1):
+                hub.dispatch(1, {"type": "historico.delete", "ids": [i]})
+            assert queue.qsize() == 1
+            assert queue.get_nowait() == RESYNC_EVENT
+
+    asyncio.run(run())
+
+
+# === Eventos internos (ex: "usuario") vão só para os listeners, não para as conexões ===
+def test_hub_evento_interno_nao_vai_para_o_websocket():
+    async def run():
+        hub = Hub(LocalBackend())
+        received = []
+        hub.add_listener(lambda profile_id, data: received.append((profile_id, data)))
+        async with hub.subscribe(0) as queue:
+            hub.dispatch(0, {"type": "usuario", "user_id": 7})
+            assert queue.empty()
+        assert received == [(0, {"type": "usuario", "user_id": 7})]
+
+    asyncio.run(run())
+
+
+# === Caches do principal e da meta saem em todo worker que recebe o evento ===
+def test_eventos_do_hub_invalidam_os_caches():
+    principal_cache.set(7, Principal(id=7, profile_id=3))
+    goal_cache.set(3, "meta")
+    goal_cache.set(4, "meta")
+
+    hub.dispatch(3, {"type": "perfil", "profile": {"level": 1, "current_xp": 0}})
+    assert goal_cache.get(3) is None
+    assert goal_cache.get(4) == "meta"
+    assert principal_cache.get(7) is not None
+
+    hub.dispatch(0, {"type": "usuario", "user_id": 7})
+    assert principal_cache.get(7) is None
+    goal_cache.clear()
+
+
+# === "resync" do processo: cada listener uma vez (mesmo sem conexões), cada conexão a sua cópia ===
+def test_dispatch_all_chama_cada_listener_uma_vez():
+    async def run():
+        hub = Hub(LocalBackend())
+        received = []
+        hub.add_listener(lambda profile_id, data: received.append((profile_id, data)))
+
+        hub.dispatch_all(RESYNC_EVENT)
+        assert received == [(0, RESYNC_EVENT)]
+
+        received.clear()
+        async with hub.subscribe(1) as queue1, hub.subscribe(2) as queue2, hub.subscribe(2) as queue3:
+            hub.dispatch_all(RESYNC_EVENT)
+            assert received == [(0, RESYNC_EVENT)]
+            assert [queue.get_nowait() for queue in (queue1, queue2, queue3)] == [RESYNC_EVENT] * 3
+
+    asyncio.run(run())
+
+
+# === LISTEN reconectado: os caches do principal e da meta são esvaziados ===
+def test_resync_do_processo_esvazia_os_caches():
+    principal_cache.set(7, Principal(id=7, profile_id=3))
+    goal_cache.set(3, "meta")
+
+    hub.dispatch(3, RESYNC_EVENT)   # "resync" de um perfil só não mexe nos caches
+    assert goal_cache.get(3) == "meta"
+
+    hub.dispatch_all(RESYNC_EVENT)
+    assert principal_cache.get(7) is None
+    assert goal_cache.get(3) is None
+
+
+# === WebSocket: erro no envio encerra a conexão, vai para o log e tira a assinatura ===
+def test_websocket_erro_no_envio_encerra_e_loga(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(realtime_route.logger, "warning", lambda msg, exc_info=None: warnings.append(exc_info))
+    principal_cache.set(8, Principal(id=8, profile_id=5))
+
+    class BrokenWebSocket:
+        async def accept(self):
+            pass
+
+        async def send_json(self, data):
+            raise RuntimeError("conexão caiu")
+
+        async def receive_text(self):
+            await asyncio.Event().wait()   # O app nunca manda nada
+
+    async def run():
+        handler = asyncio.create_task(realtime_route.Tempo_Real(BrokenWebSocket(), token=create_access_token({"sub": "8"})))
+        while 5 not in hub._subscribers:
+            await asyncio.sleep(0)
+        hub.dispatch(5, {"type": "perfil", "profile": {"level": 1, "current_xp": 0}})
+        await asyncio.wait_for(handler, timeout=1)
+
+    asyncio.run(run())
+    principal_cache.clear()
+    assert [type(exc) for exc in warnings] == [RuntimeError]
+    assert 5 not in hub._subscribers
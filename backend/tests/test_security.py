@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from api import security
+from api.security import Principal, create_access_token, get_current_user, principal_cache, verify_and_update_password
+
+
+# === Senha com parâmetros antigos do Argon2 ganha hash novo no login ===
+def test_verify_and_update_rehash_quando_parametros_mudam():
+    old_context = PasswordHash((Argon2Hasher(time_cost=1, memory_cost=8192, parallelism=1),))
+    old_hash = old_context.hash("senha")
+
+    valid, new_hash = verify_and_update_password("senha", old_hash)
+    assert valid
+    assert new_hash is not None and new_hash != old_hash
+
+    # Com o hash novo não precisa atualizar de novo
+    assert verify_and_update_password("senha", new_hash) == (True, None)
+
+
+def test_verify_and_update_senha_errada_ou_hash_desconhecido():
+    assert verify_and_update_password("errada", Argon2Hasher().hash("senha")) == (False, None)
+    assert verify_and_update_password("senha", "nao-e-um-hash") == (False, None)
+
+
+# === Usuário fora do cache: resolvido no primário; banco fora do ar não vira 401 ===
+def test_get_current_user_consulta_o_primario(monkeypatch):
+    class FailingSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt):
+            raise ConnectionError("primário fora do ar")
+
+    monkeypatch.setattr(security, "AsyncSessionLocal", FailingSession)
+    principal_cache.clear()
+    token = create_access_token({"sub": "7", "pid": 3})
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(get_current_user(token))
+
+    # No cache: nenhuma consulta
+    principal_cache.set(7, Principal(id=7, profile_id=3))
+    assert asyncio.run(get_current_user(token)) == Principal(id=7, profile_id=3)
+    principal_cache.clear()
@@ -0,0 +1,77 @@
+import os
+import signal
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from api import serve
+from api.app import app
+from api.routes import health
+
+
+@pytest.fixture
+def restore_draining():
+    yield
+    health.draining = False
+
+
+# === Worker encerrando: /ready responde 503 sem consultar o banco ===
+def test_ready_encerrando_responde_503(restore_draining):
+    health.start_draining()
+
+    response = TestClient(app).get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "encerrando"
+
+
+# === SIGTERM sem tempo de drain: marca o drain e pede para o uvicorn sair na hora ===
+def test_sigterm_sem_drain_para_o_worker(restore_draining, monkeypatch):
+    monkeypatch.setattr(serve.settings, "SERVE_DRAIN_SECONDS", 0.0)
+    server = serve.WorkerServer(uvicorn.Config(app), forked_at=0.0, first=True)
+
+    server.handle_exit(signal.SIGTERM, None)
+
+    assert health.draining
+    assert server.should_exit
+
+
+# === SIGTERM com drain: o uvicorn continua aceitando conexões até o fim do prazo ===
+def test_sigterm_com_drain_espera_antes_de_parar(restore_draining, monkeypatch):
+    monkeypatch.setattr(serve.settings, "SERVE_DRAIN_SECONDS", 60.0)
+    server = serve.WorkerServer(uvicorn.Config(app), forked_at=0.0, first=True)
+
+    server.handle_exit(signal.SIGTERM, None)
+    assert health.draining
+    assert not server.should_exit
+
+    # Um segundo sinal não espera o drain
+    server.handle_exit(signal.SIGTERM, None)
+    assert server.should_exit
+
+
+# === Vários workers com o hub local: não inicia ===
+def test_varios_workers_exigem_realtime_postgres(monkeypatch):
+    monkeypatch.setattr(serve, "setup_logging", lambda: None)
+    monkeypatch.setattr(serve.settings, "REALTIME_BACKEND", "local")
+
+    with pytest.raises(SystemExit) as exc:
+        serve.main(["--workers", "2"])
+
+    assert exc.value.code == 1
+
+
+# === Pasta das métricas: cria uma temporária ou limpa a que veio do ambiente ===
+def test_prepare_metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    assert serve.prepare_metrics_dir()
+    created = os.environ.pop("PROMETHEUS_MULTIPROC_DIR")
+    assert os.path.isdir(created)
+    os.rmdir(created)
+
+    (tmp_path / "counter_123.db").write_bytes(b"antigo")
+    (tmp_path / "outro.txt").write_text("fica")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert not serve.prepare_metrics_dir()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["outro.txt"]
@@ -0,0 +1,38 @@
+from api.sortedset import SortedSet
+
+
+# === Ordem por pontuação (maior primeiro, empate pelo membro) ===
+def test_zrevrange_ordena_por_pontuacao_e_membro():
+    scores = SortedSet()
+    scores.zadd(3, 50)
+    scores.zadd(1, 100)
+    scores.zadd(2, 50)
+    assert scores.zrevrange(0, 2) == [(1, 100), (2, 50), (3, 50)]
+    assert scores.zrevrange(0, 0) == [(1, 100)]
+    assert len(scores) == 3
+
+
+# === Atualizar pontuação muda a posição ===
+def test_zadd_e_zincrby_mudam_a_posicao():
+    scores = SortedSet()
+    scores.zadd("a", 10)
+    scores.zadd("b", 20)
+    assert scores.zrevrank("a") == 1
+    assert scores.zincrby("a", 15) == 25
+    assert scores.zrevrank("a") == 0
+    scores.zadd("b", 30)
+    assert scores.zrevrank("a") == 1
+    assert scores.zscore("b") == 30
+    assert len(scores) == 2
+
+
+# === Remover e membro inexistente ===
+def test_zrem_e_membro_inexistente():
+    scores = SortedSet()
+    scores.zadd("a", 1)
+    scores.zrem("a")
+    scores.zrem("a")  # Remover de novo não dá erro
+    assert scores.zrevrank("a") is None
+    assert scores.zscore("a") is None
+    assert len(scores) == 0
+    assert scores.zincrby("b", 5) == 5
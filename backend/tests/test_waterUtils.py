@@ -0,0 +1,45 @@
+import pytest
+
+from api.utils.waterUtils import (
+    calculate_daily_water_target,
+    calculate_extra_exercise_mission,
+    calculate_water_goal,
+    calculate_water_goals_bulk,
+)
+
+
+# === Mesmas regras do app (Frontend/app/utils/waterUtils.ts) ===
+def test_meta_diaria_pelo_peso():
+    assert calculate_daily_water_target(70) == 2450
+
+
+@pytest.mark.parametrize("temp, ml_por_min", [(20, 6.5), (21, 10), (26, 10), (27, 13.5), (32, 13.5), (33, 17.5)])
+def test_missao_extra_por_faixa_de_temperatura(temp, ml_por_min):
+    assert calculate_extra_exercise_mission(30, temp) == 30 * ml_por_min
+
+
+def test_missao_extra_sem_exercicio():
+    assert calculate_extra_exercise_mission(0, 30) == 0
+    assert calculate_extra_exercise_mission(30, 0) == 0
+
+
+def test_meta_completa_arredonda_como_o_app():
+    goal = calculate_water_goal(70, 30, 25)
+    assert goal.daily_target_ml == 2450
+    assert goal.per_mission_ml == 817      # 816.67 arredondado
+    assert goal.extra_mission_ml == 300
+    assert goal.total_target_ml == 2750
+
+
+# === Modo em lote dá o mesmo resultado que o cálculo por perfil ===
+def test_modo_em_lote_igual_ao_individual():
+    pytest.importorskip("numpy")
+    perfis = [(70, 30, 25), (55.5, 0, 30), (90, 45, 35), (0, 10, 18), (62.3, 15, 26.5)]
+    bulk = calculate_water_goals_bulk(*zip(*perfis))
+
+    for i, perfil in enumerate(perfis):
+        goal = calculate_water_goal(*perfil)
+        assert bulk["daily_target_ml"][i] == goal.daily_target_ml
+        assert bulk["per_mission_ml"][i] == goal.per_mission_ml
+        assert bulk["extra_mission_ml"][i] == goal.extra_mission_ml
+        assert bulk["total_target_ml"][i] == goal.total_target_ml
@@ -0,0 +1,120 @@
+import asyncio
+from collections import namedtuple
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from api.services.writeBuffer import HistoryWriteBuffer
+
+Row = namedtuple("Row", "id profile_id amount")
+
+
+# Buffer com a gravação no banco trocada por uma lista (ids sequenciais como o banco daria)
+class FakeBuffer(HistoryWriteBuffer):
+    def __init__(self, *args, fail_profile=None, error=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+        self.attempts = 0
+        self.fail_profile = fail_profile
+        self.error = error or IntegrityError("INSERT", {}, Exception("perfil inválido"))
+        self.next_id = 1
+
+    async def _write(self, batch):
+        await asyncio.sleep(0)
+        self.attempts += 1
+        if any(values["profile_id"] == self.fail_profile for values, _ in batch):
+            raise self.error
+        self.batches.append(len(batch))
+        for values, future in batch:
+            future.set_result(Row(self.next_id, values["profile_id"], values["amount"]))
+            self.next_id += 1
+
+
+# === Requisições simultâneas entram no mesmo lote, cada uma recebe a sua linha ===
+def test_insercoes_simultaneas_viram_lotes():
+    async def run():
+        buffer = FakeBuffer(max_batch=4, linger_ms=50)
+        await buffer.start()
+        rows = await asyncio.gather(*(buffer.insert(1, float(i)) for i in range(10)))
+        await buffer.stop()
+        return buffer, rows
+
+    buffer, rows = asyncio.run(run())
+    assert buffer.batches == [4, 4, 2]
+    assert [row.amount for row in rows] == [float(i) for i in range(10)]
+    assert len({row.id for row in rows}) == 10
+
+
+# === Desligar grava o que ainda estava esperando ===
+def test_stop_grava_a_fila():
+    async def run():
+        buffer = FakeBuffer(max_batch=100, linger_ms=10_000)
+        await buffer.start()
+        pending = [asyncio.create_task(buffer.insert(1, 1.0)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert not any(task.done() for task in pending)  # Ainda esperando o lote encher
+        await buffer.stop()
+        return buffer, await asyncio.gather(*pending)
+
+    buffer, rows = asyncio.run(run())
+    assert buffer.batches == [3]
+    assert len(rows) == 3
+
+
+# === Lote recusado no INSERT: grava os outros um por um, só o registro com problema falha ===
+def test_lote_com_erro_grava_os_outros():
+    async def run():
+        buffer = FakeBuffer(max_batch=10, linger_ms=20, fail_profile=2)
+        await buffer.start()
+        results = await asyncio.gather(
+            buffer.insert(1, 1.0), buffer.insert(2, 2.0), buffer.insert(3, 3.0),
+            return_exceptions=True,
+        )
+        await buffer.stop()
+        return buffer, results
+
+    buffer, results = asyncio.run(run())
+    assert isinstance(results[1], IntegrityError)
+    assert results[0].profile_id == 1 and results[2].profile_id == 3
+    assert buffer.batches == [1, 1]
+
+
+# === Erro incerto (ex: conexão caiu no commit): o lote inteiro falha, sem regravar ===
+def test_erro_no_commit_nao_regrava():
+    async def run():
+        error = OperationalError("COMMIT", {}, Exception("conexão encerrada"))
+        buffer = FakeBuffer(max_batch=10, linger_ms=20, fail_profile=2, error=error)
+        await buffer.start()
+        results = await asyncio.gather(
+            buffer.insert(1, 1.0), buffer.insert(2, 2.0), buffer.insert(3, 3.0),
+            return_exceptions=True,
+        )
+        await buffer.stop()
+        return buffer, results
+
+    buffer, results = asyncio.run(run())
+    assert all(isinstance(result, OperationalError) for result in results)
+    assert buffer.attempts == 1
+    assert buffer.batches == []
+
+
+# === Loop do buffer morreu: quem esperava recebe erro e as próximas gravam na hora ===
+def test_loop_morto_libera_a_fila():
+    class BrokenLoopBuffer(FakeBuffer):
+        def _take(self):
+            if self._task is not None:
+                raise RuntimeError("bug no loop")
+            return super()._take()
+
+    async def run():
+        buffer = BrokenLoopBuffer(max_batch=100, linger_ms=1)
+        await buffer.start()
+        waiting = await asyncio.gather(*(buffer.insert(1, 1.0) for _ in range(2)), return_exceptions=True)
+        assert buffer._task is None
+        row = await asyncio.wait_for(buffer.insert(1, 2.0), timeout=1)
+        await buffer.stop()
+        return buffer, waiting, row
+
+    buffer, waiting, row = asyncio.run(run())
+    assert [type(result) for result in waiting] == [RuntimeError, RuntimeError]
+    assert row.amount == 2.0
+    assert buffer.batches == [1]
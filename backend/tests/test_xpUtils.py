@@ -0,0 +1,50 @@
+import random
+
+from api.utils.xpUtils import apply_xp, total_xp
+
+
+# Regra original do update_perfil (um nível por vez), usada como referência
+def apply_xp_loop(level, current_xp, xp_to_next, add_xp):
+    current_xp += add_xp
+    while current_xp >= xp_to_next:
+        current_xp -= xp_to_next
+        level += 1
+        xp_to_next += 100
+    return level, current_xp, xp_to_next
+
+
+# === Propriedade: a fórmula fechada dá sempre o mesmo resultado do loop ===
+def test_apply_xp_igual_ao_loop_em_casos_aleatorios():
+    rng = random.Random(20251117)
+    for _ in range(5000):
+        xp_to_next = rng.choice([1, 50, 99, 100, 101, rng.randint(1, 10_000)])
+        current_xp = rng.randint(0, xp_to_next - 1)
+        add_xp = rng.choice([0, 1, xp_to_next - current_xp, rng.randint(0, 10_000), rng.randint(0, 10_000_000)])
+        level = rng.randint(1, 500)
+
+        assert apply_xp(level, current_xp, xp_to_next, add_xp) == apply_xp_loop(level, current_xp, xp_to_next, add_xp)
+
+
+def test_apply_xp_limites_exatos():
+    # Do nível 1: 100 para o 2, +200 para o 3, +300 para o 4
+    assert apply_xp(1, 0, 100, 99) == (1, 99, 100)
+    assert apply_xp(1, 0, 100, 100) == (2, 0, 200)
+    assert apply_xp(1, 0, 100, 599) == (3, 299, 300)
+    assert apply_xp(1, 0, 100, 600) == (4, 0, 400)
+
+
+def test_apply_xp_muito_grande():
+    assert apply_xp(1, 0, 100, 10**9) == apply_xp_loop(1, 0, 100, 10**9)
+
+    # Grande demais para o loop: confere só se o estado final é válido
+    level, current_xp, xp_to_next = apply_xp(1, 0, 100, 10**15)
+    assert 0 <= current_xp < xp_to_next
+    assert xp_to_next == 100 * level
+
+
+# === XP total (ranking): igual a somar tudo desde o nível 1 ===
+def test_total_xp_igual_ao_xp_somado():
+    assert total_xp(1, 0) == 0
+    for add_xp in (0, 99, 100, 599, 600, 12_345):
+        level, current_xp, _ = apply_xp(1, 0, 100, add_xp)
+        assert total_xp(level, current_xp) == add_xp